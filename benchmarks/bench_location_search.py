@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: location lookups through the inverted text index vs. a full scan
+
+Builds synthetic events named after gazetteer places, then times the old
+lowercase-substring scan over every event against TextIndex.match_location for a
+few selective and broad queries.
+
+    python benchmarks/bench_location_search.py              # 10k, 100k and 1M events
+    python benchmarks/bench_location_search.py --sizes 10000 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_index import TextIndex
+
+GAZETTEER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer.json")
+QUERIES = ["Kharkiv", "Red Sea", "Taiwan Strait", "south", "sea"]
+WORDS = ("attack strike drone missile vessel cargo tanker cyber outage protest border patrol "
+         "incursion militia convoy airspace radar satellite jamming blockade ferry").split()
+
+
+def make_events(count, rng):
+    with open(GAZETTEER, "r", encoding="utf-8") as f:
+        places = [place["name"] for place in json.load(f)["places"]]
+    events = []
+    for event_id in range(count):
+        place = rng.choice(places)
+        country = rng.choice(places)
+        events.append({
+            "id": event_id,
+            "title": f"{rng.choice(WORDS).title()} near {place}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "location": f"{place}, {country}",
+            "tags": rng.sample(WORDS, 2),
+        })
+    return events
+
+
+def scan(events, location):
+    location_lower = location.lower()
+    return [e for e in events if location_lower in e.get('location', '').lower()]
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(size, repeats):
+    rng = random.Random(size)
+    events = make_events(size, rng)
+
+    start = time.perf_counter()
+    index = TextIndex()
+    for event in events:
+        index.add(event)
+    index.match_location("warm up")  # builds the sorted vocabulary
+    build = time.perf_counter() - start
+    print(f"\n{size:,} events (index built in {build:.2f}s)")
+    print(f"  {'query':<16}{'matches':>10}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+
+    for query in QUERIES:
+        scan_time, scanned = best_of(repeats, lambda: scan(events, query))
+        index_time, matched = best_of(repeats, lambda: index.match_location(query))
+        speedup = scan_time / index_time if index_time else float("inf")
+        print(f"  {query:<16}{len(matched):>10,}{scan_time * 1000:>12.2f}{index_time * 1000:>12.2f}{speedup:>9.1f}x"
+              f"{'' if len(matched) <= len(scanned) else '  (!)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
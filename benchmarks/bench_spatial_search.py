@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: bbox, radius and geo feature queries through the spatial index vs. a full scan
+
+Scatters synthetic events around gazetteer places, then times typical map viewports,
+a radius search and a feature lookup against a scan over every event.
+
+    python benchmarks/bench_spatial_search.py              # 10k, 100k and 1M events
+    python benchmarks/bench_spatial_search.py --sizes 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import shapely
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.spatial_index import SpatialIndex, haversine_km
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+BOXES = {
+    "city viewport": (50.0, 36.0, 50.5, 36.6),        # around Kharkiv
+    "strait viewport": (22.0, 118.0, 26.0, 122.0),     # Taiwan Strait
+    "region viewport": (10.0, 30.0, 35.0, 60.0),       # Red Sea to the Gulf
+}
+
+
+def make_events(count, rng):
+    with open(os.path.join(DATA_DIR, "gazetteer.json"), "r", encoding="utf-8") as f:
+        places = [(p["lat"], p["lon"]) for p in json.load(f)["places"]]
+    events = []
+    for event_id in range(count):
+        lat, lon = rng.choice(places)
+        events.append({
+            "id": event_id,
+            "lat": max(-90.0, min(90.0, lat + rng.gauss(0, 1.5))),
+            "lon": (lon + rng.gauss(0, 1.5) + 180) % 360 - 180,
+        })
+    return events
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, scan_time, index_time, matches):
+    speedup = scan_time / index_time if index_time else float("inf")
+    print(f"  {name:<22}{matches:>10,}{scan_time * 1000:>12.2f}{index_time * 1000:>12.3f}{speedup:>10.0f}x")
+
+
+def run(size, repeats):
+    rng = random.Random(size)
+    events = make_events(size, rng)
+
+    start = time.perf_counter()
+    index = SpatialIndex()
+    for event in events:
+        index.add(event)
+    print(f"\n{size:,} events (index built in {time.perf_counter() - start:.2f}s)")
+    print(f"  {'query':<22}{'matches':>10}{'scan ms':>12}{'index ms':>12}{'speedup':>11}")
+
+    for name, (min_lat, min_lon, max_lat, max_lon) in BOXES.items():
+        scan_time, _ = best_of(repeats, lambda: [e for e in events if min_lat <= e["lat"] <= max_lat
+                                                 and min_lon <= e["lon"] <= max_lon])
+        index_time, found = best_of(repeats, lambda: index.within_bbox(min_lat, min_lon, max_lat, max_lon))
+        report(name, scan_time, index_time, len(found))
+
+    scan_time, _ = best_of(repeats, lambda: [e for e in events if haversine_km(15.5, 41.5, e["lat"], e["lon"]) <= 50])
+    index_time, found = best_of(repeats, lambda: index.within_radius(15.5, 41.5, 50))
+    report("50 km of Red Sea", scan_time, index_time, len(found))
+
+    zone = shapely.box(110, 6, 118, 12)
+    shapely.prepare(zone)
+    scan_time, _ = best_of(repeats, lambda: [e for e in events if shapely.contains_xy(zone, e["lon"], e["lat"])])
+    index_time, found = best_of(repeats, lambda: index.within_geometries([zone]))
+    report("maritime risk zone", scan_time, index_time, len(found))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-tool latency of the in-process MCP tool transport vs. HTTP
+
+Serves mcp_server.mcp_app with uvicorn on a loopback port in a background thread, then
+calls each chat tool through HttpToolTransport and InProcessToolTransport against the
+configured event store, reporting median and 95th percentile latency per tool.
+
+    python benchmarks/bench_tool_transport.py
+    python benchmarks/bench_tool_transport.py --calls 500
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from mcp_server import mcp_app
+from services.tool_transport import HttpToolTransport, InProcessToolTransport
+
+TOOLS = [
+    ("get-event-statistics", {"stat_type": "count_by_severity"}),
+    ("analyze-security-events", {"query_type": "regional_focus", "severity_filter": "high"}),
+    ("get-event-trends", {"interval": "week"}),
+    ("get-critical-alerts", None),
+    ("search-events-by-location", {"location": "Red Sea"}),
+    ("search-events-near-point", {"lat": 15.0, "lon": 42.0, "radius_km": 1500}),
+]
+
+
+def serve(port):
+    """Run the MCP app on 127.0.0.1:port in a daemon thread; returns once it accepts requests"""
+    server = uvicorn.Server(uvicorn.Config(mcp_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def latencies(transport, endpoint, payload, calls):
+    # Warm up caches and connections before timing
+    await transport.call(endpoint, payload)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await transport.call(endpoint, payload)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), statistics.quantiles(samples, n=20)[-1]
+
+
+async def run(port, calls):
+    http = HttpToolTransport(f"http://127.0.0.1:{port}")
+    local = InProcessToolTransport()
+    print(f"{calls} calls per tool; latency in ms (median / p95)")
+    print(f"  {'tool':<28}{'http':>16}{'in-process':>16}{'speedup':>9}")
+    try:
+        for endpoint, payload in TOOLS:
+            http_median, http_p95 = await latencies(http, endpoint, payload, calls)
+            local_median, local_p95 = await latencies(local, endpoint, payload, calls)
+            print(f"  {endpoint:<28}{http_median * 1000:>8.2f} /{http_p95 * 1000:>6.2f}"
+                  f"{local_median * 1000:>8.3f} /{local_p95 * 1000:>6.3f}{http_median / local_median:>8.0f}x")
+    finally:
+        await http.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    port = free_port()
+    server, thread = serve(port)
+    try:
+        asyncio.run(run(port, args.calls))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,8 +14,16 @@ from pathlib import Path
 from services.openai_agent import OpenAIService
 from services.vision_processor import process_satellite_image
 from services.whisper_transcribe import transcribe_audio
-from services.web_search_agent import WebSearchAgent
+from services.web_search_agent import web_search_agent
 from services.search_agent_manager import search_agent_manager
+from services.event_store import event_store
+from services.event_writer import event_writer
+from services.openai_client import openai_limiter
+from services.spatial_index import geo_features, get_spatial_index
+from services.map_view import MAX_PAGE_SIZE, get_map_view
+from services.event_dedup import get_event_deduplicator
+from services.event_bus import event_bus, sse_frame
+from services.system_health import system_health
 
 app = FastAPI(title="Global AI Security Insights Platform", version="1.0.0")
 
@@ -30,18 +38,17 @@ app.add_middleware(
 
 # Initialize services
 openai_service = OpenAIService()
-web_search_agent = WebSearchAgent()
+spatial_index = get_spatial_index()
+map_view = get_map_view()
+# Built here rather than on the first agent integration, which runs on the event loop
+event_deduplicator = get_event_deduplicator()
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Load mock data
 def load_mock_events():
-    try:
-        with open("data/mock_events.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"events": []}
+    return event_store.load()
 
 def load_geo_data():
     try:
@@ -59,11 +66,113 @@ async def read_root():
     except FileNotFoundError:
         return HTMLResponse(content="<h1>Welcome to AI Security Platform</h1><p>Frontend not found</p>")
 
+def current_event_seq() -> int:
+    """Change sequence number of the events as they are on disk right now"""
+    with event_store.synced():
+        return event_store.changes.seq
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
 @app.get("/api/events")
-async def get_events():
-    """Get current security events for the map and event list"""
-    events = load_mock_events()
-    return JSONResponse(content=events)
+async def get_events(
+    request: Request,
+    bbox: str = Query(default=None, description="Viewport as west,south,east,north"),
+    zoom: int = Query(default=None, ge=0, le=30),
+    limit: int = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    sort: str = "newest",
+    category: str = Query(default=None, description="Comma-separated categories"),
+    severity: str = Query(default=None, description="Comma-separated severities"),
+    region: str = None,
+    search: str = None,
+):
+    """
+    Get current security events for the map and event list. Without bbox, zoom, limit
+    or cursor this is the whole events document; otherwise clusters for zoomed-out map
+    viewports, or a page of events with a cursor for the next one.
+
+    Responses carry the change sequence number as their ETag, so a poll with a
+    matching If-None-Match gets 304 Not Modified until the events change.
+    """
+    # Read the sequence number before the events so the tag is never newer than the body
+    seq = current_event_seq()
+    headers = {"ETag": f'"{seq}"', "X-Event-Seq": str(seq), "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if bbox is None and zoom is None and limit is None and cursor is None:
+        return JSONResponse(content=load_mock_events(), headers=headers)
+    try:
+        result = map_view.query(bbox=bbox, zoom=zoom, limit=limit, cursor=cursor, sort=sort,
+                                category=category, severity=severity, region=region, search=search)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=result, headers=headers)
+
+@app.get("/api/events/changes")
+async def get_event_changes(since: int = Query(..., ge=0)):
+    """
+    Events added and IDs deleted since change sequence number `since` (from X-Event-Seq
+    or a previous call's "seq"). "reset": true means `since` is too old to replay and
+    the client should reload /api/events.
+    """
+    with event_store.synced():
+        return JSONResponse(content=event_store.changes.since(since))
+
+@app.get("/api/events/summary")
+async def get_event_summary(
+    request: Request,
+    category: str = Query(default=None, description="Comma-separated categories"),
+    severity: str = Query(default=None, description="Comma-separated severities"),
+    region: str = None,
+    search: str = None,
+):
+    """
+    Event counts for the dashboard's header, metrics and charts: totals, regions and
+    categories of every event, plus per-severity and per-region counts of the events
+    matching the filters. Tagged with the change sequence number like /api/events.
+    """
+    seq = current_event_seq()
+    headers = {"ETag": f'"{seq}"', "X-Event-Seq": str(seq), "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    summary = map_view.summary(category=category, severity=severity, region=region, search=search)
+    return JSONResponse(content=summary, headers=headers)
+
+@app.get("/api/events/within-bbox")
+async def get_events_within_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180)
+):
+    """Get events inside a bounding box; min_lon > max_lon wraps across the antimeridian"""
+    with event_store.synced():
+        events = spatial_index.within_bbox(min_lat, min_lon, max_lat, max_lon)
+    return JSONResponse(content={"events": events, "count": len(events)})
+
+@app.get("/api/events/near")
+async def get_events_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0)
+):
+    """Get events within a radius of a point, nearest first"""
+    with event_store.synced():
+        events = spatial_index.within_radius(lat, lon, radius_km)
+    return JSONResponse(content={"events": events, "count": len(events)})
+
+@app.get("/api/events/in-feature")
+async def get_events_in_feature(name: str, buffer_km: float = Query(default=None, ge=0)):
+    """Get events inside a named geo feature; routes and points match events within buffer_km"""
+    geometries = geo_features.get(name)
+    if not geometries:
+        raise HTTPException(status_code=404, detail=f"Geo feature '{name}' not found")
+    with event_store.synced():
+        events = spatial_index.within_geometries(geometries, buffer_km)
+    return JSONResponse(content={"events": events, "count": len(events)})
 
 @app.get("/api/geo-data")
 async def get_geo_data():
@@ -76,11 +185,8 @@ async def chat_stream(message: str = Form(...)):
     """Streaming chat with the OpenAI agent for real-time responses with access to events data"""
     async def generate():
         try:
-            # Load current events data for AI analysis
-            events_data = load_mock_events()
-            events_list = events_data.get('events', [])
-            
-            async for chunk in openai_service.chat_completion_stream(message, events_data=events_list):
+            # The tools read the event store themselves; offer them only when it has events
+            async for chunk in openai_service.chat_completion_stream(message, use_tools=event_store.count() > 0):
                 # Send each chunk as Server-Sent Event
                 yield f"data: {json.dumps({'chunk': chunk})}\n\n"
         except Exception as e:
@@ -171,16 +277,16 @@ async def transcribe_meeting(file: UploadFile = File(...)):
 async def get_intelligence_summary():
     """Get AI-generated intelligence summary"""
     try:
-        events = load_mock_events()
+        event_count = event_store.count()
         geo_data = load_geo_data()
         
         # Generate summary using OpenAI
-        context = f"Current events: {len(events.get('events', []))} events detected. Geographic data: {len(geo_data.get('features', []))} regions monitored."
+        context = f"Current events: {event_count} events detected. Geographic data: {len(geo_data.get('features', []))} regions monitored."
         summary = await openai_service.generate_intelligence_summary(context)
         
         return JSONResponse(content={
             "summary": summary,
-            "event_count": len(events.get('events', [])),
+            "event_count": event_count,
             "regions_monitored": len(geo_data.get('features', [])),
             "timestamp": datetime.now().isoformat()
         })
@@ -191,20 +297,15 @@ async def get_intelligence_summary():
 async def update_event(event_data: Dict[str, Any]):
     """Update or add a new security event"""
     try:
-        events = load_mock_events()
-        
         # Add timestamp if not provided
         if "timestamp" not in event_data:
             event_data["timestamp"] = datetime.now().isoformat()
         
-        # Add new event
-        events["events"].append(event_data)
-        
-        # Save back to file
-        with open("data/mock_events.json", "w", encoding="utf-8") as f:
-            json.dump(events, f, indent=2, ensure_ascii=False)
+        # Queue the new event with the single event writer
+        added_events = await event_writer.add_events([event_data])
+        event_bus.publish("events", {"added": added_events, "deleted": [], "seq": current_event_seq()})
         
-        return JSONResponse(content={"success": True, "message": "Event added successfully"})
+        return JSONResponse(content={"success": True, "message": "Event added successfully", "event_id": event_data["id"]})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -212,19 +313,10 @@ async def update_event(event_data: Dict[str, Any]):
 async def delete_event(event_id: int):
     """Delete a security event by ID"""
     try:
-        events = load_mock_events()
-        
-        # Find and remove the event with matching ID
-        original_count = len(events["events"])
-        events["events"] = [event for event in events["events"] if event.get("id") != event_id]
-        
-        # Check if event was found and deleted
-        if len(events["events"]) == original_count:
+        # Queue deletion of the event with matching ID
+        if not await event_writer.delete_event(event_id):
             raise HTTPException(status_code=404, detail=f"Event with ID {event_id} not found")
-        
-        # Save back to file
-        with open("data/mock_events.json", "w", encoding="utf-8") as f:
-            json.dump(events, f, indent=2, ensure_ascii=False)
+        event_bus.publish("events", {"added": [], "deleted": [event_id], "seq": current_event_seq()})
         
         return JSONResponse(content={
             "success": True, 
@@ -371,16 +463,55 @@ async def get_agent_status():
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse(content={
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "services": {
-            "openai": "connected",
-            "web_search": "available",
-            "data": "loaded"
+    return JSONResponse(content=system_health.status())
+
+@app.get("/api/stream")
+async def event_stream():
+    """
+    Push channel for dashboards (Server-Sent Events). Sends "health" on connect, then
+    "events" ({added, deleted, seq}), "agents" and "health" messages as they happen, where seq is
+    the change sequence number once the change was written. A client that
+    falls behind gets "dropped" and should reconnect and resync from
+    /api/events/changes.
+    """
+    subscription = event_bus.subscribe()
+
+    async def generate():
+        yield "retry: 5000\n\n"
+        yield sse_frame("health", system_health.status())
+        async for frame in subscription.frames():
+            yield frame
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
         }
+    )
+
+@app.get("/api/stream-stats")
+async def get_stream_stats():
+    """Get the number of open push channels and messages published and dropped"""
+    return JSONResponse(content=event_bus.stats())
+
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Get hit/miss counters for the web search, geocoding and chat tool result caches"""
+    return JSONResponse(content={
+        "web_search": web_search_agent.search_cache.stats(),
+        "geocoder": web_search_agent.geocoder.stats,
+        "tool_results": openai_service.tool_results.stats(),
+        "tool_schemas": openai_service.tool_schemas.stats()
     })
 
+@app.get("/api/rate-limiter-stats")
+async def get_rate_limiter_stats():
+    """Get queue depth and in-flight counts for outbound OpenAI calls"""
+    return JSONResponse(content=openai_limiter.stats())
+
 if __name__ == "__main__":
     # Ensure required directories exist
     os.makedirs("static", exist_ok=True)
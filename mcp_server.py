@@ -7,10 +7,16 @@ by AI assistants to analyze security events, generate statistics, and provide in
 
 from fastapi import FastAPI, HTTPException
 from fastapi_mcp import FastApiMCP
-from typing import Dict, Any, List
-import json
-import os
-from pydantic import BaseModel
+from typing import Dict, Any, List, Union
+import time
+from pydantic import BaseModel, Field
+
+from services.cache import LRUCache
+from services.event_aggregates import AggregateView, get_event_aggregates
+from services.event_columns import ColumnView, get_event_columns
+from services.event_store import event_store
+from services.event_timeline import get_event_timeline, parse_period
+from services.spatial_index import geo_features, get_spatial_index
 
 # Create the main API app (this could be imported from main.py if needed)
 api_app = FastAPI(title="AI Security Platform API")
@@ -21,41 +27,76 @@ mcp_app = FastAPI(title="Security Analysis MCP Server")
 # Initialize MCP from the API app
 mcp = FastApiMCP(api_app)
 
+spatial_index = get_spatial_index()
+# Cell aggregates answer whole-store and severity/category questions in O(groups);
+# the columns scan only for region and time filters, which cut across cells
+aggregates = get_event_aggregates()
+columns = get_event_columns()
+timeline = get_event_timeline()
+# Rendered analyses keyed by query and data version
+analysis_cache = LRUCache(max_entries=256)
+
+EventView = Union[AggregateView, ColumnView]
+
 @api_app.get("/")
 async def api_root():
     """Main API root endpoint"""
     return {"message": "AI Security Platform API"}
 
-# Mock data function (replace with actual data loading)
 async def get_events_data() -> List[Dict]:
-    """Get events data - this should be replaced with actual data loading logic"""
+    """Get events data from the shared in-memory event store"""
     try:
-        with open('data/mock_events.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('events', [])
+        return event_store.get_events()
     except Exception as e:
         print(f"Error loading events data: {e}")
         return []
 
-# Pydantic models for request bodies
+# Pydantic models for request bodies; their field descriptions and enums become the
+# chat assistant's tool schemas via this app's OpenAPI document
+def _choice(description: str, choices: List[str], default: Any = ...) -> Any:
+    """A string field advertising its usual values without rejecting others"""
+    return Field(default, description=description, json_schema_extra={"enum": choices})
+
 class AnalyzeEventsRequest(BaseModel):
-    query_type: str
-    region_filter: str = None
-    severity_filter: str = None
-    category_filter: str = None
-    time_period: str = None
+    query_type: str = _choice("Type of analysis to perform",
+                              ["summary", "threat_analysis", "regional_focus", "severity_breakdown", "trend_analysis"])
+    region_filter: str = Field(None, description="Filter events by region/location if specified")
+    severity_filter: str = _choice("Filter events by severity level", ["low", "medium", "high", "critical"], None)
+    category_filter: str = Field(None, description="Filter events by category, e.g. 'maritime', 'climate' or 'supply-chain'")
+    time_period: str = Field(None, description="Only analyze events from this recent period (e.g., 'last 7 days', '24h', '2w', 'recent')")
 
 class StatisticsRequest(BaseModel):
-    stat_type: str
+    stat_type: str = _choice("Type of statistics to generate",
+                             ["count_by_severity", "count_by_region", "count_by_category", "total_events"])
+
+class TrendRequest(BaseModel):
+    interval: str = _choice("Bucket size for the counts", ["day", "week"], "day")
+    time_period: str = Field(None, description="Only include events from this recent period (e.g., 'last 30 days', '2w')")
 
 class LocationSearchRequest(BaseModel):
-    location: str
+    location: str = Field(..., description="Location to search for events")
+
+class BBoxSearchRequest(BaseModel):
+    min_lat: float = Field(..., description="Southern edge latitude (-90 to 90)")
+    min_lon: float = Field(..., description="Western edge longitude (-180 to 180)")
+    max_lat: float = Field(..., description="Northern edge latitude (-90 to 90)")
+    max_lon: float = Field(..., description="Eastern edge longitude; less than min_lon to cross the antimeridian")
+
+class RadiusSearchRequest(BaseModel):
+    lat: float = Field(..., description="Latitude of the point")
+    lon: float = Field(..., description="Longitude of the point")
+    radius_km: float = Field(..., description="Search radius in kilometres")
+
+class FeatureSearchRequest(BaseModel):
+    feature_name: str = Field(..., description="Name of a map overlay, e.g. 'High Risk Maritime Zone' or 'Major Supply Chain Corridor'")
+    buffer_km: float = Field(None, description="For routes and points, how close in kilometres an event must be (default: 100)")
 
 # Security Analysis Tools as FastAPI endpoints (converted to MCP tools automatically)
 @mcp_app.post("/analyze-security-events", 
     summary="Analyze Security Events",
     description="Analyze security events data to answer user questions about threats, patterns, and insights",
-    operation_id="analyze_security_events"
+    operation_id="analyze_security_events",
+    tags=["tools"]
 )
 async def analyze_security_events(request: AnalyzeEventsRequest) -> str:
     """
@@ -67,34 +108,32 @@ async def analyze_security_events(request: AnalyzeEventsRequest) -> str:
     Returns:
         Analysis results as a formatted string
     """
+    window_start = _window_start(request.time_period)
     try:
-        # Get events data
-        events_data = await get_events_data()
-        events = events_data.copy()
-        
-        # Apply filters
-        if request.region_filter:
-            events = [e for e in events if request.region_filter.lower() in e.get('location', '').lower()]
-        
-        if request.severity_filter:
-            events = [e for e in events if e.get('severity') == request.severity_filter]
+        with event_store.synced():
+            # Rendered analyses are reused until the events change
+            cache_key = (request.query_type, request.region_filter, request.severity_filter,
+                         request.category_filter, window_start, aggregates.version, columns.version)
+            analysis = analysis_cache.get(cache_key)
+            if analysis is not None:
+                return analysis
             
-        if request.category_filter:
-            events = [e for e in events if e.get('category') == request.category_filter]
-        
-        # Perform analysis based on query type
-        if request.query_type == "summary":
-            return _generate_summary(events)
-        elif request.query_type == "threat_analysis":
-            return _analyze_threats(events)
-        elif request.query_type == "regional_focus":
-            return _analyze_by_region(events)
-        elif request.query_type == "severity_breakdown":
-            return _analyze_by_severity(events)
-        elif request.query_type == "trend_analysis":
-            return _analyze_trends(events)
-        else:
-            return _generate_summary(events)
+            keys = None
+            if request.region_filter:
+                keys = event_store.text_index.match_location(request.region_filter)
+            if window_start is not None:
+                recent = timeline.keys_between(window_start)
+                keys = set(recent) if keys is None else keys.intersection(recent)
+            view = aggregates.view() if keys is None else columns.view_of(keys)
+            if request.severity_filter:
+                view = view.where("severity", [request.severity_filter])
+            if request.category_filter:
+                view = view.where("category", [request.category_filter])
+            
+            # Perform analysis based on query type
+            analysis = ANALYSES.get(request.query_type, _generate_summary)(view)
+            analysis_cache.set(cache_key, analysis)
+            return analysis
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing security events: {str(e)}")
@@ -102,7 +141,8 @@ async def analyze_security_events(request: AnalyzeEventsRequest) -> str:
 @mcp_app.post("/get-event-statistics",
     summary="Get Event Statistics", 
     description="Get statistical breakdown of security events",
-    operation_id="get_event_statistics"
+    operation_id="get_event_statistics",
+    tags=["tools"]
 )
 async def get_event_statistics(request: StatisticsRequest) -> Dict[str, Any]:
     """
@@ -115,40 +155,53 @@ async def get_event_statistics(request: StatisticsRequest) -> Dict[str, Any]:
         Statistical data as a dictionary
     """
     try:
-        # Get events data
-        events_data = await get_events_data()
-        events = events_data
-        
-        if request.stat_type == "count_by_severity":
-            stats = {}
-            for event in events:
-                severity = event.get('severity', 'unknown')
-                stats[severity] = stats.get(severity, 0) + 1
-            return stats
-            
-        elif request.stat_type == "count_by_region":
-            stats = {}
-            for event in events:
-                location = event.get('location', 'unknown').split(',')[0]
-                stats[location] = stats.get(location, 0) + 1
-            return stats
-            
-        elif request.stat_type == "count_by_category":
-            stats = {}
-            for event in events:
-                category = event.get('category', 'unknown')
-                stats[category] = stats.get(category, 0) + 1
-            return stats
-            
-        return {"total_events": len(events)}
+        with event_store.synced():
+            view = aggregates.view()
+            if request.stat_type == "count_by_severity":
+                return view.counts("severity")
+                
+            elif request.stat_type == "count_by_region":
+                return view.counts("region")
+                
+            elif request.stat_type == "count_by_category":
+                return view.counts("category")
+                
+            return {"total_events": view.total}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting statistics: {str(e)}")
 
+@mcp_app.post("/get-event-trends",
+    summary="Get Event Trends",
+    description="Get per-day or per-week event counts by category and severity",
+    operation_id="get_event_trends",
+    tags=["tools"]
+)
+async def get_event_trends(request: TrendRequest) -> Dict[str, Any]:
+    """
+    Get per-day or per-week event counts by category and severity.
+    
+    Args:
+        request: Trend request with bucket interval ("day" or "week") and optional time period
+    
+    Returns:
+        The buckets, oldest first, each with its start date, total and breakdowns
+    """
+    window_start = _window_start(request.time_period)
+    try:
+        with event_store.synced():
+            buckets = timeline.trends(request.interval, start=window_start)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting trends: {str(e)}")
+    return {"interval": request.interval, "time_period": request.time_period, "buckets": buckets}
+
 @mcp_app.get("/get-critical-alerts",
     summary="Get Critical Alerts",
     description="Get all critical security alerts", 
-    operation_id="get_critical_alerts"
+    operation_id="get_critical_alerts",
+    tags=["tools"]
 )
 async def get_critical_alerts() -> List[Dict[str, Any]]:
     """
@@ -158,16 +211,16 @@ async def get_critical_alerts() -> List[Dict[str, Any]]:
         List of critical events with details
     """
     try:
-        events_data = await get_events_data()
-        critical_events = [e for e in events_data if e.get('severity') == 'critical']
-        return critical_events
+        with event_store.synced():
+            return aggregates.view().where("severity", ["critical"]).events()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting critical alerts: {str(e)}")
 
 @mcp_app.post("/search-events-by-location",
     summary="Search Events by Location",
     description="Search for security events in a specific location",
-    operation_id="search_events_by_location" 
+    operation_id="search_events_by_location",
+    tags=["tools"]
 )
 async def search_events_by_location(request: LocationSearchRequest) -> List[Dict[str, Any]]:
     """
@@ -180,41 +233,105 @@ async def search_events_by_location(request: LocationSearchRequest) -> List[Dict
         List of events in the specified location
     """
     try:
-        events_data = await get_events_data()
-        matching_events = [
-            e for e in events_data 
-            if request.location.lower() in e.get('location', '').lower()
-        ]
-        return matching_events
+        return event_store.query_events(location=request.location)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching events: {str(e)}")
+
+@mcp_app.post("/search-events-in-bbox",
+    summary="Search Events in Bounding Box",
+    description="Search for security events inside a latitude/longitude bounding box",
+    operation_id="search_events_in_bbox",
+    tags=["tools"]
+)
+async def search_events_in_bbox(request: BBoxSearchRequest) -> List[Dict[str, Any]]:
+    """
+    Search for security events inside a bounding box.
+    
+    Args:
+        request: Box corners; min_lon greater than max_lon wraps across the antimeridian
+    
+    Returns:
+        List of events inside the box
+    """
+    try:
+        with event_store.synced():
+            return spatial_index.within_bbox(request.min_lat, request.min_lon, request.max_lat, request.max_lon)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching events: {str(e)}")
+
+@mcp_app.post("/search-events-near-point",
+    summary="Search Events Near Point",
+    description="Search for security events within a radius in kilometres of a point",
+    operation_id="search_events_near_point",
+    tags=["tools"]
+)
+async def search_events_near_point(request: RadiusSearchRequest) -> List[Dict[str, Any]]:
+    """
+    Search for security events near a point.
+    
+    Args:
+        request: Point coordinates and radius in kilometres
+    
+    Returns:
+        List of events within the radius, nearest first
+    """
+    try:
+        with event_store.synced():
+            return spatial_index.within_radius(request.lat, request.lon, request.radius_km)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching events: {str(e)}")
 
-# Helper functions (copied from openai_agent.py)
-def _generate_summary(events: List[Dict]) -> str:
+@mcp_app.post("/search-events-in-feature",
+    summary="Search Events in Geo Feature",
+    description="Search for security events inside a named map overlay such as 'High Risk Maritime Zone'",
+    operation_id="search_events_in_feature",
+    tags=["tools"]
+)
+async def search_events_in_feature(request: FeatureSearchRequest) -> List[Dict[str, Any]]:
+    """
+    Search for security events inside a geo feature from the map overlays.
+    
+    Args:
+        request: Feature name, and for routes and points the distance in kilometres that counts as inside
+    
+    Returns:
+        List of events inside the feature
+    """
+    geometries = geo_features.get(request.feature_name)
+    if not geometries:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Geo feature '{request.feature_name}' not found. Available: {', '.join(geo_features.names())}"
+        )
+    try:
+        with event_store.synced():
+            return spatial_index.within_geometries(geometries, request.buffer_km)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching events: {str(e)}")
+
+def _window_start(time_period: str):
+    """Epoch seconds at which a period like 'last 7 days' began, or None for all time"""
+    if not time_period:
+        return None
+    try:
+        return int(time.time()) - parse_period(time_period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Helper functions rendering analyses from cell aggregates or column scans
+def _generate_summary(view: EventView) -> str:
     """Generate a summary of security events"""
-    if not events:
+    if not view.total:
         return "No security events found matching the criteria."
     
-    total = len(events)
-    categories = {}
-    severities = {}
-    regions = set()
-    
-    for event in events:
-        cat = event.get('category', 'unknown')
-        sev = event.get('severity', 'unknown')
-        loc = event.get('location', '').split(',')[0]
-        
-        categories[cat] = categories.get(cat, 0) + 1
-        severities[sev] = severities.get(sev, 0) + 1
-        regions.add(loc)
+    severities = view.counts("severity")
     
     summary = f"**Security Events Analysis**\n\n"
-    summary += f"- **Total Events:** {total}\n"
-    summary += f"- **Active Regions:** {len(regions)}\n\n"
+    summary += f"- **Total Events:** {view.total}\n"
+    summary += f"- **Active Regions:** {len(view.counts('region'))}\n\n"
     
     summary += "**By Category:**\n"
-    for cat, count in categories.items():
+    for cat, count in view.counts("category").items():
         summary += f"- {cat.title()}: {count} events\n"
     
     summary += "\n**By Severity:**\n"
@@ -222,109 +339,104 @@ def _generate_summary(events: List[Dict]) -> str:
         summary += f"- {sev.title()}: {count} events\n"
     
     # Highlight critical events
-    critical_events = [e for e in events if e.get('severity') == 'critical']
-    if critical_events:
-        summary += f"\n**⚠️ Critical Alerts ({len(critical_events)}):**\n"
-        for event in critical_events[:3]:  # Show first 3
+    if severities.get('critical'):
+        summary += f"\n**⚠️ Critical Alerts ({severities['critical']}):**\n"
+        for event in view.where("severity", ["critical"]).first_events(3):  # Show first 3
             summary += f"- {event.get('title', 'Unknown event')} ({event.get('location', 'Unknown location')})\n"
     
     return summary
 
-def _analyze_threats(events: List[Dict]) -> str:
+def _analyze_threats(view: EventView) -> str:
     """Analyze threat patterns in events"""
-    if not events:
+    if not view.total:
         return "No threats detected in current data."
     
-    high_priority = [e for e in events if e.get('severity') in ['critical', 'high']]
+    high_priority = view.where("severity", ['critical', 'high'])
     
     analysis = "**Threat Analysis Report**\n\n"
-    analysis += f"**High Priority Threats:** {len(high_priority)} out of {len(events)} total events\n\n"
+    analysis += f"**High Priority Threats:** {high_priority.total} out of {view.total} total events\n\n"
     
-    if high_priority:
+    if high_priority.total:
         analysis += "**Key Threat Indicators:**\n"
-        for event in high_priority[:5]:
+        for event in high_priority.first_events(5):
             analysis += f"- **{event.get('title')}** ({event.get('severity').upper()})\n"
             analysis += f"  Location: {event.get('location')}\n"
             analysis += f"  Category: {event.get('category')}\n\n"
     
     return analysis
 
-def _analyze_by_region(events: List[Dict]) -> str:
+def _analyze_by_region(view: EventView) -> str:
     """Analyze events by geographical region"""
-    regional_data = {}
-    for event in events:
-        region = event.get('location', 'Unknown').split(',')[0]
-        if region not in regional_data:
-            regional_data[region] = []
-        regional_data[region].append(event)
-    
     analysis = "**Regional Security Analysis**\n\n"
-    for region, region_events in sorted(regional_data.items()):
-        severities = [e.get('severity') for e in region_events]
-        critical_count = severities.count('critical')
-        high_count = severities.count('high')
+    severities_by_region = view.crosstab("region", "severity")
+    categories_by_region = view.crosstab("region", "category")
+    for region, severities in sorted(severities_by_region.items()):
+        critical_count = severities.get('critical', 0)
+        high_count = severities.get('high', 0)
         
-        analysis += f"**{region}** ({len(region_events)} events)\n"
+        analysis += f"**{region}** ({sum(severities.values())} events)\n"
         if critical_count:
             analysis += f"- ⚠️ Critical: {critical_count}\n"
         if high_count:
             analysis += f"- ⚡ High: {high_count}\n"
-        analysis += f"- Categories: {', '.join(set([e.get('category', 'unknown') for e in region_events]))}\n\n"
+        analysis += f"- Categories: {', '.join(categories_by_region[region])}\n\n"
     
     return analysis
 
-def _analyze_by_severity(events: List[Dict]) -> str:
+def _analyze_by_severity(view: EventView) -> str:
     """Analyze events by severity level"""
-    severity_data = {}
-    for event in events:
-        severity = event.get('severity', 'unknown')
-        if severity not in severity_data:
-            severity_data[severity] = []
-        severity_data[severity].append(event)
-    
     analysis = "**Severity Level Analysis**\n\n"
     severity_order = ['critical', 'high', 'medium', 'low']
     
     for severity in severity_order:
-        if severity in severity_data:
-            events_list = severity_data[severity]
-            analysis += f"**{severity.upper()}** ({len(events_list)} events)\n"
+        severity_view = view.where("severity", [severity])
+        if severity_view.total:
+            analysis += f"**{severity.upper()}** ({severity_view.total} events)\n"
             
-            categories = {}
-            for event in events_list:
-                cat = event.get('category', 'unknown')
-                categories[cat] = categories.get(cat, 0) + 1
+            categories = severity_view.counts("category")
+            latest = severity_view.last_event()
             
             analysis += f"- Categories: {', '.join([f'{cat}: {count}' for cat, count in categories.items()])}\n"
-            analysis += f"- Recent: {events_list[-1].get('title', 'Unknown')} ({events_list[-1].get('location', 'Unknown location')})\n\n"
+            analysis += f"- Recent: {latest.get('title', 'Unknown')} ({latest.get('location', 'Unknown location')})\n\n"
     
     return analysis
 
-def _analyze_trends(events: List[Dict]) -> str:
+def _analyze_trends(view: EventView) -> str:
     """Analyze trends in security events"""
-    if not events:
+    if not view.total:
         return "No events available for trend analysis."
     
-    # Sort events by timestamp
-    sorted_events = sorted(events, key=lambda x: x.get('timestamp', ''))
+    first_seen, last_seen = view.time_range()
     
     analysis = "**Security Trends Analysis**\n\n"
-    analysis += f"- **Total Events Analyzed:** {len(events)}\n"
-    analysis += f"- **Time Range:** {sorted_events[0].get('timestamp', 'Unknown')} to {sorted_events[-1].get('timestamp', 'Unknown')}\n\n"
+    analysis += f"- **Total Events Analyzed:** {view.total}\n"
+    analysis += f"- **Time Range:** {first_seen or 'Unknown'} to {last_seen or 'Unknown'}\n\n"
     
     # Category trends
-    categories = {}
-    for event in events:
-        cat = event.get('category', 'unknown')
-        categories[cat] = categories.get(cat, 0) + 1
+    categories = view.counts("category")
     
     analysis += "**Category Distribution:**\n"
     for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-        percentage = (count / len(events)) * 100
+        percentage = (count / view.total) * 100
         analysis += f"- {cat.title()}: {count} events ({percentage:.1f}%)\n"
     
+    # Daily activity for the most recent days with events
+    daily = list(view.bucket_counts().items())[-7:]
+    if daily:
+        analysis += "\n**Daily Activity:**\n"
+        for day, count in daily:
+            analysis += f"- {day[:10]}: {count} events\n"
+    
     return analysis
 
+ANALYSES = {
+    "summary": _generate_summary,
+    "threat_analysis": _analyze_threats,
+    "regional_focus": _analyze_by_region,
+    "severity_breakdown": _analyze_by_severity,
+    "trend_analysis": _analyze_trends,
+}
+
 # Mount the MCP server to the separate app
 mcp.mount(mcp_app)
 
@@ -338,8 +450,12 @@ async def mcp_root():
         "tools_available": [
             "analyze_security_events",
             "get_event_statistics", 
+            "get_event_trends",
             "get_critical_alerts",
-            "search_events_by_location"
+            "search_events_by_location",
+            "search_events_in_bbox",
+            "search_events_near_point",
+            "search_events_in_feature"
         ]
     }
 
@@ -359,6 +475,11 @@ async def list_mcp_tools():
                 "description": "Get statistical breakdown of security events",
                 "parameters": ["stat_type"]
             },
+            {
+                "name": "get_event_trends",
+                "description": "Get per-day or per-week event counts by category and severity",
+                "parameters": ["interval", "time_period"]
+            },
             {
                 "name": "get_critical_alerts",
                 "description": "Get all critical security alerts",
@@ -368,16 +489,53 @@ async def list_mcp_tools():
                 "name": "search_events_by_location",
                 "description": "Search for security events in a specific location", 
                 "parameters": ["location"]
+            },
+            {
+                "name": "search_events_in_bbox",
+                "description": "Search for security events inside a latitude/longitude bounding box",
+                "parameters": ["min_lat", "min_lon", "max_lat", "max_lon"]
+            },
+            {
+                "name": "search_events_near_point",
+                "description": "Search for security events within a radius in kilometres of a point",
+                "parameters": ["lat", "lon", "radius_km"]
+            },
+            {
+                "name": "search_events_in_feature",
+                "description": "Search for security events inside a named map overlay such as 'High Risk Maritime Zone'",
+                "parameters": ["feature_name", "buffer_km"]
             }
         ]
     }
 
+async def openapi_document() -> Dict[str, Any]:
+    """This app's OpenAPI document, which the chat assistant builds its tool schemas from"""
+    return mcp_app.openapi()
+
+# Endpoints by path with their request model (None for GETs), for in-process callers
+LOCAL_ENDPOINTS = {
+    "analyze-security-events": (analyze_security_events, AnalyzeEventsRequest),
+    "get-event-statistics": (get_event_statistics, StatisticsRequest),
+    "get-event-trends": (get_event_trends, TrendRequest),
+    "get-critical-alerts": (get_critical_alerts, None),
+    "search-events-by-location": (search_events_by_location, LocationSearchRequest),
+    "search-events-in-bbox": (search_events_in_bbox, BBoxSearchRequest),
+    "search-events-near-point": (search_events_near_point, RadiusSearchRequest),
+    "search-events-in-feature": (search_events_in_feature, FeatureSearchRequest),
+    "tools": (list_mcp_tools, None),
+    "openapi.json": (openapi_document, None),
+}
+
 if __name__ == "__main__":
     import uvicorn
     print("Starting MCP Server...")
     print("Available tools:")
     print("- analyze_security_events")
     print("- get_event_statistics")
+    print("- get_event_trends")
     print("- get_critical_alerts") 
     print("- search_events_by_location")
+    print("- search_events_in_bbox")
+    print("- search_events_near_point")
+    print("- search_events_in_feature")
     uvicorn.run(mcp_app, host="0.0.0.0", port=8001) 
\ No newline at end of file
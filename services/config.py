@@ -10,6 +10,33 @@ class Config:
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     
+    # Event storage: "json" (snapshot plus append-only log) or "sqlite"
+    EVENT_STORE_BACKEND = os.getenv("EVENT_STORE_BACKEND", "json").lower()
+    EVENT_DB_PATH = os.getenv("EVENT_DB_PATH", "data/events.db")
+    
+    # Limits for outbound OpenAI calls, shared by all services
+    OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "30000"))
+    OPENAI_MAX_IN_FLIGHT = int(os.getenv("OPENAI_MAX_IN_FLIGHT", "8"))
+    
+    # Web search result cache; keep the TTL below the search agents' 5 minute interval
+    SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "240"))
+    SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    
+    # How the chat assistant reaches the MCP tools: "inprocess" calls them directly on this
+    # process's event store, "http" calls the MCP server at MCP_SERVER_URL
+    MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "inprocess").lower()
+    MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8001")
+    
+    # Seconds the chat assistant waits for any one MCP tool call before giving up on it
+    MCP_TOOL_TIMEOUT_SECONDS = float(os.getenv("MCP_TOOL_TIMEOUT_SECONDS", "10"))
+    
+    # Seconds before the chat assistant refreshes its tool schemas from the MCP server
+    TOOL_SCHEMA_TTL_SECONDS = float(os.getenv("TOOL_SCHEMA_TTL_SECONDS", "600"))
+    
+    # Tool results the chat assistant reuses until the events change
+    TOOL_MEMO_MAX_ENTRIES = int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "256"))
+    
     @classmethod
     def validate(cls):
         """Validate that required environment variables are set"""
@@ -0,0 +1,226 @@
+"""
+Materialized group-by aggregates over a store's events.
+
+EventAggregates is an EventIndex that files every event into a cell keyed by its
+(region, category, severity) and keeps each cell's members in insertion order. The
+statistics and analysis tools read counts, cross-tabulations, first appearances, the
+first or latest events of a severity, time ranges and daily counts by visiting cells
+instead of events, so a tool call costs O(cells) however many events there are. `version` changes whenever the
+aggregates do, for memoizing whatever is rendered from them.
+"""
+
+import heapq
+import itertools
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .event_index import EventIndex
+from .event_store import event_region, get_event_store, parse_time
+
+# (region, category, severity)
+CellKey = Tuple[str, str, str]
+FIELD_POSITIONS = {"region": 0, "category": 1, "severity": 2}
+DAY_SECONDS = 86400
+
+
+def event_day(event: Dict[str, Any]) -> Optional[int]:
+    """Days since the epoch (UTC) of an event's timestamp, or None without a parseable one"""
+    timestamp = parse_time(event.get("timestamp"))
+    return None if timestamp is None else int(timestamp // DAY_SECONDS)
+
+
+def cell_key(event: Dict[str, Any]) -> CellKey:
+    return event_region(event), event.get("category", "unknown"), event.get("severity", "unknown")
+
+
+class _Cell:
+    """Events sharing a region, category and severity"""
+
+    __slots__ = ("members", "days", "_min_time", "_max_time")
+
+    def __init__(self):
+        # Event key -> (insertion order, event), oldest first
+        self.members: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        # Day since the epoch -> member count
+        self.days: Counter = Counter()
+        # Cached timestamp extremes; None means recompute on the next read
+        self._min_time: Optional[str] = None
+        self._max_time: Optional[str] = None
+
+    def add(self, key: Any, order: int, event: Dict[str, Any]):
+        self.members[key] = (order, event)
+        day = event_day(event)
+        if day is not None:
+            self.days[day] += 1
+        timestamp = event.get("timestamp") or ""
+        if self._min_time is not None and timestamp < self._min_time:
+            self._min_time = timestamp
+        if self._max_time is not None and timestamp > self._max_time:
+            self._max_time = timestamp
+
+    def remove(self, key: Any):
+        _, event = self.members.pop(key)
+        day = event_day(event)
+        if day is not None:
+            self.days[day] -= 1
+            if not self.days[day]:
+                del self.days[day]
+        timestamp = event.get("timestamp") or ""
+        if timestamp == self._min_time:
+            self._min_time = None
+        if timestamp == self._max_time:
+            self._max_time = None
+
+    @property
+    def first_order(self) -> int:
+        return next(iter(self.members.values()))[0]
+
+    def time_range(self) -> Tuple[str, str]:
+        if self._min_time is None or self._max_time is None:
+            timestamps = [event.get("timestamp") or "" for _, event in self.members.values()]
+            self._min_time, self._max_time = min(timestamps), max(timestamps)
+        return self._min_time, self._max_time
+
+
+class AggregateView:
+    """
+    Aggregates over a set of cells. Read it inside `with store.synced():` since it
+    looks at the live cells.
+    """
+
+    def __init__(self, cells: List[Tuple[CellKey, _Cell]]):
+        self._cells = cells
+
+    def where(self, field: str, values: Iterable[str]) -> "AggregateView":
+        """The events whose region, category or severity is one of `values`"""
+        position = FIELD_POSITIONS[field]
+        values = set(values)
+        return AggregateView([(key, cell) for key, cell in self._cells if key[position] in values])
+
+    @property
+    def total(self) -> int:
+        return sum(len(cell.members) for _, cell in self._cells)
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Event counts per region, category or severity, in order of first appearance"""
+        position = FIELD_POSITIONS[field]
+        groups: Dict[str, List[int]] = {}
+        for key, cell in self._cells:
+            group = groups.setdefault(key[position], [0, cell.first_order])
+            group[0] += len(cell.members)
+            group[1] = min(group[1], cell.first_order)
+        ordered = sorted(groups.items(), key=lambda item: item[1][1])
+        return {value: count for value, (count, _) in ordered}
+
+    def crosstab(self, field: str, other: str) -> Dict[str, Dict[str, int]]:
+        """Event counts per pair of values of two fields, both in order of first appearance"""
+        position, other_position = FIELD_POSITIONS[field], FIELD_POSITIONS[other]
+        pairs: Dict[Tuple[str, str], List[int]] = {}
+        for key, cell in self._cells:
+            pair = pairs.setdefault((key[position], key[other_position]), [0, cell.first_order])
+            pair[0] += len(cell.members)
+            pair[1] = min(pair[1], cell.first_order)
+
+        table: Dict[str, Dict[str, int]] = {}
+        for (value, other_value), (count, _) in sorted(pairs.items(), key=lambda item: item[1][1]):
+            table.setdefault(value, {})[other_value] = count
+        return table
+
+    def first_events(self, limit: int) -> List[Dict[str, Any]]:
+        """The `limit` earliest added events"""
+        merged = heapq.merge(*(cell.members.values() for _, cell in self._cells), key=itemgetter(0))
+        return [event for _, event in itertools.islice(merged, limit)]
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Every event in the view, in insertion order"""
+        merged = heapq.merge(*(cell.members.values() for _, cell in self._cells), key=itemgetter(0))
+        return [event for _, event in merged]
+
+    def last_event(self) -> Optional[Dict[str, Any]]:
+        """The most recently added event"""
+        latest = max((next(reversed(cell.members.values())) for _, cell in self._cells),
+                     key=itemgetter(0), default=None)
+        return latest[1] if latest else None
+
+    def time_range(self) -> Tuple[str, str]:
+        """Earliest and latest timestamps ("" for events without one)"""
+        ranges = [cell.time_range() for _, cell in self._cells]
+        return min(low for low, _ in ranges), max(high for _, high in ranges)
+
+    def bucket_counts(self) -> Dict[str, int]:
+        """Event counts per UTC day, keyed by the day's start time"""
+        days: Counter = Counter()
+        for _, cell in self._cells:
+            days.update(cell.days)
+        return {
+            datetime.fromtimestamp(day * DAY_SECONDS, timezone.utc).isoformat(): count
+            for day, count in sorted(days.items())
+        }
+
+
+class EventAggregates(EventIndex):
+    """Events grouped by region, category and severity"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._cells: Dict[CellKey, _Cell] = {}
+            # Event key -> its cell
+            self._entries: Dict[Any, CellKey] = {}
+            self._next_order = 0
+            self.version += 1
+
+    def add(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            if key in self._entries:
+                self.remove(event)
+            cell = cell_key(event)
+            self._cells.setdefault(cell, _Cell()).add(key, self._next_order, event)
+            self._entries[key] = cell
+            self._next_order += 1
+            self.version += 1
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            cell = self._entries.pop(key, None)
+            if cell is None:
+                return
+            self._cells[cell].remove(key)
+            if not self._cells[cell].members:
+                del self._cells[cell]
+            self.version += 1
+
+    def view(self) -> AggregateView:
+        """Aggregates over every event"""
+        with self._lock:
+            return AggregateView(list(self._cells.items()))
+
+    @classmethod
+    def of(cls, events: Iterable[Dict[str, Any]]) -> AggregateView:
+        """Aggregates over an arbitrary list of events, e.g. a filtered one"""
+        aggregates = cls()
+        for event in events:
+            aggregates.add(event)
+        return aggregates.view()
+
+
+_aggregates: Dict[int, EventAggregates] = {}
+_aggregates_lock = threading.Lock()
+
+
+def get_event_aggregates(data_file: str = None) -> EventAggregates:
+    """Get the aggregates for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _aggregates_lock:
+        if id(store) not in _aggregates:
+            _aggregates[id(store)] = store.register_index(EventAggregates())
+        return _aggregates[id(store)]
@@ -0,0 +1,145 @@
+"""
+In-process publish/subscribe bus behind the dashboard's push channel (/api/stream).
+
+Publishers (event writes, search agents, health changes) call publish() with a message
+type and a JSON payload. The message is encoded once as a Server-Sent Events frame and
+handed to every subscriber's bounded queue, so a publish costs one put per open
+dashboard and an idle dashboard costs nothing but a parked coroutine. A subscriber
+that falls `max_queue` messages behind is dropped rather than buffering without limit;
+its stream ends with a "dropped" message and the client reconnects and resyncs.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Messages a subscriber may fall behind before it is dropped
+DEFAULT_MAX_QUEUE = 256
+# Seconds of silence after which a stream sends a comment to keep proxies from closing it
+KEEPALIVE_SECONDS = 15
+
+KEEPALIVE_FRAME = ": keepalive\n\n"
+
+
+def sse_frame(message_type: str, data: Any) -> str:
+    """Encode a message as a Server-Sent Events frame"""
+    return f"event: {message_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class Subscription:
+    """One client's queue of encoded frames"""
+
+    def __init__(self, bus: "EventBus", max_queue: int):
+        self.bus = bus
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    def _deliver(self, frame: str):
+        """Queue a frame; runs on the subscriber's event loop"""
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Slow consumer: discard its backlog and end its stream
+            self.dropped = True
+            self.bus.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(sse_frame("dropped", {"reason": "client fell behind"}))
+            self.queue.put_nowait(None)
+            with self.bus._lock:
+                self.bus._dropped_count += 1
+
+    async def frames(self, keepalive: float = KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+        """Yield frames as they arrive, with keepalive comments while idle"""
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE_FRAME
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fan-out of dashboard messages to every open push channel"""
+
+    def __init__(self, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._published_count = 0
+        self._dropped_count = 0
+
+    def subscribe(self) -> Subscription:
+        """Open a subscription; must be called from the event loop that will read it"""
+        subscription = Subscription(self, self.max_queue)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message_type: str, data: Any):
+        """Send a message to every subscriber; safe to call from any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            loop = self._loop
+            self._published_count += 1
+        if not subscribers:
+            return
+        frame = sse_frame(message_type, data)
+
+        def deliver():
+            for subscription in subscribers:
+                subscription._deliver(frame)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            deliver()
+        else:
+            try:
+                loop.call_soon_threadsafe(deliver)
+            except RuntimeError:
+                # The loop has shut down; nobody is listening any more
+                logger.debug(f"Dropping '{message_type}' message published after shutdown")
+
+    def close_all(self):
+        """End every open stream, e.g. on shutdown"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.dropped = True
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published_count,
+                "dropped": self._dropped_count,
+            }
+
+
+# Global instance
+event_bus = EventBus()
@@ -0,0 +1,77 @@
+"""
+Change feed for an event store.
+
+ChangeLog is an EventIndex that numbers every event added to or removed from the
+store with a monotonically increasing sequence number and keeps the most recent
+changes, so a client that has seen sequence N can ask for just what changed since.
+Sequence numbers start from the clock (in microseconds) when the log is created, so
+they keep increasing across server restarts; a client whose N predates the retained
+history, a restart or a full reload of the store is told to reload everything.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from .event_index import EventIndex
+
+# Changes kept for clients catching up
+DEFAULT_MAX_CHANGES = 10000
+
+# (op, event) with op "added" or "deleted"
+Change = Tuple[str, Dict[str, Any]]
+
+
+class ChangeLog(EventIndex):
+    """Sequence-numbered record of recent event additions and deletions"""
+
+    def __init__(self, max_changes: int = DEFAULT_MAX_CHANGES):
+        self.max_changes = max_changes
+        self._lock = threading.RLock()
+        self.seq = time.time_ns() // 1000
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # The store was (re)loaded wholesale; earlier sequence numbers cannot be replayed
+            self.seq += 1
+            self._changes: List[Change] = []
+            # Sequence number of the first retained change is _first_seq
+            self._first_seq = self.seq + 1
+
+    def _record(self, op: str, event: Dict[str, Any]):
+        with self._lock:
+            self.seq += 1
+            self._changes.append((op, event))
+            if len(self._changes) > 2 * self.max_changes:
+                # Trim in bulk so each append stays amortized O(1)
+                dropped = len(self._changes) - self.max_changes
+                del self._changes[:dropped]
+                self._first_seq += dropped
+
+    def add(self, event: Dict[str, Any]):
+        self._record("added", event)
+
+    def remove(self, event: Dict[str, Any]):
+        self._record("deleted", event)
+
+    def since(self, seq: int) -> Dict[str, Any]:
+        """
+        Net changes after sequence number `seq`: the events added (or replaced) and the
+        IDs deleted since then, or {"reset": True} if `seq` is too old to replay
+        """
+        with self._lock:
+            if seq < self._first_seq - 1 or seq > self.seq:
+                return {"seq": self.seq, "reset": True}
+
+            latest: Dict[Any, Change] = {}
+            for op, event in self._changes[seq + 1 - self._first_seq:]:
+                # Re-inserting a key moves it last, so the result keeps change order
+                latest.pop(event.get("id"), None)
+                latest[event.get("id")] = (op, event)
+            return {
+                "seq": self.seq,
+                "reset": False,
+                "added": [event for op, event in latest.values() if op == "added"],
+                "deleted": [key for key, (op, _) in latest.items() if op == "deleted"],
+            }
@@ -0,0 +1,253 @@
+"""
+Columnar analytics over a store's events.
+
+EventColumns is an EventIndex that keeps events as NumPy columns: severity, category
+and region as dictionary-encoded integer codes, timestamps as epoch seconds, plus an
+alive flag per row. Rows are appended in insertion order; deletes clear the alive
+flag and the columns are compacted once half the rows are dead. ColumnView filters
+with boolean masks, counts groups with bincount and buckets times with integer
+division, so the analysis tools scan contiguous arrays instead of dicts.
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .event_index import EventIndex
+from .event_store import event_region, get_event_store, parse_time
+
+FIELDS = ("severity", "category", "region")
+# Time column value for events without a parseable timestamp; sorts before every real time
+MISSING_TIME = np.iinfo(np.int64).min
+# Compact once at least this many rows are dead and they outnumber the live ones
+MIN_COMPACT_ROWS = 1024
+DAY_SECONDS = 86400
+
+
+def field_value(event: Dict[str, Any], field: str) -> Any:
+    return event_region(event) if field == "region" else event.get(field, "unknown")
+
+
+class _Dictionary:
+    """Value <-> integer code mapping for one categorical column"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Iterable[Any]) -> List[int]:
+        """Codes of the values seen so far"""
+        return [self._codes[value] for value in values if value in self._codes]
+
+
+class ColumnView:
+    """
+    A filtered set of rows. Read it inside `with store.synced():` since it looks at
+    the live columns.
+    """
+
+    def __init__(self, columns: "EventColumns", mask: np.ndarray):
+        self._columns = columns
+        self._mask = mask
+
+    def _column(self, field: str) -> np.ndarray:
+        return self._columns._codes[field][:len(self._mask)]
+
+    def _times(self) -> np.ndarray:
+        return self._columns._times[:len(self._mask)]
+
+    def _narrow(self, mask: np.ndarray) -> "ColumnView":
+        return ColumnView(self._columns, self._mask & mask)
+
+    def where(self, field: str, values: Iterable[Any]) -> "ColumnView":
+        """Rows whose severity, category or region is one of `values`"""
+        dictionary = self._columns._dicts[field]
+        table = np.zeros(len(dictionary.values), dtype=bool)
+        table[dictionary.lookup(values)] = True
+        return self._narrow(table[self._column(field)])
+
+    def between(self, start: float = None, end: float = None) -> "ColumnView":
+        """Rows timestamped within [start, end) epoch seconds; either bound may be open"""
+        times = self._times()
+        mask = times != MISSING_TIME
+        if start is not None:
+            mask &= times >= int(np.floor(start))
+        if end is not None:
+            mask &= times < int(np.ceil(end))
+        return self._narrow(mask)
+
+    @property
+    def total(self) -> int:
+        return int(np.count_nonzero(self._mask))
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Row counts per severity, category or region, in order of first appearance"""
+        values = self._columns._dicts[field].values
+        codes = self._column(field)[self._mask]
+        counts = np.bincount(codes, minlength=len(values))
+        first_rows = np.full(len(values), len(codes))
+        np.minimum.at(first_rows, codes, np.arange(len(codes)))
+        present = np.flatnonzero(counts)
+        return {values[code]: int(counts[code]) for code in present[np.argsort(first_rows[present])]}
+
+    def crosstab(self, field: str, other: str) -> Dict[Any, Dict[Any, int]]:
+        """Row counts per pair of values of two fields, both in order of first appearance"""
+        values, other_values = self._columns._dicts[field].values, self._columns._dicts[other].values
+        width = len(other_values)
+        pairs = self._column(field)[self._mask].astype(np.int64) * width + self._column(other)[self._mask]
+        counts = np.bincount(pairs, minlength=len(values) * width)
+        first_rows = np.full(len(counts), len(pairs))
+        np.minimum.at(first_rows, pairs, np.arange(len(pairs)))
+
+        table: Dict[Any, Dict[Any, int]] = {}
+        present = np.flatnonzero(counts)
+        for pair in present[np.argsort(first_rows[present])]:
+            code, other_code = divmod(int(pair), width)
+            table.setdefault(values[code], {})[other_values[other_code]] = int(counts[pair])
+        return table
+
+    def first_events(self, limit: int) -> List[Dict[str, Any]]:
+        """The `limit` earliest added events"""
+        events = self._columns._events
+        return [events[row] for row in np.flatnonzero(self._mask)[:limit]]
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Every event in the view, in insertion order"""
+        events = self._columns._events
+        return [events[row] for row in np.flatnonzero(self._mask)]
+
+    def last_event(self) -> Optional[Dict[str, Any]]:
+        """The most recently added event"""
+        rows = np.flatnonzero(self._mask)
+        return self._columns._events[rows[-1]] if len(rows) else None
+
+    def time_range(self) -> Tuple[str, str]:
+        """Timestamps of the earliest and latest events ("" for an event without one)"""
+        rows = np.flatnonzero(self._mask)
+        if not len(rows):
+            return "", ""
+        times = self._times()[rows]
+        events = self._columns._events
+        first, last = events[rows[np.argmin(times)]], events[rows[np.argmax(times)]]
+        return first.get("timestamp") or "", last.get("timestamp") or ""
+
+    def bucket_counts(self, seconds: int = DAY_SECONDS) -> Dict[str, int]:
+        """Row counts per `seconds`-long time bucket (UTC), keyed by the bucket's start time"""
+        times = self._times()[self._mask]
+        times = times[times != MISSING_TIME]
+        buckets, counts = np.unique(times // seconds, return_counts=True)
+        return {
+            datetime.fromtimestamp(int(bucket) * seconds, timezone.utc).isoformat(): int(count)
+            for bucket, count in zip(buckets, counts)
+        }
+
+
+class EventColumns(EventIndex):
+    """Events as categorical-encoded NumPy columns"""
+
+    def __init__(self, capacity: int = 1024):
+        self._initial_capacity = capacity
+        self._lock = threading.RLock()
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            capacity = self._initial_capacity
+            self._dicts = {field: _Dictionary() for field in FIELDS}
+            self._codes = {field: np.zeros(capacity, dtype=np.int32) for field in FIELDS}
+            self._times = np.zeros(capacity, dtype=np.int64)
+            self._alive = np.zeros(capacity, dtype=bool)
+            # Row -> event (None once deleted), and event key -> row
+            self._events: List[Optional[Dict[str, Any]]] = []
+            self._rows: Dict[Any, int] = {}
+            self._dead = 0
+            self.version += 1
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self):
+        capacity = 2 * len(self._alive)
+        for field in FIELDS:
+            self._codes[field] = np.resize(self._codes[field], capacity)
+        self._times = np.resize(self._times, capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+
+    def add(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            if key in self._rows:
+                self.remove(event)
+            row = len(self._events)
+            if row == len(self._alive):
+                self._grow()
+            for field in FIELDS:
+                self._codes[field][row] = self._dicts[field].encode(field_value(event, field))
+            timestamp = parse_time(event.get("timestamp"))
+            self._times[row] = MISSING_TIME if timestamp is None else int(timestamp // 1)
+            self._alive[row] = True
+            self._events.append(event)
+            self._rows[key] = row
+            self.version += 1
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            row = self._rows.pop(event.get("id"), None)
+            if row is None:
+                return
+            self._alive[row] = False
+            self._events[row] = None
+            self._dead += 1
+            self.version += 1
+            if self._dead >= MIN_COMPACT_ROWS and 2 * self._dead > len(self._events):
+                self._compact()
+
+    def _compact(self):
+        """Drop dead rows, keeping the live ones in insertion order"""
+        keep = np.flatnonzero(self._alive[:len(self._events)])
+        count = len(keep)
+        for field in FIELDS:
+            self._codes[field][:count] = self._codes[field][keep]
+        self._times[:count] = self._times[keep]
+        self._alive[:len(self._events)] = False
+        self._alive[:count] = True
+        self._events = [self._events[row] for row in keep]
+        self._rows = {event.get("id"): row for row, event in enumerate(self._events)}
+        self._dead = 0
+
+    def view(self) -> ColumnView:
+        """Every live event"""
+        with self._lock:
+            return ColumnView(self, self._alive[:len(self._events)].copy())
+
+    def view_of(self, keys: Set[Any]) -> ColumnView:
+        """The live events with the given keys"""
+        with self._lock:
+            mask = np.zeros(len(self._events), dtype=bool)
+            mask[[self._rows[key] for key in keys if key in self._rows]] = True
+            return ColumnView(self, mask)
+
+
+_columns: Dict[int, EventColumns] = {}
+_columns_lock = threading.Lock()
+
+
+def get_event_columns(data_file: str = None) -> EventColumns:
+    """Get the columns for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _columns_lock:
+        if id(store) not in _columns:
+            _columns[id(store)] = store.register_index(EventColumns())
+        return _columns[id(store)]
@@ -0,0 +1,214 @@
+"""
+Near-duplicate detection for ingested events.
+
+Search agents re-run the same terms every few minutes, and the model reports the same
+story with slightly different wording each time. EventDeduplicator is an EventIndex
+over the stored events that recognizes such repeats before they are inserted:
+
+- an exact match on the normalized title, or
+- a MinHash estimate of the Jaccard similarity of the title and description words,
+  with candidates found through LSH buckets rather than by comparing every event,
+
+in both cases only when the events are also close in time and name the same region.
+Checking an incoming event touches a handful of buckets, so it costs about the same
+however many events are stored.
+"""
+
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .event_index import EventIndex
+from .event_store import event_region, get_event_store, parse_time
+
+# Words that say nothing about which story an event is
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or", "by", "with", "from",
+    "near", "as", "is", "are", "was", "were", "be", "been", "has", "have", "had", "after",
+    "amid", "over", "into", "its", "their", "this", "that", "new", "reported", "reports",
+}
+
+# MinHash signature length, split into LSH bands of BAND_ROWS values
+NUM_HASHES = 32
+BAND_ROWS = 2
+# Estimated Jaccard similarity at which two events are the same story
+SIMILARITY_THRESHOLD = 0.5
+# Events further apart than this are separate incidents even if worded alike
+TIME_WINDOW_HOURS = 72
+
+# Hashes are (a * h + b) mod a 31-bit prime, so every product fits in 64 bits and the
+# NUM_HASHES functions can be applied to all of an event's tokens in one array operation
+_MERSENNE_PRIME = (1 << 31) - 1
+# Fixed coefficients so signatures are identical across processes and restarts
+_HASH_PARAMS = np.array([
+    (1 + (zlib.crc32(f"a{i}".encode()) * 2654435761) % (_MERSENNE_PRIME - 1),
+     (zlib.crc32(f"b{i}".encode()) * 40503) % _MERSENNE_PRIME)
+    for i in range(NUM_HASHES)
+], dtype=np.uint64)
+_HASH_A = _HASH_PARAMS[:, :1]
+_HASH_B = _HASH_PARAMS[:, 1:]
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _content_word(word: str) -> Optional[str]:
+    """A lower-cased word with a trailing plural 's' trimmed, or None for a stopword"""
+    if word in STOPWORDS:
+        return None
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) % _MERSENNE_PRIME
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-fold text into content words with a trailing plural 's' trimmed"""
+    words = map(_content_word, _WORD.findall((text or "").lower()))
+    return [word for word in words if word is not None]
+
+
+def minhash(tokens: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a token set"""
+    hashes = np.fromiter(map(_token_hash, tokens or ("",)), dtype=np.uint64)
+    # One row per hash function, one column per token
+    return tuple(((_HASH_A * hashes + _HASH_B) % _MERSENNE_PRIME).min(axis=1).tolist())
+
+
+class _Fingerprint:
+    """What the deduplicator compares for one event"""
+
+    __slots__ = ("title_key", "signature", "region", "time")
+
+    def __init__(self, event: Dict[str, Any]):
+        title_tokens = tokenize(event.get("title", ""))
+        self.title_key = " ".join(title_tokens)
+        self.signature = minhash(set(title_tokens) | set(tokenize(event.get("description", ""))))
+        self.region = " ".join(re.findall(r"\w+", event_region(event).lower()))
+        self.time = parse_time(event.get("timestamp"))
+
+    def bands(self) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(start, self.signature[start:start + BAND_ROWS])
+                for start in range(0, NUM_HASHES, BAND_ROWS)]
+
+    def similarity(self, other: "_Fingerprint") -> float:
+        """Estimated Jaccard similarity of the two events' words"""
+        return sum(a == b for a, b in zip(self.signature, other.signature)) / NUM_HASHES
+
+    def near(self, other: "_Fingerprint", time_window: float) -> bool:
+        """Whether two events are close enough in place and time to be one incident"""
+        if self.region and other.region and self.region != "unknown" and other.region != "unknown":
+            if self.region != other.region:
+                return False
+        if self.time is not None and other.time is not None:
+            return abs(self.time - other.time) <= time_window
+        return True
+
+
+class EventDeduplicator(EventIndex):
+    """Index of stored events' fingerprints for spotting incoming duplicates"""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, time_window_hours: float = TIME_WINDOW_HOURS):
+        self.threshold = threshold
+        self.time_window = time_window_hours * 3600
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._fingerprints: Dict[Any, _Fingerprint] = {}
+            self._titles: Dict[str, Set[Any]] = {}
+            self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[Any]] = {}
+
+    def add(self, event: Dict[str, Any]):
+        with self._lock:
+            self._add(event.get("id"), _Fingerprint(event))
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            fingerprint = self._fingerprints.pop(key, None)
+            if fingerprint is None:
+                return
+            self._discard(self._titles, fingerprint.title_key, key)
+            for band in fingerprint.bands():
+                self._discard(self._buckets, band, key)
+
+    def _add(self, key: Any, fingerprint: _Fingerprint):
+        if key in self._fingerprints:
+            self.remove({"id": key})
+        self._fingerprints[key] = fingerprint
+        self._titles.setdefault(fingerprint.title_key, set()).add(key)
+        for band in fingerprint.bands():
+            self._buckets.setdefault(band, set()).add(key)
+
+    @staticmethod
+    def _discard(table: Dict[Any, Set[Any]], bucket: Any, key: Any):
+        keys = table.get(bucket)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del table[bucket]
+
+    def _match(self, fingerprint: _Fingerprint) -> Optional[Any]:
+        """Get the key of an indexed event that `fingerprint` duplicates"""
+        if fingerprint.title_key:
+            for key in self._titles.get(fingerprint.title_key, ()):
+                if fingerprint.near(self._fingerprints[key], self.time_window):
+                    return key
+
+        candidates: Set[Any] = set()
+        for band in fingerprint.bands():
+            candidates.update(self._buckets.get(band, ()))
+        for key in candidates:
+            other = self._fingerprints[key]
+            if fingerprint.similarity(other) >= self.threshold and fingerprint.near(other, self.time_window):
+                return key
+        return None
+
+    def find_duplicate(self, event: Dict[str, Any]) -> Optional[Any]:
+        """Get the ID of an indexed event that the given event duplicates, if any"""
+        with self._lock:
+            return self._match(_Fingerprint(event))
+
+    def filter_new(self, events: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Split incoming events into the ones worth storing and the repeats.
+
+        Returns (unique events, merged count, dropped count): merged events repeat an
+        earlier event in the same batch, dropped events repeat one already stored.
+        """
+        with self._lock:
+            batch = EventDeduplicator(self.threshold, self.time_window / 3600)
+            unique = []
+            merged = dropped = 0
+            for position, event in enumerate(events):
+                fingerprint = _Fingerprint(event)
+                if self._match(fingerprint) is not None:
+                    dropped += 1
+                elif batch._match(fingerprint) is not None:
+                    merged += 1
+                else:
+                    batch._add(position, fingerprint)
+                    unique.append(event)
+            return unique, merged, dropped
+
+
+_deduplicators: Dict[int, EventDeduplicator] = {}
+_deduplicators_lock = threading.Lock()
+
+
+def get_event_deduplicator(data_file: str = None) -> EventDeduplicator:
+    """Get the deduplication index for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _deduplicators_lock:
+        if id(store) not in _deduplicators:
+            _deduplicators[id(store)] = store.register_index(EventDeduplicator())
+        return _deduplicators[id(store)]
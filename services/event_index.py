@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+
+class EventIndex:
+    """
+    Secondary index over a store's events, kept in step with the store.
+
+    Stores call reset() before (re)loading their events, then add() and remove() for
+    every event that enters or leaves the store, always while holding the store's lock.
+    Read an index inside `with store.synced():` so it reflects the latest writes.
+    """
+
+    def reset(self):
+        """Forget every event"""
+
+    def add(self, event: Dict[str, Any]):
+        """Index an event that entered the store"""
+
+    def remove(self, event: Dict[str, Any]):
+        """Unindex an event that left the store"""
@@ -0,0 +1,443 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import Config
+from .event_changes import ChangeLog
+from .event_index import EventIndex
+from .text_index import TextIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENTS_FILE = "data/mock_events.json"
+
+# Fields supported by count_by()
+GROUP_FIELDS = ("severity", "category", "region")
+
+# Number of log records after which the log is folded back into the snapshot
+DEFAULT_COMPACT_THRESHOLD = 500
+
+
+class EventStore:
+    """
+    In-memory copy of the events data backed by a JSON snapshot plus an append-only log.
+
+    The snapshot (data/mock_events.json) holds the compacted events document. Writes
+    append one JSON line per change to the log next to it ("add" records carry the
+    event, "delete" records are tombstones) so a single-event write costs O(1). Reads
+    replay the snapshot plus whatever was appended to the log since the last read, and
+    the log is compacted into a new snapshot in the background once it grows past
+    `compact_threshold` records.
+    """
+
+    def __init__(self, data_file: str = DEFAULT_EVENTS_FILE, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        self.data_file = Path(data_file)
+        self.log_file = self.data_file.with_name(self.data_file.stem + ".log.jsonl")
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+
+        # Document fields other than "events" are preserved across compactions
+        self._meta: Dict[str, Any] = {}
+        # Events keyed by row number so insertion order survives deletes
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._id_rows: Dict[Any, List[int]] = {}
+        self._next_row = 0
+        self._max_id = 0
+
+        self._snapshot_key: Optional[Tuple[int, int]] = None
+        self._log_offset = 0
+        self._log_records = 0
+        self._log_inode: Optional[int] = None
+        self._loaded = False
+        self._compacting = False
+        # Word index over location, title, tags and description, for location filters
+        self.text_index = TextIndex()
+        # Sequence-numbered adds and deletes, for clients syncing incrementally
+        self.changes = ChangeLog()
+        self._indexes: List[EventIndex] = [self.text_index, self.changes]
+        # Bumped every time the in-memory events change
+        self.version = 0
+
+    @staticmethod
+    def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+        """Identify the current file contents by modification time and size"""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _log_stat(self) -> Tuple[Optional[int], int]:
+        """Get the log file's inode and size"""
+        try:
+            stat = self.log_file.stat()
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def _refresh(self):
+        """Bring the in-memory events up to date with the snapshot and log on disk"""
+        snapshot_key = self._stat_key(self.data_file)
+        log_inode, log_size = self._log_stat()
+        if (self._loaded and snapshot_key == self._snapshot_key
+                and log_inode == self._log_inode and log_size == self._log_offset):
+            return
+
+        with self._lock:
+            snapshot_key = self._stat_key(self.data_file)
+            log_inode, log_size = self._log_stat()
+
+            if not self._loaded or snapshot_key != self._snapshot_key:
+                if self._load_snapshot(snapshot_key):
+                    self._replay_log(0)
+            elif self._log_inode is not None and (log_inode != self._log_inode or log_size < self._log_offset):
+                # The log was compacted away underneath us
+                if self._load_snapshot(snapshot_key):
+                    self._replay_log(0)
+            elif log_size > self._log_offset:
+                self._replay_log(self._log_offset)
+
+    def _load_snapshot(self, snapshot_key: Optional[Tuple[int, int]]) -> bool:
+        """Replace the in-memory events with the snapshot file contents"""
+        if snapshot_key is None:
+            data = {"events": []}
+        else:
+            try:
+                with open(self.data_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except json.JSONDecodeError as e:
+                # Keep serving the last good copy if the file is mid-write
+                logger.error(f"Error parsing events file {self.data_file}: {e}")
+                return False
+
+        self._meta = {k: v for k, v in data.items() if k != "events"}
+        self._rows = {}
+        self._id_rows = {}
+        self._next_row = 0
+        events = data.get("events", [])
+        # Known up front so an ID given to a duplicate never collides with a later event's
+        self._max_id = max((e["id"] for e in events if isinstance(e.get("id"), int)), default=0)
+        for index in self._indexes:
+            index.reset()
+        for event in events:
+            self._insert(event)
+
+        self._snapshot_key = snapshot_key
+        self._log_offset = 0
+        self._log_records = 0
+        self._log_inode = None
+        self._loaded = True
+        self.version += 1
+        return True
+
+    def _replay_log(self, offset: int):
+        """Apply log records appended after `offset`"""
+        try:
+            with open(self.log_file, "rb") as f:
+                self._log_inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                tail = f.read()
+        except FileNotFoundError:
+            self._log_inode = None
+            self._log_offset = 0
+            return
+
+        # Only consume complete lines; a partial trailing line is still being written
+        end = tail.rfind(b"\n") + 1
+        for line in tail[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.error(f"Skipping bad record in {self.log_file}: {e}")
+            self._log_records += 1
+
+        self._log_offset = offset + end
+        if end:
+            self.version += 1
+
+    def _insert(self, event: Dict[str, Any]):
+        """Add an event to the in-memory index"""
+        event_id = event.get("id")
+        if event_id is not None and self._id_rows.get(event_id):
+            if self._rows[self._id_rows[event_id][0]] == event:
+                # A replayed add, e.g. a log record already folded into the snapshot
+                return
+            # Another event has this ID: like apply_batch, give this one the next free ID
+            logger.warning(f"Event ID {event_id} in {self.data_file} was already in use; "
+                           f"renumbering the later event to {self._max_id + 1}")
+            event_id = event["id"] = self._max_id + 1
+
+        row = self._next_row
+        self._next_row += 1
+        self._rows[row] = event
+        for index in self._indexes:
+            index.add(event)
+        self._id_rows.setdefault(event_id, []).append(row)
+        if isinstance(event_id, int):
+            self._max_id = max(self._max_id, event_id)
+
+    def _remove(self, event_id: Any) -> bool:
+        """Remove every event with the given ID from the in-memory index"""
+        rows = self._id_rows.pop(event_id, None)
+        if not rows:
+            return False
+        for row in rows:
+            event = self._rows.pop(row, None)
+            if event is not None:
+                for index in self._indexes:
+                    index.remove(event)
+        return True
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply one log record to the in-memory events"""
+        if record["op"] == "add":
+            self._insert(record["event"])
+        elif record["op"] == "delete":
+            self._remove(record["id"])
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Durably append records that were already applied in memory to the log"""
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, "ab") as f:
+            f.write(lines.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_offset = f.tell()
+            self._log_inode = os.fstat(f.fileno()).st_ino
+
+        self._log_records += len(records)
+        self.version += 1
+
+        if self._log_records >= self.compact_threshold and not self._compacting:
+            self._compacting = True
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error compacting events log {self.log_file}: {e}")
+        finally:
+            self._compacting = False
+
+    def compact(self):
+        """Fold the log into a new snapshot and drop the records it covers"""
+        with self._lock:
+            self._refresh()
+            data = self._document()
+            covered_offset = self._log_offset
+
+        # Serialize outside the lock so writers are not blocked by the full dump
+        tmp_file = self.data_file.with_name(self.data_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._lock:
+            os.replace(tmp_file, self.data_file)
+
+            # Keep records appended while the snapshot was being written
+            try:
+                with open(self.log_file, "rb") as f:
+                    f.seek(covered_offset)
+                    remaining = f.read()
+            except FileNotFoundError:
+                remaining = b""
+            remaining = remaining[:remaining.rfind(b"\n") + 1]
+
+            tmp_log = self.log_file.with_name(self.log_file.name + ".tmp")
+            with open(tmp_log, "wb") as f:
+                f.write(remaining)
+            os.replace(tmp_log, self.log_file)
+
+            self._snapshot_key = self._stat_key(self.data_file)
+            self._log_inode, self._log_offset = self._log_stat()
+            self._log_records = remaining.count(b"\n")
+
+    def _document(self) -> Dict[str, Any]:
+        return {**self._meta, "events": list(self._rows.values())}
+
+    def register_index(self, index: EventIndex) -> EventIndex:
+        """Build an index over the current events and keep it updated from now on"""
+        self._refresh()
+        with self._lock:
+            index.reset()
+            for event in self._rows.values():
+                index.add(event)
+            self._indexes.append(index)
+        return index
+
+    @contextmanager
+    def synced(self) -> Iterator[None]:
+        """Hold the store's lock with the events and registered indexes up to date"""
+        self._refresh()
+        with self._lock:
+            yield
+
+    def load(self) -> Dict[str, Any]:
+        """Get the events document; the events list is a copy callers may modify"""
+        self._refresh()
+        with self._lock:
+            return self._document()
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """Get a copy of the current events list"""
+        self._refresh()
+        with self._lock:
+            return list(self._rows.values())
+
+    def count(self) -> int:
+        """Get the number of current events"""
+        self._refresh()
+        return len(self._rows)
+
+    def apply_batch(self, mutations: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Apply a batch of mutations with a single fsync'd log append.
+
+        Mutations are ("add", [events]) and ("delete", event_id). Added events keep an
+        integer ID that is not in use yet; any other event is given the next free ID.
+        Returns one result per mutation: the stored events for adds and whether the
+        event existed for deletes.
+        """
+        with self._lock:
+            self._refresh()
+            records = []
+            results = []
+            try:
+                for op, arg in mutations:
+                    if op == "add":
+                        for event in arg:
+                            event_id = event.get("id")
+                            if not isinstance(event_id, int) or self._id_rows.get(event_id):
+                                event_id = self._max_id + 1
+                            event["id"] = event_id
+                            record = {"op": "add", "event": event}
+                            self._apply(record)
+                            records.append(record)
+                        results.append(arg)
+                    elif op == "delete":
+                        found = self._remove(arg)
+                        if found:
+                            records.append({"op": "delete", "id": arg})
+                        results.append(found)
+                    else:
+                        raise ValueError(f"Unknown event mutation '{op}'")
+
+                if records:
+                    self._append(records)
+            except Exception:
+                # Memory may be ahead of disk now; rebuild from the files on the next read
+                self._loaded = False
+                raise
+            return results
+
+    def add_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append new events to the log; returns the stored events with their IDs"""
+        return self.apply_batch([("add", events)])[0]
+
+    def delete_event(self, event_id: Any) -> bool:
+        """Append a tombstone for an event; returns False if no such event exists"""
+        return self.apply_batch([("delete", event_id)])[0]
+
+    def save(self, data: Dict[str, Any]):
+        """Replace the whole events document, writing a fresh snapshot and empty log"""
+        with self._lock:
+            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.data_file.with_name(self.data_file.name + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.data_file)
+            if self.log_file.exists():
+                self.log_file.unlink()
+
+            self._load_snapshot(self._stat_key(self.data_file))
+
+    def query_events(self, severity: str = None, category: str = None, location: str = None,
+                     limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Get events matching every given filter.
+
+        Location is a case-insensitive substring that must start on a word boundary
+        ("shang" finds "Shanghai", "hang" does not), looked up in the text index.
+        """
+        self._refresh()
+        with self._lock:
+            if location:
+                keys = self.text_index.match_location(location)
+                rows = sorted(row for key in keys for row in self._id_rows.get(key, ()))
+                events = [self._rows[row] for row in rows]
+            else:
+                events = list(self._rows.values())
+        if severity:
+            events = [e for e in events if e.get('severity') == severity]
+        if category:
+            events = [e for e in events if e.get('category') == category]
+        return events[:limit] if limit else events
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        """Count events grouped by severity, category or region"""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group events by '{field}'")
+        counts: Dict[str, int] = {}
+        for event in self.get_events():
+            key = event_region(event) if field == "region" else event.get(field, 'unknown')
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+
+def parse_time(value: Any) -> Optional[float]:
+    """Parse an ISO timestamp to epoch seconds, treating naive times as UTC"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def event_region(event: Dict[str, Any]) -> str:
+    """Get the region an event is grouped under: the first part of its location"""
+    return event.get('location', 'unknown').split(',')[0]
+
+
+_stores: Dict[str, EventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_event_store(data_file: str = None):
+    """
+    Get the shared store for an events file, creating it on first use.
+
+    Without a file this is the configured default store, which is the SQLite backend
+    when EVENT_STORE_BACKEND=sqlite and the JSON snapshot plus log otherwise.
+    """
+    if data_file is None:
+        if Config.EVENT_STORE_BACKEND == "sqlite":
+            from .sqlite_event_store import get_sqlite_event_store
+            return get_sqlite_event_store(Config.EVENT_DB_PATH)
+        data_file = DEFAULT_EVENTS_FILE
+
+    key = os.path.abspath(data_file)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EventStore(key)
+        return _stores[key]
+
+
+# Global instance
+event_store = get_event_store()
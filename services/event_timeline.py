@@ -0,0 +1,198 @@
+"""
+Time index over a store's events.
+
+EventTimeline is an EventIndex that keeps the parsed timestamps of the store's events
+in a sorted list, so a window such as "the last 7 days" is two binary searches, and a
+histogram of event counts per UTC day by category and severity that is updated as
+events come and go, so daily and weekly trends are read without touching the events.
+Events usually arrive in time order, which makes each sorted insert an append.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from .event_index import EventIndex
+from .event_store import get_event_store, parse_time
+
+DAY_SECONDS = 86400
+INTERVALS = {"day": 1, "week": 7}
+# Epoch day 0 was a Thursday; weeks start on Monday
+_WEEK_OFFSET = 3
+
+PERIOD_UNITS = {
+    "h": 3600, "hour": 3600,
+    "d": DAY_SECONDS, "day": DAY_SECONDS,
+    "w": 7 * DAY_SECONDS, "week": 7 * DAY_SECONDS,
+    "month": 30 * DAY_SECONDS,
+    "y": 365 * DAY_SECONDS, "year": 365 * DAY_SECONDS,
+}
+PERIOD_ALIASES = {"today": "1d", "recent": "7d"}
+# Longest period a window may cover
+MAX_PERIOD_SECONDS = 10 * 365 * DAY_SECONDS
+# Most buckets a trend returns; older ones are left out
+MAX_TREND_BUCKETS = 366
+_PERIOD_PATTERN = re.compile(r"^(?:last|past)?\s*(\d+)?\s*([a-z]+?)s?$")
+
+
+def parse_period(text: str) -> int:
+    """Length in seconds of a period like '24h', '7d', '2 weeks' or 'last 30 days'"""
+    value = text.strip().lower()
+    value = PERIOD_ALIASES.get(value, value)
+    match = _PERIOD_PATTERN.match(value)
+    if not match or match.group(2) not in PERIOD_UNITS:
+        raise ValueError(f"Unrecognised time period '{text}'; use e.g. '24h', '7d', '2w' or 'last 30 days'")
+    seconds = int(match.group(1) or 1) * PERIOD_UNITS[match.group(2)]
+    if seconds > MAX_PERIOD_SECONDS:
+        raise ValueError(f"Time period '{text}' is too long; the longest is 10 years")
+    return seconds
+
+
+def _bucket_start(day: int, interval: str) -> int:
+    """First day of the interval-long bucket containing `day`"""
+    if interval == "week":
+        return day - (day + _WEEK_OFFSET) % 7
+    return day
+
+
+def _ranked(counts: Dict[str, int]) -> Dict[str, int]:
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+
+class EventTimeline(EventIndex):
+    """Sorted event times and a per-day histogram by category and severity"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Parallel lists sorted by time; events without a timestamp are left out
+            self._times: List[float] = []
+            self._keys: List[Any] = []
+            # Event key -> (time, category, severity)
+            self._entries: Dict[Any, Tuple[float, str, str]] = {}
+            # Epoch day -> (category, severity) -> count
+            self._days: Dict[int, Dict[Tuple[str, str], int]] = {}
+            # A (re)load appends times unsorted and sorts them once, on first use
+            self._loading = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _settle(self):
+        """Sort the times appended since the last reset"""
+        if not self._loading:
+            return
+        order = sorted(range(len(self._times)), key=self._times.__getitem__)
+        self._times = [self._times[i] for i in order]
+        self._keys = [self._keys[i] for i in order]
+        self._loading = False
+
+    def add(self, event: Dict[str, Any]):
+        timestamp = parse_time(event.get("timestamp"))
+        if timestamp is None:
+            return
+        key = event.get("id")
+        cell = (event.get("category", "unknown"), event.get("severity", "unknown"))
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            if self._loading or not self._times or timestamp >= self._times[-1]:
+                self._times.append(timestamp)
+                self._keys.append(key)
+            else:
+                position = bisect_left(self._times, timestamp)
+                self._times.insert(position, timestamp)
+                self._keys.insert(position, key)
+            self._entries[key] = (timestamp, *cell)
+            counts = self._days.setdefault(int(timestamp // DAY_SECONDS), {})
+            counts[cell] = counts.get(cell, 0) + 1
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            self._discard(event.get("id"))
+
+    def _discard(self, key: Any):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        timestamp, category, severity = entry
+        self._settle()
+        position = bisect_left(self._times, timestamp)
+        while self._keys[position] != key:
+            position += 1
+        del self._times[position]
+        del self._keys[position]
+
+        day = int(timestamp // DAY_SECONDS)
+        counts = self._days[day]
+        counts[(category, severity)] -= 1
+        if not counts[(category, severity)]:
+            del counts[(category, severity)]
+            if not counts:
+                del self._days[day]
+
+    def keys_between(self, start: float = None, end: float = None) -> List[Any]:
+        """Keys of events timestamped within [start, end) epoch seconds, oldest first"""
+        with self._lock:
+            self._settle()
+            low = 0 if start is None else bisect_left(self._times, start)
+            high = len(self._times) if end is None else bisect_left(self._times, end)
+            return self._keys[low:high]
+
+    def trends(self, interval: str = "day", start: float = None, end: float = None) -> List[Dict[str, Any]]:
+        """
+        Event counts per day or week (UTC, weeks starting Monday) by category and severity,
+        oldest first, for the buckets overlapping [start, end). Buckets run from the first
+        to the last day with events in that range, empty ones included, and only the
+        latest MAX_TREND_BUCKETS are returned.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval '{interval}'; use one of {', '.join(INTERVALS)}")
+        with self._lock:
+            first_day = None if start is None else int(start // DAY_SECONDS)
+            last_day = None if end is None else int(-(-end // DAY_SECONDS)) - 1
+            days = [(day, counts) for day, counts in self._days.items()
+                    if (first_day is None or day >= first_day) and (last_day is None or day <= last_day)]
+        if not days:
+            return []
+
+        step = INTERVALS[interval]
+        last_bucket = _bucket_start(max(day for day, _ in days), interval)
+        # Clamped so one far-off timestamp cannot produce an unbounded run of empty buckets
+        first_bucket = max(_bucket_start(min(day for day, _ in days), interval),
+                           last_bucket - (MAX_TREND_BUCKETS - 1) * step)
+        buckets: Dict[int, Dict[str, Any]] = {}
+        for bucket in range(first_bucket, last_bucket + 1, step):
+            buckets[bucket] = {"by_category": {}, "by_severity": {}}
+        for day, counts in days:
+            bucket = buckets.get(_bucket_start(day, interval))
+            if bucket is None:
+                continue
+            for (category, severity), count in counts.items():
+                bucket["by_category"][category] = bucket["by_category"].get(category, 0) + count
+                bucket["by_severity"][severity] = bucket["by_severity"].get(severity, 0) + count
+
+        return [{
+            "start": datetime.fromtimestamp(bucket * DAY_SECONDS, timezone.utc).date().isoformat(),
+            "total": sum(counts["by_category"].values()),
+            "by_category": _ranked(counts["by_category"]),
+            "by_severity": _ranked(counts["by_severity"]),
+        } for bucket, counts in buckets.items()]
+
+
+_timelines: Dict[int, EventTimeline] = {}
+_timelines_lock = threading.Lock()
+
+
+def get_event_timeline(data_file: str = None) -> EventTimeline:
+    """Get the timeline for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _timelines_lock:
+        if id(store) not in _timelines:
+            _timelines[id(store)] = store.register_index(EventTimeline())
+        return _timelines[id(store)]
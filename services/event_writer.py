@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from .event_store import get_event_store
+
+logger = logging.getLogger(__name__)
+
+# How long the writer waits for more mutations before flushing a batch
+DEFAULT_BATCH_WINDOW = 0.02
+DEFAULT_MAX_BATCH = 500
+
+
+def check_mutation(op: str, arg: Any):
+    """Raise if a mutation is malformed, before it can reach the store"""
+    if op == "add":
+        if not isinstance(arg, list) or not all(isinstance(event, dict) for event in arg):
+            raise TypeError("An 'add' mutation takes a list of event dicts")
+    elif op != "delete":
+        raise ValueError(f"Unknown event mutation '{op}'")
+
+
+class EventWriter:
+    """
+    Single writer for an event store.
+
+    Request handlers and search agents submit mutations to a queue drained by one
+    dedicated thread, so ID assignment never races and no update is lost. Mutations
+    that arrive within `batch_window` seconds of each other are applied as one batch,
+    which the store persists with a single fsync. Callers get a Future that resolves
+    to the mutation's result, including the IDs assigned to new events.
+    """
+
+    def __init__(self, store, batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH):
+        self.store = store
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[str, Any, Future]]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, op: str, arg: Any) -> Future:
+        """Queue a ("add", [events]) or ("delete", event_id) mutation"""
+        future: Future = Future()
+        self._queue.put((op, arg, future))
+        self._ensure_started()
+        return future
+
+    async def add_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add events through the writer queue; returns them with their assigned IDs"""
+        return await asyncio.wrap_future(self.submit("add", events))
+
+    async def delete_event(self, event_id: Any) -> bool:
+        """Delete an event through the writer queue; returns False if it did not exist"""
+        return await asyncio.wrap_future(self.submit("delete", event_id))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, Any, Future]]):
+        """
+        Apply a batch of mutations and resolve their futures. A malformed mutation fails
+        only its own caller; if the store rejects the batch anyway, its mutations are
+        retried one at a time so the rest still go through.
+        """
+        valid = []
+        for op, arg, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                check_mutation(op, arg)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                valid.append((op, arg, future))
+        if not valid:
+            return
+        try:
+            results = self.store.apply_batch([(op, arg) for op, arg, _ in valid])
+        except Exception as e:
+            if len(valid) == 1:
+                logger.error(f"Error writing event mutation: {e}")
+                valid[0][2].set_exception(e)
+                return
+            logger.warning(f"Error writing {len(valid)} event mutations ({e}); retrying them one at a time")
+            for item in valid:
+                self._flush_one(item)
+            return
+        for (_, _, future), result in zip(valid, results):
+            future.set_result(result)
+
+    def _flush_one(self, item: Tuple[str, Any, Future]):
+        op, arg, future = item
+        try:
+            future.set_result(self.store.apply_batch([(op, arg)])[0])
+        except Exception as e:
+            logger.error(f"Error writing event mutation: {e}")
+            future.set_exception(e)
+
+_writers: Dict[int, EventWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(data_file: str = None) -> EventWriter:
+    """Get the writer for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _writers_lock:
+        if id(store) not in _writers:
+            _writers[id(store)] = EventWriter(store)
+        return _writers[id(store)]
+
+
+# Global instance
+event_writer = get_event_writer()
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .openai_client import create_chat_completion
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+
+def normalize_location(location: str) -> str:
+    """Case-fold a location and reduce it to space-separated word tokens"""
+    return " ".join(re.findall(r"\w+", (location or "").lower()))
+
+
+class Geocoder:
+    """
+    Resolve location names to coordinates.
+
+    Lookups try, in order: a persistent cache of earlier answers, the bundled offline
+    gazetteer of countries, major cities and maritime regions (data/gazetteer.json),
+    and finally the LLM. Only a true miss reaches the LLM, and its answer is appended
+    to the cache file so the same place is never asked about twice.
+    """
+
+    def __init__(self, gazetteer_file: str = "data/gazetteer.json",
+                 cache_file: str = "data/geocode_cache.jsonl", model: str = "gpt-4o"):
+        self.gazetteer_file = Path(gazetteer_file)
+        self.cache_file = Path(cache_file)
+        self.model = model
+        self._cache_lock = threading.Lock()
+
+        # Normalized place name or alias -> coordinates
+        self._places: Dict[str, Coordinates] = {}
+        # Longest place name in tokens, bounds the n-grams tried against a location
+        self._max_tokens = 1
+        self._cache: Dict[str, Coordinates] = {}
+        self.stats = {"cache_hits": 0, "gazetteer_hits": 0, "llm_lookups": 0, "misses": 0}
+
+        self._load_gazetteer()
+        self._load_cache()
+
+    def _load_gazetteer(self):
+        try:
+            with open(self.gazetteer_file, "r", encoding="utf-8") as f:
+                places = json.load(f).get("places", [])
+        except FileNotFoundError:
+            logger.warning(f"Gazetteer {self.gazetteer_file} not found; geocoding will rely on the LLM")
+            return
+
+        for place in places:
+            coords = (place["lat"], place["lon"])
+            for name in [place["name"]] + place.get("aliases", []):
+                key = normalize_location(name)
+                self._places.setdefault(key, coords)
+                self._max_tokens = max(self._max_tokens, len(key.split()))
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._cache[entry["location"]] = (entry["lat"], entry["lon"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, key: str, coords: Coordinates):
+        """Add an LLM answer to the in-memory cache and the cache file"""
+        with self._cache_lock:
+            self._cache[key] = coords
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"location": key, "lat": coords[0], "lon": coords[1]}) + "\n")
+            except OSError as e:
+                logger.error(f"Error writing geocode cache {self.cache_file}: {e}")
+
+    def _match_gazetteer(self, key: str) -> Optional[Coordinates]:
+        """Find the longest, then leftmost, run of tokens that names a gazetteer place"""
+        if key in self._places:
+            return self._places[key]
+
+        tokens = key.split()
+        for size in range(min(self._max_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                coords = self._places.get(" ".join(tokens[start:start + size]))
+                if coords is not None:
+                    return coords
+        return None
+
+    def lookup(self, location: str) -> Optional[Coordinates]:
+        """Resolve a location from the cache or gazetteer without calling the LLM"""
+        key = normalize_location(location)
+        if not key:
+            return None
+
+        coords = self._cache.get(key)
+        if coords is not None:
+            self.stats["cache_hits"] += 1
+            return coords
+
+        coords = self._match_gazetteer(key)
+        if coords is not None:
+            self.stats["gazetteer_hits"] += 1
+        return coords
+
+    async def geocode(self, location: str) -> Coordinates:
+        """Resolve a location, falling back to the LLM on a true miss"""
+        return (await self.geocode_many([location]))[location]
+
+    async def geocode_many(self, locations: Iterable[str]) -> Dict[str, Coordinates]:
+        """
+        Resolve a batch of locations with at most one LLM round trip.
+
+        Locations are deduplicated by their normalized form and resolved from the cache
+        and gazetteer first. Every remaining miss goes into a single structured request;
+        any the batch answer leaves out are retried concurrently one by one.
+        Returns coordinates keyed by the original location strings.
+        """
+        results: Dict[str, Coordinates] = {}
+        misses: Dict[str, List[str]] = {}
+        seen = set()
+
+        for location in locations:
+            if location in seen:
+                continue
+            seen.add(location)
+            coords = self.lookup(location)
+            key = normalize_location(location)
+            if coords is not None:
+                results[location] = coords
+            elif key:
+                misses.setdefault(key, []).append(location)
+            else:
+                results[location] = (0.0, 0.0)
+
+        if misses:
+            found = await self._ask_llm_batch({key: group[0] for key, group in misses.items()})
+
+            missing = [key for key in misses if key not in found]
+            if len(misses) > 1 and missing:
+                answers = await asyncio.gather(*(self._ask_llm(misses[key][0]) for key in missing))
+                found.update({key: coords for key, coords in zip(missing, answers) if coords is not None})
+
+            for key, group in misses.items():
+                coords = found.get(key)
+                if coords is not None:
+                    self._remember(key, coords)
+                else:
+                    # Default to center of world map if all else fails
+                    self.stats["misses"] += 1
+                    coords = (0.0, 0.0)
+                for location in group:
+                    results[location] = coords
+
+        return results
+
+    async def _ask_llm_batch(self, locations: Dict[str, str]) -> Dict[str, Coordinates]:
+        """Ask the LLM for several locations' coordinates in one request, keyed like `locations`"""
+        if len(locations) == 1:
+            key, location = next(iter(locations.items()))
+            coords = await self._ask_llm(location)
+            return {key: coords} if coords is not None else {}
+
+        self.stats["llm_lookups"] += 1
+        names = list(locations.values())
+        try:
+            coord_prompt = f"""
+            Provide the approximate latitude and longitude coordinates for each of these locations:
+            {json.dumps(names, ensure_ascii=False)}
+
+            Return a JSON object mapping each location string, exactly as given, to [latitude, longitude].
+            For example: {{"New York": [40.7, -74.0]}}
+
+            If a location is very general or unknown, provide coordinates for the most likely region.
+            """
+
+            response = await create_chat_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a geography expert. Return only valid JSON."},
+                    {"role": "user", "content": coord_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=30 * len(names) + 20,
+                response_format={"type": "json_object"}
+            )
+
+            answer = json.loads(response.choices[0].message.content)
+            found = {}
+            for name, coords in answer.items():
+                key = normalize_location(name)
+                if key in locations and isinstance(coords, list) and len(coords) == 2:
+                    found[key] = (float(coords[0]), float(coords[1]))
+            return found
+
+        except Exception as e:
+            logger.error(f"Error geocoding {len(names)} locations with the LLM: {e}")
+            return {}
+
+    async def _ask_llm(self, location: str) -> Optional[Coordinates]:
+        """Ask the LLM for a location's coordinates"""
+        self.stats["llm_lookups"] += 1
+        try:
+            coord_prompt = f"""
+            Provide the approximate latitude and longitude coordinates for: {location}
+
+            Return only two numbers separated by a comma: latitude,longitude
+            For example: 40.7,-74.0
+
+            If the location is very general or unknown, provide coordinates for the most likely region.
+            """
+
+            response = await create_chat_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are a geography expert. Provide only latitude,longitude coordinates."},
+                    {"role": "user", "content": coord_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=20
+            )
+
+            coords = response.choices[0].message.content.strip().split(',')
+            if len(coords) == 2:
+                return float(coords[0].strip()), float(coords[1].strip())
+
+        except Exception as e:
+            logger.error(f"Error geocoding '{location}' with the LLM: {e}")
+
+        return None
+
+
+# Global instance
+geocoder = Geocoder()
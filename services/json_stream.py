@@ -0,0 +1,83 @@
+import json
+from typing import Any, List
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally parse a JSON array of objects as its text arrives in chunks.
+
+    feed() returns each top-level element the moment its closing brace is seen, so
+    callers can act on element N while the model is still generating element N+1.
+    Text before the opening bracket (such as a ```json fence) is skipped, and a single
+    top-level object instead of an array is returned as one element.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        # Nesting depth at which top-level elements start: 1 inside an array, 0 for a bare object
+        self._element_depth = 1
+        self._depth = 0
+        self._element_start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Any]:
+        """Add a chunk of text; returns the elements completed by it"""
+        if self._finished:
+            return []
+
+        self._buffer += text
+        elements = []
+        buffer = self._buffer
+        i = self._pos
+
+        while i < len(buffer):
+            char = buffer[i]
+
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+                elif char == "{":
+                    self._started = True
+                    self._element_depth = 0
+                    continue  # reprocess as the start of an element
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == self._element_depth:
+                    self._element_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == self._element_depth and self._element_start is not None:
+                    try:
+                        elements.append(json.loads(buffer[self._element_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass  # skip a malformed element and keep going
+                    self._element_start = None
+                elif self._depth < self._element_depth or self._depth == 0:
+                    self._finished = True
+                    break
+            i += 1
+
+        # Drop text that no pending element needs
+        keep_from = self._element_start if self._element_start is not None else i
+        self._buffer = buffer[keep_from:]
+        self._pos = i - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
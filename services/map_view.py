@@ -0,0 +1,419 @@
+"""
+Viewport queries for the map and the event list.
+
+At low zoom the map gets clusters instead of events: ClusterPyramid is an EventIndex
+that keeps per-cell aggregates (count, centroid, counts per category and severity)
+for a grid at every zoom level up to MAX_CLUSTER_ZOOM, each level's cells a quarter
+the size of the previous level's. Adding or removing an event updates one cell per
+level, and a viewport query reads only the cells it overlaps.
+
+Past MAX_CLUSTER_ZOOM, and for the event list, individual events come back in pages
+with keyset pagination: the cursor is the sort key of the last event returned, so
+pages stay stable while events are added or removed. SortedEvents keeps every event's
+key in each sort order, so an unfiltered page is a bisect to the cursor and a slice;
+filtered pages are taken from the filtered events. Counts for the dashboard's header,
+metrics and charts come from summary(), so it never needs every event.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .event_aggregates import AggregateView, EventAggregates, get_event_aggregates
+from .event_index import EventIndex
+from .event_store import get_event_store
+from .spatial_index import Cell, event_coordinates, get_spatial_index, grid_cell, overlapping_cells
+
+# Highest zoom level served as clusters; closer in, the map gets individual events
+MAX_CLUSTER_ZOOM = 7
+# Cluster cells per map tile edge; a cell at zoom z is 360 / (2^z * CELLS_PER_TILE) degrees
+CELLS_PER_TILE = 4
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+# Event orderings for paging; keys must be unique per event, so each ends with the ID
+SORT_KEYS = {
+    # Event IDs grow with insertion, so "newest" is the most recently added
+    "newest": lambda event: (-event["id"],),
+    "oldest": lambda event: (event["id"],),
+    "severity": lambda event: (-SEVERITY_RANK.get(event.get("severity"), 0), -event["id"]),
+}
+
+
+def cluster_cell_degrees(zoom: int) -> float:
+    return 360 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse "west,south,east,north" (Leaflet's toBBoxString) into (min_lat, min_lon,
+    max_lat, max_lon). Longitudes from a wrapped map are folded into -180..180, so
+    the result has min_lon > max_lon when the box crosses the antimeridian.
+    """
+    try:
+        west, south, east, north = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if south > north or west > east:
+        raise ValueError("bbox must be 'west,south,east,north' with west <= east and south <= north")
+    south, north = max(south, -90.0), min(north, 90.0)
+    if east - west >= 360:
+        return south, -180.0, north, 180.0
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    return south, west, north, east
+
+
+def encode_cursor(sort: str, key: Tuple[int, ...]) -> str:
+    return f"{sort}:" + ",".join(str(part) for part in key)
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[int, ...]:
+    """The sort key in a cursor, which must come from a page in the same order"""
+    cursor_sort, _, key = cursor.partition(":")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor '{cursor}' is not for sort '{sort}'")
+    try:
+        return tuple(int(part) for part in key.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+def page_events(events: Iterable[Dict[str, Any]], sort: str = "newest", limit: int = DEFAULT_PAGE_SIZE,
+                cursor: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of events in `sort` order after `cursor`; returns (page, next cursor or None)"""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    key = SORT_KEYS[sort]
+    events = (event for event in events if isinstance(event.get("id"), int))
+    if cursor:
+        after = decode_cursor(sort, cursor)
+        events = (event for event in events if key(event) > after)
+
+    page = heapq.nsmallest(limit + 1, events, key=key)
+    if len(page) > limit:
+        return page[:limit], encode_cursor(sort, key(page[limit - 1]))
+    return page, None
+
+
+class SortedEvents(EventIndex):
+    """Every event's sort key in each of the SORT_KEYS orders"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Sort name -> parallel lists of sort keys, in order, and event IDs;
+            # events without an integer ID are left out
+            self._keys: Dict[str, List[Tuple[int, ...]]] = {sort: [] for sort in SORT_KEYS}
+            self._ids: Dict[str, List[int]] = {sort: [] for sort in SORT_KEYS}
+            # Event ID -> event
+            self._events: Dict[int, Dict[str, Any]] = {}
+            # A (re)load appends keys unsorted and sorts them once, on first use
+            self._loading = True
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _settle(self):
+        """Sort the keys appended since the last reset"""
+        if not self._loading:
+            return
+        for sort, keys in self._keys.items():
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            ids = self._ids[sort]
+            self._keys[sort] = [keys[i] for i in order]
+            self._ids[sort] = [ids[i] for i in order]
+        self._loading = False
+
+    def add(self, event: Dict[str, Any]):
+        event_id = event.get("id")
+        if not isinstance(event_id, int):
+            return
+        with self._lock:
+            if event_id in self._events:
+                self.remove(self._events[event_id])
+            for sort, keys in self._keys.items():
+                key = SORT_KEYS[sort](event)
+                if self._loading or not keys or key > keys[-1]:
+                    keys.append(key)
+                    self._ids[sort].append(event_id)
+                else:
+                    position = bisect_left(keys, key)
+                    keys.insert(position, key)
+                    self._ids[sort].insert(position, event_id)
+            self._events[event_id] = event
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            stored = self._events.pop(event.get("id"), None)
+            if stored is None:
+                return
+            self._settle()
+            for sort, keys in self._keys.items():
+                position = bisect_left(keys, SORT_KEYS[sort](stored))
+                del keys[position]
+                del self._ids[sort][position]
+
+    def page(self, sort: str = "newest", limit: int = DEFAULT_PAGE_SIZE,
+             cursor: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Like page_events over every event, in O(log n + limit)"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        with self._lock:
+            self._settle()
+            keys = self._keys[sort]
+            start = bisect_right(keys, decode_cursor(sort, cursor)) if cursor else 0
+            page = [self._events[event_id] for event_id in self._ids[sort][start:start + limit]]
+            if start + limit < len(keys):
+                return page, encode_cursor(sort, keys[start + limit - 1])
+        return page, None
+
+
+class _Cluster:
+    """Aggregate of the events in one pyramid cell"""
+
+    __slots__ = ("count", "lat_sum", "lon_sum", "breakdown")
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        # (category, severity) -> count
+        self.breakdown: Dict[Tuple[Any, Any], int] = {}
+
+    def update(self, lat: float, lon: float, group: Tuple[Any, Any], delta: int):
+        self.count += delta
+        self.lat_sum += lat * delta
+        self.lon_sum += lon * delta
+        remaining = self.breakdown.get(group, 0) + delta
+        if remaining:
+            self.breakdown[group] = remaining
+        else:
+            self.breakdown.pop(group, None)
+
+    def to_dict(self, cell: Cell, cell_degrees: float, categories: Optional[Set[str]],
+                severities: Optional[Set[str]]) -> Optional[Dict[str, Any]]:
+        by_severity: Dict[str, int] = {}
+        for (category, severity), count in self.breakdown.items():
+            if (categories is None or category in categories) and (severities is None or severity in severities):
+                by_severity[severity] = by_severity.get(severity, 0) + count
+        count = sum(by_severity.values())
+        if not count:
+            return None
+        column, row = cell
+        min_lon, min_lat = column * cell_degrees - 180, row * cell_degrees - 90
+        return {
+            "lat": round(self.lat_sum / self.count, 5),
+            "lon": round(self.lon_sum / self.count, 5),
+            "count": count,
+            "severity": by_severity,
+            "bounds": [min_lat, min_lon, min(min_lat + cell_degrees, 90), min(min_lon + cell_degrees, 180)],
+        }
+
+
+def _event_group(event: Dict[str, Any]) -> Tuple[Any, Any]:
+    return event.get("category"), event.get("severity")
+
+
+class ClusterPyramid(EventIndex):
+    """Per-zoom-level grids of event aggregates"""
+
+    def __init__(self, max_zoom: int = MAX_CLUSTER_ZOOM):
+        self.max_zoom = max_zoom
+        self._cell_degrees = [cluster_cell_degrees(zoom) for zoom in range(max_zoom + 1)]
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._levels: List[Dict[Cell, _Cluster]] = [{} for _ in self._cell_degrees]
+            # Event key -> what was added for it, so removal undoes exactly that
+            self._members: Dict[Any, Tuple[float, float, Tuple[Any, Any]]] = {}
+
+    def _update(self, lat: float, lon: float, group: Tuple[Any, Any], delta: int):
+        for level, cell_degrees in zip(self._levels, self._cell_degrees):
+            cell = grid_cell(cell_degrees, lat, lon)
+            cluster = level.get(cell)
+            if cluster is None:
+                cluster = level[cell] = _Cluster()
+            cluster.update(lat, lon, group, delta)
+            if not cluster.count:
+                del level[cell]
+
+    def add(self, event: Dict[str, Any]):
+        coords = event_coordinates(event)
+        with self._lock:
+            key = event.get("id")
+            if key in self._members:
+                self.remove(event)
+            if coords is None:
+                return
+            member = (coords[0], coords[1], _event_group(event))
+            self._members[key] = member
+            self._update(*member, 1)
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            member = self._members.pop(event.get("id"), None)
+            if member is not None:
+                self._update(*member, -1)
+
+    def clusters(self, zoom: int, bbox: Tuple[float, float, float, float],
+                 categories: Set[str] = None, severities: Set[str] = None) -> List[Dict[str, Any]]:
+        """Aggregates of the cells at `zoom` overlapping a (min_lat, min_lon, max_lat, max_lon) box"""
+        zoom = max(0, min(zoom, self.max_zoom))
+        cell_degrees = self._cell_degrees[zoom]
+        with self._lock:
+            return _cluster_dicts(self._levels[zoom], cell_degrees, bbox, categories, severities)
+
+
+def _cluster_dicts(level: Dict[Cell, _Cluster], cell_degrees: float, bbox: Tuple[float, float, float, float],
+                   categories: Optional[Set[str]], severities: Optional[Set[str]]) -> List[Dict[str, Any]]:
+    min_lat, min_lon, max_lat, max_lon = bbox
+    boxes = [(min_lon, max_lon)] if min_lon <= max_lon else [(min_lon, 180.0), (-180.0, max_lon)]
+    result = []
+    for west, east in boxes:
+        for cell, cluster in overlapping_cells(level, cell_degrees, min_lat, west, max_lat, east):
+            entry = cluster.to_dict(cell, cell_degrees, categories, severities)
+            if entry is not None:
+                result.append(entry)
+    return result
+
+
+def cluster_events(events: Iterable[Dict[str, Any]], zoom: int, bbox: Tuple[float, float, float, float]) -> List[Dict[str, Any]]:
+    """Cluster an already filtered set of events the same way the pyramid does"""
+    cell_degrees = cluster_cell_degrees(max(0, min(zoom, MAX_CLUSTER_ZOOM)))
+    level: Dict[Cell, _Cluster] = {}
+    for event in events:
+        coords = event_coordinates(event)
+        if coords is not None:
+            cell = grid_cell(cell_degrees, *coords)
+            level.setdefault(cell, _Cluster()).update(coords[0], coords[1], _event_group(event), 1)
+    return _cluster_dicts(level, cell_degrees, bbox, None, None)
+
+
+def _split(value: Optional[str]) -> Optional[Set[str]]:
+    """Parse a comma-separated filter; None or empty means no filter"""
+    if not value:
+        return None
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+class MapView:
+    """Answers /api/events viewport and paging queries for one event store"""
+
+    def __init__(self, store, spatial_index, aggregates):
+        self.store = store
+        self.spatial_index = spatial_index
+        self.aggregates = aggregates
+        self.pyramid = store.register_index(ClusterPyramid())
+        self.sorted_events = store.register_index(SortedEvents())
+
+    def query(self, bbox: str = None, zoom: int = None, limit: int = None, cursor: str = None,
+              sort: str = "newest", category: str = None, severity: str = None,
+              region: str = None, search: str = None) -> Dict[str, Any]:
+        """
+        Clusters when `zoom` is at most MAX_CLUSTER_ZOOM, otherwise a page of events.
+        Filters: comma-separated categories and severities, a region (substring of the
+        location) and a search phrase (substring of title, description or location).
+        """
+        box = parse_bbox(bbox) if bbox else None
+        categories, severities = _split(category), _split(severity)
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+        with self.store.synced():
+            if zoom is not None and zoom <= MAX_CLUSTER_ZOOM:
+                box = box or (-90.0, -180.0, 90.0, 180.0)
+                if not region and not search:
+                    clusters = self.pyramid.clusters(zoom, box, categories, severities)
+                else:
+                    events = self._filtered(self.spatial_index.within_bbox(*box), categories, severities, region, search)
+                    clusters = cluster_events(events, zoom, box)
+                return {
+                    "mode": "clusters",
+                    "zoom": zoom,
+                    "clusters": clusters,
+                    "total": sum(cluster["count"] for cluster in clusters),
+                }
+
+            if box is None and categories is None and severities is None and not region and not search:
+                page, next_cursor = self.sorted_events.page(sort, limit, cursor)
+                return {
+                    "mode": "events",
+                    "events": page,
+                    "next_cursor": next_cursor,
+                    "total": len(self.sorted_events),
+                }
+
+            events = self.spatial_index.within_bbox(*box) if box else self.store.get_events()
+            events = self._filtered(events, categories, severities, region, search)
+            page, next_cursor = page_events(events, sort, limit, cursor)
+            return {
+                "mode": "events",
+                "events": page,
+                "next_cursor": next_cursor,
+                "total": len(events),
+            }
+
+    def summary(self, category: str = None, severity: str = None, region: str = None,
+                search: str = None) -> Dict[str, Any]:
+        """
+        Event counts for the dashboard: the total, region count and categories of every
+        event, and the total, per-severity and per-region counts of those matching the
+        filters (which are as for query()).
+        """
+        categories, severities = _split(category), _split(severity)
+        with self.store.synced():
+            everything = self.aggregates.view()
+            if region or search:
+                matching = self._filtered(self.store.get_events(), categories, severities, region, search)
+                view: AggregateView = EventAggregates.of(matching)
+            else:
+                view = everything
+                if categories is not None:
+                    view = view.where("category", categories)
+                if severities is not None:
+                    view = view.where("severity", severities)
+            return {
+                "total": everything.total,
+                "regions": len(everything.counts("region")),
+                "categories": sorted(everything.counts("category")),
+                "filtered": {
+                    "total": view.total,
+                    "by_severity": view.counts("severity"),
+                    "by_region": view.counts("region"),
+                },
+            }
+
+    def _filtered(self, events: List[Dict[str, Any]], categories: Optional[Set[str]], severities: Optional[Set[str]],
+                  region: Optional[str], search: Optional[str]) -> List[Dict[str, Any]]:
+        if categories is not None:
+            events = [e for e in events if e.get("category") in categories]
+        if severities is not None:
+            events = [e for e in events if e.get("severity") in severities]
+        if region:
+            keys = self.store.text_index.match(region, fields=("location",))
+            events = [e for e in events if e.get("id") in keys]
+        if search:
+            keys = self.store.text_index.match(search)
+            events = [e for e in events if e.get("id") in keys]
+        return events
+
+
+_map_views: Dict[int, MapView] = {}
+_map_views_lock = threading.Lock()
+
+
+def get_map_view(data_file: str = None) -> MapView:
+    """Get the map view for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _map_views_lock:
+        if id(store) not in _map_views:
+            _map_views[id(store)] = MapView(store, get_spatial_index(data_file), get_event_aggregates(data_file))
+        return _map_views[id(store)]
@@ -1,126 +1,64 @@
+import asyncio
 import os
-from openai import AsyncOpenAI
+import time
 from typing import Dict, Any, List, AsyncGenerator
 import json
 import httpx
+from .cache import LRUCache
 from .config import Config
+from .openai_client import get_openai_client, create_chat_completion
+from .tool_schemas import ToolSchemaCache
+from .tool_transport import ToolError, get_tool_transport
+
+# Spatial search tools and the MCP server endpoints that run them
+SPATIAL_TOOL_ENDPOINTS = {
+    "search_events_in_bbox": "search-events-in-bbox",
+    "search_events_near_point": "search-events-near-point",
+    "search_events_in_feature": "search-events-in-feature",
+}
+
+_MISSING = object()
+
+# Rounds of tool calls the chat assistant may make before it must answer
+MAX_TOOL_ROUNDS = 3
+
+
+def merge_tool_call_deltas(tool_calls: Dict[int, Dict[str, Any]], deltas) -> None:
+    """
+    Fold a streamed chunk's tool-call deltas into complete calls keyed by index. The ID
+    and name arrive in a call's first delta and its JSON arguments arrive in pieces.
+    """
+    for delta in deltas or []:
+        call = tool_calls.setdefault(delta.index, {"id": None, "type": "function",
+                                                   "function": {"name": "", "arguments": ""}})
+        if delta.id:
+            call["id"] = delta.id
+        if delta.function is not None:
+            call["function"]["name"] += delta.function.name or ""
+            call["function"]["arguments"] += delta.function.arguments or ""
 
 class OpenAIService:
     def __init__(self):
-        # Initialize OpenAI client using configuration
-        self.client = AsyncOpenAI(
-            api_key=Config.get_openai_api_key()
-        )
+        # Shared OpenAI client; requests go through the global rate limiter
+        self.client = get_openai_client()
         self.model = "gpt-4o"
-        self.mcp_server_url = "http://localhost:8001"  # MCP server URL
+        self.mcp_server_url = Config.MCP_SERVER_URL  # MCP server URL
         self.http_client = httpx.AsyncClient()
-        self._cached_tools = None  # Cache for tools to avoid repeated API calls
+        # MCP tools are called in-process or over HTTP, per Config.MCP_TRANSPORT
+        self.tool_transport = get_tool_transport(self.http_client)
+        # Tool results keyed by endpoint, arguments and data version
+        self.tool_results = LRUCache(max_entries=Config.TOOL_MEMO_MAX_ENTRIES)
+        # Tool schemas generated from the MCP server's OpenAPI document
+        self.tool_schemas = ToolSchemaCache(self.tool_transport, self._get_fallback_tools(),
+                                            ttl=Config.TOOL_SCHEMA_TTL_SECONDS,
+                                            timeout=Config.MCP_TOOL_TIMEOUT_SECONDS)
     
     async def get_security_analysis_tools(self):
-        """Dynamically fetch function tools from MCP server and convert to OpenAI format"""
-        if self._cached_tools is not None:
-            return self._cached_tools
-            
-        try:
-            response = await self.http_client.get(f"{self.mcp_server_url}/tools")
-            response.raise_for_status()
-            
-            mcp_tools = response.json()
-            openai_tools = []
-            
-            for tool in mcp_tools.get("tools", []):
-                openai_tool = self._convert_mcp_tool_to_openai_format(tool)
-                openai_tools.append(openai_tool)
-            
-            self._cached_tools = openai_tools
-            return openai_tools
-            
-        except Exception as e:
-            print(f"Warning: Could not fetch tools from MCP server: {str(e)}")
-            # Fallback to basic tools if MCP server is unavailable
-            return self._get_fallback_tools()
-    
-    def _convert_mcp_tool_to_openai_format(self, mcp_tool: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert MCP tool format to OpenAI function format"""
-        tool_name = mcp_tool["name"]
-        description = mcp_tool["description"]
-        parameters = mcp_tool.get("parameters", [])
-        
-        # Define parameter schemas based on tool name and known parameters
-        properties = {}
-        required = []
-        
-        if tool_name == "analyze_security_events":
-            properties = {
-                "query_type": {
-                    "type": "string",
-                    "enum": ["summary", "threat_analysis", "regional_focus", "severity_breakdown", "trend_analysis", "specific_event"],
-                    "description": "Type of analysis to perform"
-                },
-                "region_filter": {
-                    "type": "string",
-                    "description": "Filter events by region/location if specified"
-                },
-                "severity_filter": {
-                    "type": "string",
-                    "enum": ["low", "medium", "high", "critical"],
-                    "description": "Filter events by severity level"
-                },
-                "category_filter": {
-                    "type": "string",
-                    "enum": ["maritime", "climate", "supply-chain"],
-                    "description": "Filter events by category"
-                },
-                "time_period": {
-                    "type": "string",
-                    "description": "Time period for analysis (e.g., 'last 7 days', 'recent')"
-                }
-            }
-            required = ["query_type"]
-            
-        elif tool_name == "get_event_statistics":
-            properties = {
-                "stat_type": {
-                    "type": "string",
-                    "enum": ["count_by_severity", "count_by_region", "count_by_category", "recent_trends"],
-                    "description": "Type of statistics to generate"
-                }
-            }
-            required = ["stat_type"]
-            
-        elif tool_name == "get_critical_alerts":
-            properties = {
-                "limit": {
-                    "type": "integer",
-                    "description": "Maximum number of alerts to return (default: 5)"
-                }
-            }
-            required = []
-            
-        elif tool_name == "search_events_by_location":
-            properties = {
-                "location": {
-                    "type": "string",
-                    "description": "Location to search for events"
-                }
-            }
-            required = ["location"]
-        
-        return {
-            "type": "function",
-            "function": {
-                "name": tool_name,
-                "description": description,
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                    "required": required
-                }
-            }
-        }
+        """Function tools for the MCP server's tools; never waits on a remote server"""
+        return await self.tool_schemas.get()
     
     def _get_fallback_tools(self):
-        """Fallback tools if MCP server is unavailable"""
+        """Fallback tools until the MCP server's schemas have been fetched"""
         return [
             {
                 "type": "function",
@@ -142,7 +80,7 @@ class OpenAIService:
             }
         ]
 
-    async def analyze_security_events(self, events_data: List[Dict], query_type: str, **filters) -> str:
+    async def analyze_security_events(self, query_type: str, **filters) -> str:
         """Analyze security events using MCP server"""
         try:
             # Build payload, excluding None values
@@ -158,83 +96,142 @@ class OpenAIService:
             if filters.get('time_period'):
                 payload["time_period"] = filters.get('time_period')
             
-            response = await self.http_client.post(
-                f"{self.mcp_server_url}/analyze-security-events",
-                json=payload
-            )
-            response.raise_for_status()
-            
             # MCP server returns analysis string directly
-            result = response.json()
+            result = await self._call_mcp("analyze-security-events", payload)
             if isinstance(result, str):
                 return result
             else:
                 return result.get("analysis", "No analysis available")
             
-        except httpx.HTTPStatusError as e:
-            error_detail = ""
-            try:
-                error_detail = e.response.text
-            except:
-                pass
-            return f"HTTP {e.response.status_code} error calling MCP server: {error_detail}"
+        except ToolError as e:
+            return f"HTTP {e.status_code} error calling MCP server: {e.detail}"
         except Exception as e:
             return f"Error calling MCP server for analysis: {str(e)}"
     
-    async def get_event_statistics(self, events_data: List[Dict], stat_type: str) -> Dict[str, Any]:
+    async def get_event_statistics(self, stat_type: str) -> Dict[str, Any]:
         """Get event statistics using MCP server"""
         try:
             payload = {
                 "stat_type": stat_type
             }
             
-            response = await self.http_client.post(
-                f"{self.mcp_server_url}/get-event-statistics",
-                json=payload
-            )
-            response.raise_for_status()
-            
             # MCP server returns statistics dict directly
-            return response.json()
+            return await self._call_mcp("get-event-statistics", payload)
             
         except Exception as e:
             return {"error": f"Error calling MCP server for statistics: {str(e)}"}
     
-    async def get_critical_alerts(self, events_data: List[Dict], limit: int = 5) -> List[Dict]:
-        """Get critical alerts using MCP server"""
+    async def get_event_trends(self, **payload) -> Dict[str, Any]:
+        """Get per-day or per-week event counts using MCP server"""
         try:
-            response = await self.http_client.get(
-                f"{self.mcp_server_url}/get-critical-alerts"
-            )
-            response.raise_for_status()
+            # MCP server returns the trend buckets directly
+            return await self._call_mcp("get-event-trends", payload)
             
+        except Exception as e:
+            return {"error": f"Error calling MCP server for trends: {str(e)}"}
+    
+    async def get_critical_alerts(self, limit: int = 5) -> List[Dict]:
+        """Get critical alerts using MCP server"""
+        try:
             # MCP server returns alerts list directly
-            return response.json()
+            return await self._call_mcp("get-critical-alerts")
             
         except Exception as e:
             return [{"error": f"Error calling MCP server for critical alerts: {str(e)}"}]
     
-    async def search_events_by_location(self, events_data: List[Dict], location: str) -> List[Dict]:
+    async def search_events_by_location(self, location: str) -> List[Dict]:
         """Search events by location using MCP server"""
         try:
             payload = {
                 "location": location
             }
             
-            response = await self.http_client.post(
-                f"{self.mcp_server_url}/search-events-by-location",
-                json=payload
-            )
-            response.raise_for_status()
-            
             # MCP server returns events list directly
-            return response.json()
+            return await self._call_mcp("search-events-by-location", payload)
             
         except Exception as e:
             return [{"error": f"Error calling MCP server for location search: {str(e)}"}]
 
-    async def chat_completion_stream(self, message: str, context: str = None, events_data: List[Dict] = None) -> AsyncGenerator[str, None]:
-        """Streaming chat completion with function calling support using MCP server"""
+    async def search_events_in_area(self, endpoint: str, **payload) -> List[Dict]:
+        """Run one of the spatial searches (bbox, radius or geo feature) using MCP server"""
+        try:
+            # MCP server returns events list directly
+            return await self._call_mcp(endpoint, payload)
+            
+        except Exception as e:
+            return [{"error": f"Error calling MCP server for spatial search: {str(e)}"}]
+
+    async def _call_mcp(self, endpoint: str, payload: Dict[str, Any] = None) -> Any:
+        """
+        Call an MCP endpoint, reusing the result of an identical earlier call while the
+        events are unchanged (and, for windows relative to now, for up to a minute);
+        failed calls are not remembered
+        """
+        version = self.tool_transport.data_version()
+        if version is None:
+            return await self.tool_transport.call(endpoint, payload)
+        
+        key = (endpoint, json.dumps(payload, sort_keys=True), version)
+        if payload and payload.get("time_period"):
+            key += (int(time.time() // 60),)
+        result = self.tool_results.get(key, _MISSING)
+        if result is _MISSING:
+            result = await self.tool_transport.call(endpoint, payload)
+            self.tool_results.set(key, result)
+        return result
+
+    async def _call_tool(self, function_name: str, function_args: Dict[str, Any]) -> str:
+        """Run one tool against the MCP server; returns the content of the tool message"""
+        if function_name == "analyze_security_events":
+            return await self.analyze_security_events(**function_args)
+        elif function_name == "get_event_statistics":
+            stats = await self.get_event_statistics(**function_args)
+            return json.dumps(stats)
+        elif function_name == "get_event_trends":
+            trends = await self.get_event_trends(**function_args)
+            return json.dumps(trends)
+        elif function_name == "get_critical_alerts":
+            alerts = await self.get_critical_alerts(**function_args)
+            return json.dumps(alerts)
+        elif function_name == "search_events_by_location":
+            events = await self.search_events_by_location(**function_args)
+            return json.dumps(events)
+        elif function_name in SPATIAL_TOOL_ENDPOINTS:
+            events = await self.search_events_in_area(SPATIAL_TOOL_ENDPOINTS[function_name], **function_args)
+            return json.dumps(events)
+        return "Function not found"
+
+    async def _run_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run the model's tool calls concurrently, each under its own timeout, and return
+        one tool message per call in call order, so a slow tool only delays itself
+        """
+        timeout = Config.MCP_TOOL_TIMEOUT_SECONDS
+        
+        async def run(tool_call: Dict[str, Any]) -> Dict[str, Any]:
+            function_name = tool_call["function"]["name"]
+            try:
+                function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+                result = await asyncio.wait_for(self._call_tool(function_name, function_args), timeout)
+            except asyncio.TimeoutError:
+                result = f"Error: {function_name} did not respond within {timeout:g} seconds"
+            except Exception as e:
+                result = f"Error running {function_name}: {str(e)}"
+            return {
+                "tool_call_id": tool_call["id"],
+                "role": "tool",
+                "name": function_name,
+                "content": result
+            }
+        
+        return await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+
+    async def chat_completion_stream(self, message: str, context: str = None,
+                                     use_tools: bool = False) -> AsyncGenerator[str, None]:
+        """
+        Streaming chat completion with function calling support using MCP server. The
+        tools are offered when `use_tools` is set.
+        """
         try:
             system_prompt = """You are an AI assistant for a Global Security Insights Platform. 
             You provide analysis on:
@@ -258,70 +255,36 @@ class OpenAIService:
             
             messages.append({"role": "user", "content": message})
             
-            # Use function calling if events data is available
-            if events_data:
-                tools = await self.get_security_analysis_tools()  # Now dynamically fetched
+            # Use function calling if there are events to analyze
+            tools = await self.get_security_analysis_tools() if use_tools else None
+            
+            # One streamed request per round: text is passed through as it arrives, and
+            # tool calls are assembled from their deltas, run, and answered in the next round
+            for round_number in range(MAX_TOOL_ROUNDS + 1):
+                request = {"model": self.model, "messages": messages, "temperature": 0.7, "stream": True}
+                if tools and round_number < MAX_TOOL_ROUNDS:
+                    request.update(tools=tools, tool_choice="auto")
+                stream = await create_chat_completion(max_tokens=800 if tools else 500, **request)
                 
-                # First, check if we need to call functions
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=tools,
-                    tool_choice="auto",
-                    max_tokens=50  # Small response to check for function calls
-                )
+                content = []
+                tool_calls: Dict[int, Dict[str, Any]] = {}
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content.append(delta.content)
+                        yield delta.content
+                    merge_tool_call_deltas(tool_calls, delta.tool_calls)
                 
-                # Handle function calls using MCP server
-                if response.choices[0].message.tool_calls:
-                    messages.append(response.choices[0].message)
-                    
-                    for tool_call in response.choices[0].message.tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        
-                        if function_name == "analyze_security_events":
-                            result = await self.analyze_security_events(events_data, **function_args)
-                        elif function_name == "get_event_statistics":
-                            stats = await self.get_event_statistics(events_data, **function_args)
-                            result = json.dumps(stats)
-                        elif function_name == "get_critical_alerts":
-                            alerts = await self.get_critical_alerts(events_data, **function_args)
-                            result = json.dumps(alerts)
-                        elif function_name == "search_events_by_location":
-                            events = await self.search_events_by_location(events_data, **function_args)
-                            result = json.dumps(events)
-                        else:
-                            result = "Function not found"
-                        
-                        messages.append({
-                            "tool_call_id": tool_call.id,
-                            "role": "tool",
-                            "name": function_name,
-                            "content": result
-                        })
+                if not tool_calls:
+                    return
                 
-                # Now stream the final response
-                stream = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=800,
-                    temperature=0.7,
-                    stream=True
-                )
-            else:
-                # Regular streaming without function calls
-                stream = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=500,
-                    temperature=0.7,
-                    stream=True
-                )
-            
-            async for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    yield chunk.choices[0].delta.content
-                    
+                # Handle function calls using MCP server, all at once
+                calls = [tool_calls[index] for index in sorted(tool_calls)]
+                messages.append({"role": "assistant", "content": "".join(content) or None, "tool_calls": calls})
+                messages.extend(await self._run_tool_calls(calls))
+
         except Exception as e:
             yield f"Error generating response: {str(e)}"
     
@@ -348,7 +311,7 @@ class OpenAIService:
             
             messages.append({"role": "user", "content": message})
             
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model=self.model,
                 messages=messages,
                 max_tokens=500,
@@ -375,7 +338,7 @@ Focus on:
 
 Keep the summary under 300 words and use professional intelligence language."""
 
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a senior intelligence analyst."},
@@ -412,7 +375,7 @@ Keep the summary under 300 words and use professional intelligence language."""
                 }
             ]
             
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an AI security analyst. Use the provided tools to analyze threats."},
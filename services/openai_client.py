@@ -0,0 +1,93 @@
+"""
+Shared OpenAI client.
+
+All services use one AsyncOpenAI client (and so one HTTP connection pool), and every
+request goes through the global rate limiter in services.rate_limiter.
+"""
+
+from typing import Any, AsyncIterator, Optional
+
+from openai import AsyncOpenAI
+
+from .config import Config
+from .rate_limiter import Grant, RateLimiter, estimate_tokens
+
+# Flat token estimate for a Whisper transcription request
+TRANSCRIPTION_TOKENS = 1000
+
+_client: Optional[AsyncOpenAI] = None
+
+# Global instance
+openai_limiter = RateLimiter(
+    requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+    max_in_flight=Config.OPENAI_MAX_IN_FLIGHT,
+)
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared OpenAI client"""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key=Config.get_openai_api_key())
+    return _client
+
+
+class LimitedStream:
+    """
+    A streamed completion that holds its rate-limiter slot until it has been read to the
+    end or closed, so long-running streams count against the in-flight cap
+    """
+
+    def __init__(self, stream: Any, grant: Grant):
+        self._stream = stream
+        self._grant: Optional[Grant] = grant
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        try:
+            async for chunk in self._stream:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None and self._grant is not None:
+                    self._grant.actual_tokens = usage.total_tokens
+                yield chunk
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop the stream and give its slot back; safe to call more than once"""
+        if self._grant is None:
+            return
+        grant, self._grant = self._grant, None
+        openai_limiter.release(grant)
+        close = getattr(self._stream, "close", None) or getattr(self._stream, "aclose", None)
+        if close is not None:
+            await close()
+
+
+async def create_chat_completion(**kwargs) -> Any:
+    """
+    Rate-limited chat.completions.create; priority comes from the calling task. A streamed
+    response is returned as a LimitedStream that keeps its slot while it is being read.
+    """
+    tokens = estimate_tokens(kwargs.get("messages"), kwargs.get("max_tokens"))
+    if kwargs.get("stream"):
+        grant = await openai_limiter.acquire(tokens)
+        try:
+            stream = await get_openai_client().chat.completions.create(**kwargs)
+        except BaseException:
+            openai_limiter.release(grant)
+            raise
+        return LimitedStream(stream, grant)
+
+    async with openai_limiter.limit(tokens) as grant:
+        response = await get_openai_client().chat.completions.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            grant.actual_tokens = usage.total_tokens
+        return response
+
+
+async def create_transcription(**kwargs) -> Any:
+    """Rate-limited audio.transcriptions.create"""
+    async with openai_limiter.limit(TRANSCRIPTION_TOKENS):
+        return await get_openai_client().audio.transcriptions.create(**kwargs)
@@ -0,0 +1,196 @@
+"""
+Rate limiting for outbound OpenAI calls.
+
+Every OpenAI request made by the platform goes through one RateLimiter, which enforces
+a requests-per-minute and a tokens-per-minute token bucket plus a cap on requests in
+flight. Waiting callers are queued in priority lanes: interactive work (chat, uploads,
+user-started searches) is always granted before background search agents.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Priority of OpenAI calls made by the current task; search agents switch to BACKGROUND
+current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "openai_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def background_priority():
+    """Run the enclosed OpenAI calls in the background lane"""
+    token = current_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]] = None, max_tokens: Optional[int] = None) -> int:
+    """Rough token estimate for a request: about 4 characters per token plus the completion budget"""
+    chars = 0
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            # Multimodal content; images are billed at a flat rate we approximate here
+            for part in content:
+                chars += len(part.get("text", "")) if part.get("type") == "text" else 3000
+    return chars // 4 + (max_tokens or 1000)
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `per_minute` units"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the bucket wait for a full one)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+
+class Grant:
+    """A granted request slot; set `actual_tokens` once usage is known to correct the estimate"""
+
+    __slots__ = ("priority", "tokens", "actual_tokens", "queued_at", "granted_at")
+
+    def __init__(self, priority: Priority, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.actual_tokens: Optional[int] = None
+        self.queued_at = time.monotonic()
+        self.granted_at: Optional[float] = None
+
+
+class RateLimiter:
+    """Token-bucket limiter with an in-flight cap and strict priority lanes"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_in_flight: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._granted = {p: 0 for p in Priority}
+        self._wait_seconds = {p: 0.0 for p in Priority}
+
+    async def acquire(self, tokens: int, priority: Priority = None) -> Grant:
+        """Wait for a request slot and budget for `tokens` tokens"""
+        grant = Grant(current_priority.get() if priority is None else priority, tokens)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (grant.priority, next(self._sequence), grant, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled; hand the slot back
+                self.release(grant)
+            else:
+                self._waiters = [w for w in self._waiters if w[3] is not future]
+                heapq.heapify(self._waiters)
+            raise
+        return grant
+
+    def release(self, grant: Grant):
+        """Return a request slot and settle the token estimate against actual usage"""
+        self.in_flight -= 1
+        if grant.actual_tokens is not None:
+            difference = grant.tokens - grant.actual_tokens
+            if difference > 0:
+                self.tokens.give_back(difference)
+            else:
+                self.tokens.take(-difference)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def limit(self, tokens: int, priority: Priority = None):
+        grant = await self.acquire(tokens, priority)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def _dispatch(self):
+        """Grant waiting requests in priority order while capacity allows"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            _, _, grant, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= self.max_in_flight:
+                return  # the next release() dispatches again
+
+            # The head waiter blocks lower lanes so background work cannot starve chat
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(grant.tokens))
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(grant.tokens)
+            self.in_flight += 1
+            grant.granted_at = time.monotonic()
+            self._granted[grant.priority] += 1
+            self._wait_seconds[grant.priority] += grant.granted_at - grant.queued_at
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and wait times per lane"""
+        lanes = {}
+        for priority in Priority:
+            granted = self._granted[priority]
+            lanes[priority.name.lower()] = {
+                "queued": sum(1 for w in self._waiters if w[0] == priority and not w[3].done()),
+                "granted": granted,
+                "avg_wait_seconds": round(self._wait_seconds[priority] / granted, 3) if granted else 0.0,
+            }
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests_available": int(self.requests.available),
+            "tokens_available": int(self.tokens.available),
+            "lanes": lanes,
+        }
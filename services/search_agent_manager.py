@@ -1,110 +1,148 @@
 import asyncio
-import json
+import heapq
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Set
-import threading
 import time
-from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
 
-from services.web_search_agent import WebSearchAgent
+from services.web_search_agent import web_search_agent
+from services.event_store import event_store
+from services.rate_limiter import background_priority
+from services.event_bus import event_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Delay before an agent's first search, to avoid a burst right after deployment
+INITIAL_DELAY_SECONDS = 5
+# Time between searches for the same term (5 minutes)
+SEARCH_INTERVAL_SECONDS = 300
+# Time before retrying a term whose search failed
+RETRY_INTERVAL_SECONDS = 30
+# Searches allowed to run at the same time across all agents
+MAX_CONCURRENT_SEARCHES = 10
+
+
+class SearchAgent:
+    """State for one search term; agents are plain objects driven by the scheduler"""
+
+    __slots__ = ('term', 'status', 'events_found', 'deployed_at', 'last_search', 'next_run', 'task')
+
+    def __init__(self, term: str):
+        self.term = term
+        self.status = 'active'
+        self.events_found = 0
+        self.deployed_at = datetime.now().isoformat()
+        self.last_search: Optional[str] = None
+        self.next_run = time.monotonic() + INITIAL_DELAY_SECONDS
+        self.task: Optional[asyncio.Task] = None
+
+
 class SearchAgentManager:
-    def __init__(self):
-        self.active_agents: Dict[str, dict] = {}
-        self.agent_threads: Dict[str, threading.Thread] = {}
-        self.stop_flags: Dict[str, threading.Event] = {}
-        self.web_search_agent = WebSearchAgent()
-        self.data_file = Path("data/mock_events.json")
+    """
+    Runs continuous web searches for deployed terms on the application's event loop.
+
+    A single scheduler task keeps a heap of agents ordered by their next run time and
+    starts due searches as tasks, with at most MAX_CONCURRENT_SEARCHES in flight. Idle
+    agents cost nothing but a heap entry, and every search shares one WebSearchAgent
+    and its connection pool.
+    """
+
+    def __init__(self, max_concurrent_searches: int = MAX_CONCURRENT_SEARCHES):
+        self.active_agents: Dict[str, SearchAgent] = {}
+        self.web_search_agent = web_search_agent
+        self.event_store = event_store
+        # Keeps a live match count per deployed term
+        self.text_index = event_store.text_index
         self.last_event_counts: Dict[str, int] = {}
-        
+        self.max_concurrent_searches = max_concurrent_searches
+
+        self._schedule: List[Tuple[float, int, SearchAgent]] = []
+        self._schedule_seq = 0
+        self._running: Set[asyncio.Task] = set()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._search_slots: Optional[asyncio.Semaphore] = None
+
+    def _ensure_scheduler(self):
+        """Start the scheduler task on the running event loop if it is not running"""
+        if self._scheduler_task is not None and not self._scheduler_task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._search_slots = asyncio.Semaphore(self.max_concurrent_searches)
+        self._scheduler_task = asyncio.get_running_loop().create_task(self._run_scheduler())
+
+    def _schedule_agent(self, agent: SearchAgent, delay: float = None):
+        """Queue an agent's next search"""
+        if delay is not None:
+            agent.next_run = time.monotonic() + delay
+        self._schedule_seq += 1
+        heapq.heappush(self._schedule, (agent.next_run, self._schedule_seq, agent))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
     def deploy_agents(self, search_terms: List[str]) -> dict:
-        """Deploy search agents for the given terms"""
+        """Deploy search agents for the given terms; must be called from the event loop"""
         try:
+            self._ensure_scheduler()
             deployed_count = 0
-            
+
             for term in search_terms:
                 if term not in self.active_agents:
-                    # Create stop flag for this agent
-                    stop_flag = threading.Event()
-                    self.stop_flags[term] = stop_flag
-                    
-                    # Create and start agent thread
-                    agent_thread = threading.Thread(
-                        target=self._run_agent,
-                        args=(term, stop_flag),
-                        daemon=True
-                    )
-                    
-                    # Store agent info
-                    self.active_agents[term] = {
-                        'term': term,
-                        'status': 'active',
-                        'events_found': 0,
-                        'deployed_at': datetime.now().isoformat(),
-                        'last_search': None
-                    }
-                    
-                    self.agent_threads[term] = agent_thread
+                    agent = SearchAgent(term)
+                    self.active_agents[term] = agent
                     self.last_event_counts[term] = 0
-                    
-                    # Start the agent
-                    agent_thread.start()
+                    self.text_index.watch(term)
+                    self._schedule_agent(agent)
                     deployed_count += 1
-                    
+
                     logger.info(f"Deployed search agent for term: {term}")
-            
+
+            if deployed_count:
+                self._publish_agents()
             return {
                 'success': True,
                 'deployed_count': deployed_count,
                 'total_active': len(self.active_agents)
             }
-            
+
         except Exception as e:
             logger.error(f"Error deploying agents: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
     def stop_all_agents(self) -> dict:
         """Stop all active search agents"""
         try:
-            stopped_count = 0
-            
-            # Set stop flags for all agents
-            for term in list(self.active_agents.keys()):
-                if term in self.stop_flags:
-                    self.stop_flags[term].set()
-                stopped_count += 1
-            
-            # Wait a moment for threads to stop gracefully
-            time.sleep(1)
-            
+            stopped_count = len(self.active_agents)
+
+            for agent in self.active_agents.values():
+                self._stop(agent)
+                self.text_index.unwatch(agent.term)
+
             # Clear all agent data
             self.active_agents.clear()
-            self.agent_threads.clear()
-            self.stop_flags.clear()
             self.last_event_counts.clear()
-            
+            self._schedule.clear()
+
             logger.info(f"Stopped {stopped_count} search agents")
-            
+            self._publish_agents()
+
             return {
                 'success': True,
                 'stopped_count': stopped_count
             }
-            
+
         except Exception as e:
             logger.error(f"Error stopping agents: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
     def stop_single_agent(self, search_term: str) -> dict:
         """Stop a single search agent"""
         try:
@@ -113,164 +151,152 @@ class SearchAgentManager:
                     'success': False,
                     'error': f'Agent for term "{search_term}" not found'
                 }
-            
-            # Set stop flag
-            if search_term in self.stop_flags:
-                self.stop_flags[search_term].set()
-            
-            # Remove from tracking
-            self.active_agents.pop(search_term, None)
-            self.agent_threads.pop(search_term, None)
-            self.stop_flags.pop(search_term, None)
+
+            # Its heap entry is skipped once the agent is no longer active
+            self._stop(self.active_agents.pop(search_term))
+            self.text_index.unwatch(search_term)
             self.last_event_counts.pop(search_term, None)
-            
+
             logger.info(f"Stopped search agent for term: {search_term}")
-            
+            self._publish_agents()
+
             return {
                 'success': True,
                 'remaining_agents': len(self.active_agents)
             }
-            
+
         except Exception as e:
             logger.error(f"Error stopping single agent: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-    
+
+    def _stop(self, agent: SearchAgent):
+        """Mark an agent stopped and cancel its in-flight search"""
+        agent.status = 'stopped'
+        if agent.task is not None and not agent.task.done():
+            agent.task.cancel()
+
+    def _publish_agents(self):
+        """Push the agents' current state to open dashboards"""
+        event_bus.publish("agents", {
+            'agents': [{
+                'term': agent.term,
+                'status': agent.status,
+                'events_found': agent.events_found,
+                'deployed_at': agent.deployed_at,
+                'last_search': agent.last_search
+            } for agent in self.active_agents.values()],
+            'total_active': len(self.active_agents)
+        })
+
     def get_agent_status(self) -> dict:
         """Get status of all active agents"""
         try:
             agents_status = []
             new_events_total = 0
-            
-            for term, agent_info in self.active_agents.items():
+
+            for term, agent in self.active_agents.items():
                 # Count current events for this term
                 current_count = self._count_events_for_term(term)
                 previous_count = self.last_event_counts.get(term, 0)
                 new_events = max(0, current_count - previous_count)
                 new_events_total += new_events
-                
+
                 # Update the stored count
                 self.last_event_counts[term] = current_count
-                agent_info['events_found'] = current_count
-                
+                agent.events_found = current_count
+
                 agents_status.append({
                     'term': term,
-                    'status': agent_info['status'],
+                    'status': agent.status,
                     'events_found': current_count,
-                    'deployed_at': agent_info['deployed_at'],
-                    'last_search': agent_info['last_search']
+                    'deployed_at': agent.deployed_at,
+                    'last_search': agent.last_search
                 })
-            
+
             return {
                 'success': True,
                 'agents': agents_status,
                 'total_active': len(self.active_agents),
                 'new_events_count': new_events_total
             }
-            
+
         except Exception as e:
             logger.error(f"Error getting agent status: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
-    
-    def _run_agent(self, search_term: str, stop_flag: threading.Event):
-        """Run a single search agent continuously"""
-        logger.info(f"Starting search agent for term: {search_term}")
-        
-        # Initial delay to prevent immediate overwhelming
-        time.sleep(5)
-        
-        while not stop_flag.is_set():
+
+    async def _run_scheduler(self):
+        """Start searches as agents come due, sleeping until the next one otherwise"""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, agent = heapq.heappop(self._schedule)
+                if self.active_agents.get(agent.term) is not agent:
+                    continue  # stopped or redeployed
+                agent.task = asyncio.create_task(self._run_search(agent))
+                self._running.add(agent.task)
+                agent.task.add_done_callback(self._running.discard)
+
+            timeout = self._schedule[0][0] - now if self._schedule else None
             try:
-                # Update last search time
-                if search_term in self.active_agents:
-                    self.active_agents[search_term]['last_search'] = datetime.now().isoformat()
-                
-                # Perform web search
-                logger.info(f"Agent searching for: {search_term}")
-                
-                # Run async function in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                try:
-                    search_result = loop.run_until_complete(
-                        self.web_search_agent.search_web_for_security_events(
-                            query=search_term,
-                            max_events=3  # Smaller batches for continuous monitoring
-                        )
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_search(self, agent: SearchAgent):
+        """Run one search for an agent and schedule its next one"""
+        search_term = agent.term
+        delay = SEARCH_INTERVAL_SECONDS
+        try:
+            # Agents queue behind interactive OpenAI calls
+            async with self._search_slots:
+                with background_priority():
+                    agent.last_search = datetime.now().isoformat()
+                    logger.info(f"Agent searching for: {search_term}")
+
+                    search_result = await self.web_search_agent.search_web_for_security_events(
+                        query=search_term,
+                        max_events=3  # Smaller batches for continuous monitoring
                     )
-                    
+
                     if search_result.get('success') and search_result.get('events'):
                         events = search_result['events']
-                        
+
                         # Integrate new events into database
-                        integration_result = loop.run_until_complete(
-                            self.web_search_agent.integrate_events_with_existing(events)
-                        )
-                        
+                        integration_result = await self.web_search_agent.integrate_events_with_existing(events)
+
                         if integration_result.get('added_count', 0) > 0:
                             logger.info(f"Agent '{search_term}' found {integration_result['added_count']} new events")
-                            
-                            # Update agent statistics
-                            if search_term in self.active_agents:
-                                current_count = self._count_events_for_term(search_term)
-                                self.active_agents[search_term]['events_found'] = current_count
-                    
-                except Exception as search_error:
-                    logger.error(f"Search error for agent '{search_term}': {search_error}")
-                finally:
-                    loop.close()
-                
-                # Wait before next search (5 minutes)
-                for _ in range(300):  # 300 seconds = 5 minutes
-                    if stop_flag.is_set():
-                        break
-                    time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error in agent '{search_term}': {e}")
-                # Wait a bit before retrying on error
-                for _ in range(30):  # 30 seconds
-                    if stop_flag.is_set():
-                        break
-                    time.sleep(1)
-        
-        logger.info(f"Search agent for term '{search_term}' stopped")
-    
+                            agent.events_found = self._count_events_for_term(search_term)
+
+        except asyncio.CancelledError:
+            logger.info(f"Search agent for term '{search_term}' stopped")
+            raise
+        except Exception as e:
+            logger.error(f"Search error for agent '{search_term}': {e}")
+            delay = RETRY_INTERVAL_SECONDS
+
+        if self.active_agents.get(search_term) is agent:
+            self._schedule_agent(agent, delay)
+            self._publish_agents()
+
     def _count_events_for_term(self, search_term: str) -> int:
-        """Count events that match the search term"""
+        """Count events containing the search term in their title, description or location"""
         try:
-            if not self.data_file.exists():
-                return 0
-            
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            events = data.get('events', [])
-            count = 0
-            
-            # Count events that contain the search term in title or description
-            search_lower = search_term.lower()
-            for event in events:
-                title = event.get('title', '').lower()
-                description = event.get('description', '').lower()
-                location = event.get('location', '').lower()
-                
-                if (search_lower in title or 
-                    search_lower in description or 
-                    search_lower in location):
-                    count += 1
-            
-            return count
-            
+            # Deployed terms are watched by the text index, so this is a counter read
+            with self.event_store.synced():
+                return self.text_index.count(search_term)
+
         except Exception as e:
             logger.error(f"Error counting events for term '{search_term}': {e}")
             return 0
 
 # Global instance
-search_agent_manager = SearchAgentManager() 
\ No newline at end of file
+search_agent_manager = SearchAgentManager()
@@ -0,0 +1,278 @@
+"""
+Spatial index over event coordinates.
+
+SpatialIndex is an EventIndex that buckets events into a uniform grid of lat/lon cells.
+A bounding-box query visits only the cells the box overlaps, takes whole cells that lie
+inside it and checks coordinates only in the cells along its edges, so a map viewport
+costs time proportional to the events in and around it. Radius queries and geo feature
+queries (the polygons, routes and points in data/geo_data.json) narrow down with a
+bounding box the same way, then apply the exact distance or shapely containment test
+to the remaining candidates.
+
+A grid rather than shapely's STRtree because the STRtree cannot be updated in place;
+every event write would mean rebuilding it.
+"""
+
+import json
+import math
+import threading
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+from .event_index import EventIndex
+from .event_store import get_event_store
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Grid cell size; 1 degree is roughly 111 km at the equator
+DEFAULT_CELL_DEGREES = 1.0
+# How far from a route or point feature an event may be to count as inside it
+DEFAULT_FEATURE_BUFFER_KM = 100.0
+
+Cell = Tuple[int, int]
+# (lat, lon, insertion order, event)
+Point = Tuple[float, float, int, Dict[str, Any]]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def event_coordinates(event: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """An event's (lat, lon), or None if it has no usable coordinates"""
+    try:
+        lat, lon = float(event["lat"]), float(event["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def grid_cell(cell_degrees: float, lat: float, lon: float) -> Cell:
+    """The (column, row) of the grid cell containing a point"""
+    column = min(int((lon + 180) // cell_degrees), math.ceil(360 / cell_degrees) - 1)
+    row = min(int((lat + 90) // cell_degrees), math.ceil(180 / cell_degrees) - 1)
+    return column, row
+
+
+def overlapping_cells(cells: Dict[Cell, Any], cell_degrees: float, min_lat: float, min_lon: float,
+                      max_lat: float, max_lon: float) -> List[Tuple[Cell, Any]]:
+    """Occupied cells of a grid that overlap a box (which must not cross the antimeridian)"""
+    first_column, first_row = grid_cell(cell_degrees, min_lat, min_lon)
+    last_column, last_row = grid_cell(cell_degrees, max_lat, max_lon)
+
+    span = (last_column - first_column + 1) * (last_row - first_row + 1)
+    if span > len(cells):
+        # A large box: walking the occupied cells is cheaper than walking the box
+        return [(cell, value) for cell, value in cells.items()
+                if first_column <= cell[0] <= last_column and first_row <= cell[1] <= last_row]
+    return [((column, row), cells[(column, row)])
+            for column in range(first_column, last_column + 1)
+            for row in range(first_row, last_row + 1)
+            if (column, row) in cells]
+
+
+class SpatialIndex(EventIndex):
+    """Uniform lat/lon grid of event coordinates"""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # Cell -> event key -> (lat, lon, insertion order, event)
+            self._cells: Dict[Cell, Dict[Any, Point]] = {}
+            # Event key -> its cell
+            self._entries: Dict[Any, Cell] = {}
+            self._next_order = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, event: Dict[str, Any]):
+        coords = event_coordinates(event)
+        with self._lock:
+            key = event.get("id")
+            if key in self._entries:
+                self.remove(event)
+            if coords is None:
+                return
+            cell = grid_cell(self.cell_degrees, *coords)
+            self._cells.setdefault(cell, {})[key] = (coords[0], coords[1], self._next_order, event)
+            self._entries[key] = cell
+            self._next_order += 1
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            cell = self._entries.pop(key, None)
+            if cell is None:
+                return
+            members = self._cells[cell]
+            del members[key]
+            if not members:
+                del self._cells[cell]
+
+    def _bbox_points(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Point]:
+        """Points inside a box; min_lon > max_lon crosses the antimeridian"""
+        if min_lon > max_lon:
+            return (self._bbox_points(min_lat, min_lon, max_lat, 180)
+                    + self._bbox_points(min_lat, -180, max_lat, max_lon))
+
+        min_lat, max_lat = max(min_lat, -90), min(max_lat, 90)
+        min_lon, max_lon = max(min_lon, -180), min(max_lon, 180)
+        if min_lat > max_lat:
+            return []
+        cells = overlapping_cells(self._cells, self.cell_degrees, min_lat, min_lon, max_lat, max_lon)
+
+        found: List[Point] = []
+        size = self.cell_degrees
+        for (column, row), members in cells:
+            cell_min_lon, cell_min_lat = column * size - 180, row * size - 90
+            if (min_lon <= cell_min_lon and cell_min_lon + size <= max_lon
+                    and min_lat <= cell_min_lat and cell_min_lat + size <= max_lat):
+                found.extend(members.values())
+            else:
+                found.extend(point for point in members.values()
+                             if min_lat <= point[0] <= max_lat and min_lon <= point[1] <= max_lon)
+        return found
+
+    @staticmethod
+    def _events(points: List[Point]) -> List[Dict[str, Any]]:
+        """Events of the given points, in the order they were added"""
+        points.sort(key=itemgetter(2))
+        return [point[3] for point in points]
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Dict[str, Any]]:
+        """Events inside a lat/lon box; a box with min_lon > max_lon wraps across 180°"""
+        with self._lock:
+            return self._events(self._bbox_points(min_lat, min_lon, max_lat, max_lon))
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
+        """Events within `radius_km` of a point, nearest first"""
+        with self._lock:
+            dlat = radius_km / KM_PER_DEGREE
+            angular = radius_km / EARTH_RADIUS_KM
+            if lat + dlat >= 90 or lat - dlat <= -90 or math.sin(angular) >= math.cos(math.radians(lat)):
+                # The circle reaches a pole, so it spans every longitude
+                min_lon, max_lon = -180.0, 180.0
+            else:
+                dlon = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(lat))))
+                min_lon, max_lon = lon - dlon, lon + dlon
+                if min_lon < -180:
+                    min_lon += 360
+                if max_lon > 180:
+                    max_lon -= 360
+
+            nearby = []
+            for point in self._bbox_points(lat - dlat, min_lon, lat + dlat, max_lon):
+                distance = haversine_km(lat, lon, point[0], point[1])
+                if distance <= radius_km:
+                    nearby.append((distance, point[2], point[3]))
+            nearby.sort(key=itemgetter(0, 1))
+            return [event for _, _, event in nearby]
+
+    def _geometry_points(self, geometry, buffer_km: float) -> List[Point]:
+        """Points inside a lon/lat geometry, or within `buffer_km` of it"""
+        buffer_degrees = buffer_km / KM_PER_DEGREE
+        min_lon, min_lat, max_lon, max_lat = geometry.bounds
+        candidates = self._bbox_points(min_lat - buffer_degrees, min_lon - buffer_degrees,
+                                       max_lat + buffer_degrees, max_lon + buffer_degrees)
+        if not candidates:
+            return []
+        lats = np.fromiter((point[0] for point in candidates), dtype=float, count=len(candidates))
+        lons = np.fromiter((point[1] for point in candidates), dtype=float, count=len(candidates))
+        if buffer_degrees > 0:
+            inside = shapely.dwithin(geometry, shapely.points(lons, lats), buffer_degrees)
+        else:
+            inside = shapely.contains_xy(geometry, lons, lats)
+        return [point for point, hit in zip(candidates, inside.tolist()) if hit]
+
+    def within_geometries(self, geometries: List[Any], buffer_km: float = None) -> List[Dict[str, Any]]:
+        """
+        Events inside any of the given shapely geometries (in lon/lat). Areas contain
+        events; routes and points have no inside, so they match events within
+        `buffer_km` (by default DEFAULT_FEATURE_BUFFER_KM) of them.
+        """
+        with self._lock:
+            # Keyed by insertion order, which is unique per point
+            points: Dict[int, Point] = {}
+            for geometry in geometries:
+                buffer = buffer_km
+                if buffer is None:
+                    is_area = shapely.get_type_id(geometry) in (3, 6)  # Polygon, MultiPolygon
+                    buffer = 0.0 if is_area else DEFAULT_FEATURE_BUFFER_KM
+                points.update((point[2], point) for point in self._geometry_points(geometry, buffer))
+            return self._events(list(points.values()))
+
+
+class GeoFeatures:
+    """Named geometries from a GeoJSON feature collection, reloaded when the file changes"""
+
+    def __init__(self, geo_file: str = "data/geo_data.json"):
+        self.geo_file = Path(geo_file)
+        self._lock = threading.Lock()
+        self._key = None
+        self._features: Dict[str, List[Tuple[Any, Dict[str, Any]]]] = {}
+
+    def _refresh(self):
+        try:
+            stat = self.geo_file.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = None
+        if key == self._key:
+            return
+
+        with self._lock:
+            features: Dict[str, List[Tuple[Any, Dict[str, Any]]]] = {}
+            if key is not None:
+                with open(self.geo_file, "r", encoding="utf-8") as f:
+                    collection = json.load(f)
+                for feature in collection.get("features", []):
+                    properties = feature.get("properties", {})
+                    geometry = shapely.from_geojson(json.dumps(feature["geometry"]))
+                    shapely.prepare(geometry)
+                    name = properties.get("name", "").lower()
+                    features.setdefault(name, []).append((geometry, properties))
+            self._features = features
+            self._key = key
+
+    def names(self) -> List[str]:
+        """Names of the available features"""
+        self._refresh()
+        return sorted({props.get("name", "") for group in self._features.values() for _, props in group})
+
+    def get(self, name: str) -> List[Any]:
+        """Geometries of every feature with the given name (case-insensitive)"""
+        self._refresh()
+        return [geometry for geometry, _ in self._features.get(name.lower(), [])]
+
+
+_spatial_indexes: Dict[int, SpatialIndex] = {}
+_spatial_indexes_lock = threading.Lock()
+
+
+def get_spatial_index(data_file: str = None) -> SpatialIndex:
+    """Get the spatial index for the store returned by get_event_store(data_file)"""
+    store = get_event_store(data_file)
+    with _spatial_indexes_lock:
+        if id(store) not in _spatial_indexes:
+            _spatial_indexes[id(store)] = store.register_index(SpatialIndex())
+        return _spatial_indexes[id(store)]
+
+
+# Global instance
+geo_features = GeoFeatures()
@@ -0,0 +1,356 @@
+"""
+SQLite storage backend for security events.
+
+Implements the same interface as services.event_store.EventStore, but keeps events in a
+SQLite database (WAL mode) with indexes on severity, category, region and timestamp and
+an FTS5 table over title, description and location. Filters and counts run as index
+lookups and GROUP BY queries instead of scans over every event.
+
+Enable it with EVENT_STORE_BACKEND=sqlite (and optionally EVENT_DB_PATH), after importing
+the existing events once:
+
+    python -m services.sqlite_event_store data/mock_events.json data/events.db
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .event_changes import ChangeLog
+from .event_index import EventIndex
+from .event_store import GROUP_FIELDS, event_region
+from .text_index import TextIndex
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id UNIQUE,
+    title TEXT,
+    description TEXT,
+    category TEXT,
+    severity TEXT,
+    location TEXT,
+    region TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_severity ON events(severity);
+CREATE INDEX IF NOT EXISTS idx_events_category ON events(category);
+CREATE INDEX IF NOT EXISTS idx_events_region ON events(region);
+CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0), ('max_id', 0);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    title, description, location, content='events', content_rowid='seq'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, title, description, location)
+    VALUES (new.seq, new.title, new.description, new.location);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, title, description, location)
+    VALUES ('delete', old.seq, old.title, old.description, old.location);
+END;
+"""
+
+
+class SQLiteEventStore:
+    """Event store backed by a SQLite database"""
+
+    def __init__(self, db_file: str = "data/events.db"):
+        self.db_file = Path(db_file)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # In-memory secondary indexes, and the database version they reflect
+        self._indexes: List[EventIndex] = []
+        self._index_lock = threading.RLock()
+        self._indexed_version: Optional[int] = None
+        self._text_index: Optional[TextIndex] = None
+        self._changes: Optional[ChangeLog] = None
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            # Some SQLite builds ship without FTS5; location search falls back to a substring scan
+            logger.warning(f"FTS5 unavailable, using substring scans for location search: {e}")
+            self.has_fts = False
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every write, shared by all processes using the database"""
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0]
+
+    @staticmethod
+    def _row_values(event: Dict[str, Any]) -> tuple:
+        return (
+            event.get("id"),
+            event.get("title"),
+            event.get("description"),
+            event.get("category"),
+            event.get("severity"),
+            event.get("location"),
+            event_region(event),
+            event.get("timestamp"),
+            json.dumps(event, ensure_ascii=False),
+        )
+
+    def _insert(self, conn: sqlite3.Connection, events: List[Dict[str, Any]]):
+        conn.executemany(
+            "INSERT INTO events (event_id, title, description, category, severity, location, region, timestamp, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [self._row_values(event) for event in events]
+        )
+        max_id = max((e["id"] for e in events if isinstance(e.get("id"), int)), default=0)
+        conn.execute("UPDATE meta SET value = MAX(value, ?) WHERE key = 'max_id'", (max_id,))
+
+    def _select(self, where: str = "", params: tuple = (), limit: int = None) -> List[Dict[str, Any]]:
+        sql = f"SELECT data FROM events {where} ORDER BY seq"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [json.loads(row[0]) for row in self._connect().execute(sql, params)]
+
+    def load(self) -> Dict[str, Any]:
+        """Get the events document"""
+        return {"events": self.get_events()}
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """Get every event in insertion order"""
+        return self._select()
+
+    def count(self) -> int:
+        """Get the number of current events"""
+        return self._connect().execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def apply_batch(self, mutations: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Apply a batch of mutations in a single transaction.
+
+        Mutations are ("add", [events]) and ("delete", event_id). Added events keep an
+        integer ID that is not in use yet; any other event is given the next free ID.
+        Returns one result per mutation: the stored events for adds and whether the
+        event existed for deletes.
+        """
+        conn = self._connect()
+        results = []
+        added: List[Dict[str, Any]] = []
+        removed: List[Dict[str, Any]] = []
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+                max_id = conn.execute("SELECT value FROM meta WHERE key = 'max_id'").fetchone()[0]
+                for op, arg in mutations:
+                    if op == "add":
+                        for event in arg:
+                            event_id = event.get("id")
+                            if not isinstance(event_id, int) or conn.execute(
+                                    "SELECT 1 FROM events WHERE event_id = ?", (event_id,)).fetchone():
+                                event_id = max_id + 1
+                            event["id"] = event_id
+                            max_id = max(max_id, event_id)
+                            self._insert(conn, [event])
+                            added.append(event)
+                        results.append(arg)
+                    elif op == "delete":
+                        if self._indexes:
+                            removed.extend(json.loads(row[0]) for row in conn.execute(
+                                "SELECT data FROM events WHERE event_id = ?", (arg,)))
+                        deleted = conn.execute("DELETE FROM events WHERE event_id = ?", (arg,)).rowcount
+                        results.append(deleted > 0)
+                    else:
+                        raise ValueError(f"Unknown event mutation '{op}'")
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._update_indexes(version, added, removed)
+        return results
+
+    def _update_indexes(self, version: int, added: List[Dict[str, Any]], removed: List[Dict[str, Any]]):
+        """Apply a committed batch to the indexes, or rebuild them if they had fallen behind"""
+        with self._index_lock:
+            if not self._indexes:
+                return
+            if self._indexed_version != version:
+                self._rebuild_indexes()
+                return
+            for event in removed:
+                for index in self._indexes:
+                    index.remove(event)
+            for event in added:
+                for index in self._indexes:
+                    index.add(event)
+            self._indexed_version = version + 1
+
+    def _rebuild_indexes(self):
+        with self._index_lock:
+            if not self._indexes:
+                return
+            self._indexed_version = self.version
+            events = self.get_events()
+            for index in self._indexes:
+                index.reset()
+                for event in events:
+                    index.add(event)
+
+    def register_index(self, index: EventIndex) -> EventIndex:
+        """Build an index over the current events and keep it updated from now on"""
+        with self._index_lock:
+            self._indexes.append(index)
+            self._rebuild_indexes()
+        return index
+
+    @property
+    def text_index(self) -> TextIndex:
+        """In-memory word index over the events, built the first time it is needed"""
+        with self._index_lock:
+            if self._text_index is None:
+                self._text_index = self.register_index(TextIndex())
+            return self._text_index
+
+    @property
+    def changes(self) -> ChangeLog:
+        """
+        Sequence-numbered adds and deletes, tracked from the first time it is needed.
+        A write from another process rebuilds the indexes, which resets the log.
+        """
+        with self._index_lock:
+            if self._changes is None:
+                self._changes = self.register_index(ChangeLog())
+            return self._changes
+
+    @contextmanager
+    def synced(self) -> Iterator[None]:
+        """Hold the index lock with the registered indexes up to date with the database"""
+        with self._index_lock:
+            if self._indexes and self._indexed_version != self.version:
+                # Another process wrote to the database
+                self._rebuild_indexes()
+            yield
+
+    def add_events(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert new events; returns the stored events with their IDs"""
+        return self.apply_batch([("add", events)])[0]
+
+    def delete_event(self, event_id: Any) -> bool:
+        """Delete an event; returns False if no such event exists"""
+        return self.apply_batch([("delete", event_id)])[0]
+
+    def save(self, data: Dict[str, Any]):
+        """Replace every stored event with the events in the given document"""
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM events")
+                conn.execute("UPDATE meta SET value = 0 WHERE key = 'max_id'")
+                self._insert(conn, data.get("events", []))
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._rebuild_indexes()
+
+    def query_events(self, severity: str = None, category: str = None, location: str = None,
+                     limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Get events matching every given filter.
+
+        Location is a case-insensitive substring, but with FTS5 available it must also
+        start on a word boundary ("shang" finds "Shanghai", "hang" does not).
+        """
+        clauses = []
+        params: List[Any] = []
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if location:
+            tokens = re.findall(r"\w+", location.lower())
+            if self.has_fts and tokens:
+                # Narrow down with the FTS index, then keep exact substring semantics
+                match = " AND ".join(f'location : "{token}"*' for token in tokens)
+                clauses.append("seq IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+                params.append(match)
+            clauses.append("instr(lower(location), ?) > 0")
+            params.append(location.lower())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._select(where, tuple(params), limit)
+
+    def count_by(self, field: str) -> Dict[str, int]:
+        """Count events grouped by severity, category or region"""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group events by '{field}'")
+        rows = self._connect().execute(
+            f"SELECT COALESCE({field}, 'unknown'), COUNT(*) FROM events GROUP BY 1 ORDER BY MIN(seq)"
+        )
+        return {key: count for key, count in rows}
+
+
+_stores: Dict[str, SQLiteEventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_event_store(db_file: str = "data/events.db") -> SQLiteEventStore:
+    """Get the shared store for a database file, creating it on first use"""
+    key = os.path.abspath(db_file)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SQLiteEventStore(key)
+        return _stores[key]
+
+
+def import_json_events(json_file: str, db_file: str) -> int:
+    """Replace the database contents with the events from a JSON events file"""
+    from .event_store import EventStore
+
+    # Read through EventStore so events still sitting in the append-only log come along
+    data = EventStore(json_file).load()
+    get_sqlite_event_store(db_file).save(data)
+    return len(data["events"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a JSON events file into the SQLite event store")
+    parser.add_argument("json_file", nargs="?", default="data/mock_events.json")
+    parser.add_argument("db_file", nargs="?", default="data/events.db")
+    args = parser.parse_args()
+
+    count = import_json_events(args.json_file, args.db_file)
+    print(f"Imported {count} events from {args.json_file} into {args.db_file}")
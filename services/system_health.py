@@ -0,0 +1,55 @@
+"""
+Health of the services the dashboard depends on.
+
+Each service has a state string; the system is "healthy" while every service is in its
+healthy state and "degraded" otherwise. Callers report what they observe with set(), and
+a "health" message is published on the push channel only when a state actually changes,
+so open dashboards follow transitions without polling /api/health.
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict
+
+from .event_bus import EventBus, event_bus
+
+# Each service's state while it is working
+HEALTHY_STATES = {
+    "openai": "connected",
+    "web_search": "available",
+    "data": "loaded"
+}
+
+
+class SystemHealth:
+    """Per-service states, publishing "health" on the bus when one changes"""
+
+    def __init__(self, bus: EventBus = event_bus):
+        self.bus = bus
+        self._lock = threading.Lock()
+        self._services = dict(HEALTHY_STATES)
+
+    def status(self) -> Dict[str, Any]:
+        """The health report served by /api/health and pushed on changes"""
+        with self._lock:
+            return self._status()
+
+    def set(self, service: str, state: str):
+        """Record a service's state; safe to call from any thread"""
+        with self._lock:
+            if self._services.get(service) == state:
+                return
+            self._services[service] = state
+            status = self._status()
+        self.bus.publish("health", status)
+
+    def _status(self) -> Dict[str, Any]:
+        healthy = all(self._services.get(name) == state for name, state in HEALTHY_STATES.items())
+        return {
+            "status": "healthy" if healthy else "degraded",
+            "timestamp": datetime.now().isoformat(),
+            "services": dict(self._services)
+        }
+
+
+system_health = SystemHealth()
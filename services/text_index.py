@@ -0,0 +1,285 @@
+"""
+Inverted word index over event text.
+
+TextIndex is an EventIndex mapping each word of an event's location, title, tags and
+description to the events that contain it, with a sorted vocabulary per field so a
+word prefix resolves to a contiguous range of words. It answers:
+
+- search(): every query word must start (or equal) a word of the event,
+- match_location(): the store's location filter, a case-insensitive substring that
+  must start on a word boundary (the same semantics as the SQLite backend's FTS query),
+- match(): plain substring matching over title, description and location, used for
+  search agents' counts; watched terms keep a running count updated on every add
+  and remove so reading one is O(1).
+
+Queries intersect posting lists starting from the smallest, then confirm only the
+surviving candidates, so their cost follows the size of the matches, not the corpus.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .event_index import EventIndex
+
+# Indexed fields; tags are a list of strings
+FIELDS = ("location", "title", "tags", "description")
+# Fields search agents' terms are matched against
+TERM_FIELDS = ("title", "description", "location")
+
+
+def text_tokens(text: str) -> List[str]:
+    """Case-fold text into word tokens"""
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def field_text(event: Dict[str, Any], field: str) -> str:
+    """The lowercased text of one field of an event"""
+    value = event.get(field) or ""
+    if isinstance(value, list):
+        value = " ".join(str(item) for item in value)
+    return str(value).lower()
+
+
+def contains_at_word_start(text: str, phrase: str) -> bool:
+    """Whether `phrase` occurs in `text` starting where a word starts"""
+    start = text.find(phrase)
+    while start != -1:
+        if start == 0 or not re.match(r"\w", text[start - 1]) or not re.match(r"\w", phrase):
+            return True
+        start = text.find(phrase, start + 1)
+    return False
+
+
+def event_text(event: Dict[str, Any], fields: Iterable[str] = TERM_FIELDS) -> str:
+    """The lowercased text an event is matched by; fields are joined by newlines"""
+    return "\n".join(field_text(event, field) for field in fields)
+
+
+class _FieldPostings:
+    """
+    Word -> event keys for one field, plus the words in sorted order for prefix lookups.
+
+    The sorted lists are built on the first lookup after a (re)load and then kept
+    sorted as words come and go, so bulk loads do not pay for insertion sorts.
+    """
+
+    __slots__ = ("postings", "_words", "_reversed_words")
+
+    def __init__(self):
+        self.postings: Dict[str, Set[Any]] = {}
+        self._words: Optional[List[str]] = None
+        # Words spelled backwards, so a word suffix is also a sorted range
+        self._reversed_words: Optional[List[str]] = None
+
+    def add(self, word: str, key: Any):
+        keys = self.postings.get(word)
+        if keys is None:
+            keys = self.postings[word] = set()
+            if self._words is not None:
+                insort(self._words, word)
+            if self._reversed_words is not None:
+                insort(self._reversed_words, word[::-1])
+        keys.add(key)
+
+    def discard(self, word: str, key: Any):
+        keys = self.postings.get(word)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.postings[word]
+            if self._words is not None:
+                del self._words[bisect_left(self._words, word)]
+            if self._reversed_words is not None:
+                del self._reversed_words[bisect_left(self._reversed_words, word[::-1])]
+
+    @staticmethod
+    def _prefixed(words: List[str], prefix: str) -> List[str]:
+        start = bisect_left(words, prefix)
+        end = bisect_left(words, prefix + "\U0010ffff")
+        return words[start:end]
+
+    def starting_with(self, prefix: str) -> List[str]:
+        if self._words is None:
+            self._words = sorted(self.postings)
+        return self._prefixed(self._words, prefix)
+
+    def ending_with(self, suffix: str) -> List[str]:
+        if self._reversed_words is None:
+            self._reversed_words = sorted(word[::-1] for word in self.postings)
+        return [word[::-1] for word in self._prefixed(self._reversed_words, suffix[::-1])]
+
+    def containing(self, part: str) -> List[str]:
+        return [word for word in self.postings if part in word]
+
+    def keys_for(self, words: Iterable[str]) -> Set[Any]:
+        keys: Set[Any] = set()
+        for word in words:
+            keys |= self.postings[word]
+        return keys
+
+
+class TextIndex(EventIndex):
+    """Per-field word postings plus live match counts for watched terms"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Watched term -> number of agents watching it
+        self._watchers: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._fields: Dict[str, _FieldPostings] = {field: _FieldPostings() for field in FIELDS}
+            self._events: Dict[Any, Dict[str, Any]] = {}
+            self._term_counts: Dict[str, int] = {term: 0 for term in self._watchers}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            if key in self._events:
+                self.remove(event)
+            self._events[key] = event
+            for field, postings in self._fields.items():
+                for word in set(text_tokens(field_text(event, field))):
+                    postings.add(word, key)
+            if self._term_counts:
+                text = event_text(event)
+                for term in self._term_counts:
+                    if term in text:
+                        self._term_counts[term] += 1
+
+    def remove(self, event: Dict[str, Any]):
+        with self._lock:
+            key = event.get("id")
+            event = self._events.pop(key, None)
+            if event is None:
+                return
+            for field, postings in self._fields.items():
+                for word in set(text_tokens(field_text(event, field))):
+                    postings.discard(word, key)
+            if self._term_counts:
+                text = event_text(event)
+                for term in self._term_counts:
+                    if term in text:
+                        self._term_counts[term] -= 1
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """The indexed event with the given ID"""
+        return self._events.get(key)
+
+    def _intersect(self, tokens: List[str], fields: Iterable[str],
+                   words_for: Callable[[_FieldPostings, int, str], Iterable[str]]) -> Set[Any]:
+        """Keys of events where, in some one of `fields`, every token has a matching word"""
+        result: Set[Any] = set()
+        for field in fields:
+            postings = self._fields[field]
+            per_token = [postings.keys_for(words_for(postings, position, token))
+                         for position, token in enumerate(tokens)]
+            per_token.sort(key=len)
+            if not per_token[0]:
+                continue
+            keys = set(per_token[0])
+            for other in per_token[1:]:
+                keys &= other
+                if not keys:
+                    break
+            result |= keys
+        return result
+
+    def search(self, query: str, fields: Iterable[str] = FIELDS, prefix: bool = True) -> Set[Any]:
+        """
+        Keys of events where every word of `query` begins (or with prefix=False, equals)
+        a word in one of `fields`; the words may be spread across those fields.
+        """
+        tokens = text_tokens(query)
+        if not tokens:
+            return set()
+        with self._lock:
+            keys: Optional[Set[Any]] = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                matches: Set[Any] = set()
+                for field in fields:
+                    postings = self._fields[field]
+                    words = postings.starting_with(token) if prefix else ([token] if token in postings.postings else [])
+                    matches |= postings.keys_for(words)
+                keys = matches if keys is None else keys & matches
+                if not keys:
+                    return set()
+            return keys
+
+    def match_location(self, location: str) -> Set[Any]:
+        """
+        Keys of events whose location contains `location` case-insensitively, where the
+        match starts on a word boundary ("shang" finds "Shanghai", "hang" does not)
+        """
+        location = location.lower()
+        tokens = text_tokens(location)
+        with self._lock:
+            if not tokens:
+                return {key for key, event in self._events.items()
+                        if contains_at_word_start(field_text(event, "location"), location)}
+            candidates = self._intersect(tokens, ("location",), lambda postings, _, token: postings.starting_with(token))
+            if tokens == [location]:
+                # A single word's prefix matches are exactly the word-start matches
+                return candidates
+            return {key for key in candidates
+                    if contains_at_word_start(field_text(self._events[key], "location"), location)}
+
+    def match(self, phrase: str, fields: Iterable[str] = TERM_FIELDS) -> Set[Any]:
+        """Keys of events where one of `fields` contains `phrase` (case-insensitive)"""
+        phrase = phrase.lower()
+        tokens = text_tokens(phrase)
+        fields = tuple(fields)
+        last = len(tokens) - 1
+
+        # Inner words of the phrase are whole words of the text; its first word may be
+        # the tail of a longer word and its last word the head of one
+        def words_for(postings: _FieldPostings, position: int, token: str) -> Iterable[str]:
+            if last == 0:
+                return postings.containing(token)
+            if position == 0:
+                return postings.ending_with(token)
+            if position == last:
+                return postings.starting_with(token)
+            return [token] if token in postings.postings else []
+
+        with self._lock:
+            if not tokens:
+                candidates = self._events.keys()
+            else:
+                candidates = self._intersect(tokens, fields, words_for)
+            return {key for key in candidates if phrase in event_text(self._events[key], fields)}
+
+    def watch(self, term: str) -> int:
+        """Start keeping a live match count for a term; returns the current count"""
+        term = term.lower()
+        with self._lock:
+            self._watchers[term] = self._watchers.get(term, 0) + 1
+            if term not in self._term_counts:
+                self._term_counts[term] = len(self.match(term))
+            return self._term_counts[term]
+
+    def unwatch(self, term: str):
+        """Stop counting a term once nothing watches it any more"""
+        term = term.lower()
+        with self._lock:
+            watchers = self._watchers.get(term, 0) - 1
+            if watchers > 0:
+                self._watchers[term] = watchers
+            else:
+                self._watchers.pop(term, None)
+                self._term_counts.pop(term, None)
+
+    def count(self, term: str) -> int:
+        """Number of events matching a term; O(1) for watched terms"""
+        term = term.lower()
+        with self._lock:
+            if term in self._term_counts:
+                return self._term_counts[term]
+            return len(self.match(term))
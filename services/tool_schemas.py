@@ -0,0 +1,134 @@
+"""
+OpenAI function schemas for the MCP server's tools.
+
+The schemas are generated from the MCP server's OpenAPI document: every operation tagged
+"tools" becomes a function named after its operationId, taking its request body as the
+parameters. ToolSchemaCache serves them to the chat assistant without ever making a chat
+turn wait on the server. Schemas are refreshed in the background once `ttl` seconds old;
+a failed fetch is retried with exponential backoff while the last good schemas, or the
+fallback if there are none yet, go on being served.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .tool_transport import ToolTransport
+
+logger = logging.getLogger(__name__)
+
+TOOL_TAG = "tools"
+DEFAULT_TTL_SECONDS = 600
+# Backoff after failed fetches doubles from the first value up to the second
+MIN_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 300
+# Schema keywords that only matter for documentation
+_DROPPED_KEYS = {"title"}
+# Keywords whose value maps names to subschemas, e.g. property names that may be "title"
+_SCHEMA_MAPS = {"properties", "patternProperties", "$defs", "definitions"}
+# Keywords whose value is data rather than a schema
+_LITERAL_KEYS = {"default", "const", "enum", "examples", "example"}
+
+
+def _inline(schema: Any, components: Dict[str, Any]) -> Any:
+    """Resolve $refs into component schemas and drop documentation-only keywords"""
+    if isinstance(schema, list):
+        return [_inline(item, components) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    if "$ref" in schema:
+        return _inline(components[schema["$ref"].rsplit("/", 1)[-1]], components)
+    inlined = {}
+    for key, value in schema.items():
+        if key in _DROPPED_KEYS:
+            continue
+        if key in _LITERAL_KEYS:
+            inlined[key] = value
+        elif key in _SCHEMA_MAPS and isinstance(value, dict):
+            inlined[key] = {name: _inline(subschema, components) for name, subschema in value.items()}
+        else:
+            inlined[key] = _inline(value, components)
+    return inlined
+
+
+def openapi_to_tools(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """OpenAI function tools for the operations tagged "tools" in an OpenAPI document"""
+    components = document.get("components", {}).get("schemas", {})
+    tools = []
+    for operations in document.get("paths", {}).values():
+        for operation in operations.values():
+            if TOOL_TAG not in operation.get("tags", []):
+                continue
+            body = operation.get("requestBody", {}).get("content", {}).get("application/json", {})
+            parameters = _inline(body.get("schema", {}), components)
+            tools.append({
+                "type": "function",
+                "function": {
+                    "name": operation["operationId"],
+                    "description": operation.get("description") or operation.get("summary", ""),
+                    "parameters": {
+                        "type": "object",
+                        "properties": parameters.get("properties", {}),
+                        "required": parameters.get("required", []),
+                    },
+                },
+            })
+    return tools
+
+
+class ToolSchemaCache:
+    """Tool schemas from the MCP server, kept fresh in the background"""
+
+    def __init__(self, transport: ToolTransport, fallback: List[Dict[str, Any]],
+                 ttl: float = DEFAULT_TTL_SECONDS, timeout: Optional[float] = None):
+        self.transport = transport
+        self.fallback = fallback
+        self.ttl = ttl
+        self.timeout = timeout
+        self._tools: Optional[List[Dict[str, Any]]] = None
+        self._fetched_at: Optional[float] = None
+        self._next_fetch = 0.0
+        self._failures = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(self) -> List[Dict[str, Any]]:
+        """
+        The current schemas, starting a background refresh if they are due one. Only an
+        in-process transport is ever waited on, and only before the first load.
+        """
+        if self._tools is None and self.transport.local and self._failures == 0:
+            await self.refresh()
+        elif time.monotonic() >= self._next_fetch and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+        return self._tools if self._tools is not None else self.fallback
+
+    async def refresh(self) -> bool:
+        """Fetch the schemas now; returns whether that worked"""
+        try:
+            document = await asyncio.wait_for(self.transport.call("openapi.json"), self.timeout)
+            tools = openapi_to_tools(document)
+            if not tools:
+                raise ValueError("the MCP server's OpenAPI document lists no tools")
+        except Exception as e:
+            self._failures += 1
+            backoff = min(MAX_BACKOFF_SECONDS, MIN_BACKOFF_SECONDS * 2 ** (self._failures - 1))
+            self._next_fetch = time.monotonic() + backoff
+            logger.warning(f"Could not fetch tool schemas from MCP server ({e!r}); retrying in {backoff}s")
+            return False
+
+        self._tools = tools
+        self._failures = 0
+        self._fetched_at = time.monotonic()
+        self._next_fetch = self._fetched_at + self.ttl
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "tools": len(self._tools) if self._tools is not None else 0,
+            "using_fallback": self._tools is None,
+            "age_seconds": round(now - self._fetched_at, 1) if self._fetched_at is not None else None,
+            "consecutive_failures": self._failures,
+            "next_fetch_in_seconds": round(max(0.0, self._next_fetch - now), 1),
+        }
@@ -0,0 +1,105 @@
+"""
+How the chat assistant reaches the MCP server's tools.
+
+HttpToolTransport calls a running MCP server over HTTP, as a remote deployment needs.
+InProcessToolTransport calls the tool functions in mcp_server.py directly against this
+process's shared event store, skipping the JSON encode, localhost round trip and
+decode on every call. Config.MCP_TRANSPORT picks one for get_tool_transport().
+"""
+
+from typing import Any, Dict, Hashable, Optional
+
+import httpx
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from .config import Config
+
+
+class ToolError(Exception):
+    """A tool call the MCP server rejected or failed, with its HTTP-style status"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ToolTransport:
+    """Calls MCP server endpoints, e.g. call("get-event-statistics", {"stat_type": ...})"""
+
+    # Whether calls stay in this process, so waiting on one never waits on the network
+    local = False
+
+    async def call(self, endpoint: str, payload: Dict[str, Any] = None) -> Any:
+        """Call an endpoint (a POST with `payload` as the body, or a GET without); returns its JSON result"""
+        raise NotImplementedError
+
+    def data_version(self) -> Optional[Hashable]:
+        """
+        A value that changes whenever the events behind the tools do, or None if it is
+        unknown and results must not be reused
+        """
+        return None
+
+    async def aclose(self):
+        """Release the transport's resources"""
+
+
+class HttpToolTransport(ToolTransport):
+    """Tools on an MCP server reached over HTTP"""
+
+    def __init__(self, base_url: str, http_client: httpx.AsyncClient = None):
+        self.base_url = base_url.rstrip("/")
+        self.http_client = http_client or httpx.AsyncClient()
+
+    async def call(self, endpoint: str, payload: Dict[str, Any] = None) -> Any:
+        url = f"{self.base_url}/{endpoint}"
+        if payload is None:
+            response = await self.http_client.get(url)
+        else:
+            response = await self.http_client.post(url, json=payload)
+        if response.is_error:
+            raise ToolError(response.status_code, response.text)
+        return response.json()
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+
+class InProcessToolTransport(ToolTransport):
+    """Tools called as functions on this process's event store"""
+
+    local = True
+
+    def __init__(self):
+        # Imported here: the server module builds its apps and indexes on import
+        from mcp_server import LOCAL_ENDPOINTS, event_store
+        self.endpoints = LOCAL_ENDPOINTS
+        self.event_store = event_store
+
+    def data_version(self) -> int:
+        with self.event_store.synced():
+            return self.event_store.changes.seq
+
+    async def call(self, endpoint: str, payload: Dict[str, Any] = None) -> Any:
+        if endpoint not in self.endpoints:
+            raise ToolError(404, f"No MCP endpoint '{endpoint}'")
+        handler, request_model = self.endpoints[endpoint]
+        try:
+            if request_model is None:
+                return await handler()
+            return await handler(request_model(**(payload or {})))
+        except ValidationError as e:
+            raise ToolError(422, str(e))
+        except HTTPException as e:
+            raise ToolError(e.status_code, str(e.detail))
+
+
+def get_tool_transport(http_client: Optional[httpx.AsyncClient] = None) -> ToolTransport:
+    """The transport Config.MCP_TRANSPORT asks for: "inprocess" (default) or "http" """
+    if Config.MCP_TRANSPORT == "http":
+        return HttpToolTransport(Config.MCP_SERVER_URL, http_client)
+    if Config.MCP_TRANSPORT == "inprocess":
+        return InProcessToolTransport()
+    raise ValueError(f"Unknown MCP_TRANSPORT '{Config.MCP_TRANSPORT}'; use 'inprocess' or 'http'")
@@ -1,14 +1,11 @@
 import os
 import base64
-from openai import AsyncOpenAI
 from typing import Dict, Any
-from .config import Config
+from .openai_client import get_openai_client, create_chat_completion
 
 class VisionProcessor:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=Config.get_openai_api_key()
-        )
+        self.client = get_openai_client()
     
     def encode_image(self, image_path: str) -> str:
         """Encode image to base64 for OpenAI API"""
@@ -56,7 +53,7 @@ class VisionProcessor:
             
             prompt = prompts.get(analysis_type, prompts["general"])
             
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model="gpt-4o",
                 messages=[
                     {
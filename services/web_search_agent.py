@@ -1,47 +1,54 @@
 import asyncio
+import copy
 import json
 import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, AsyncGenerator
-from openai import AsyncOpenAI
 import httpx
 from .config import Config
+from .openai_client import get_openai_client, create_chat_completion
+from .event_writer import get_event_writer
+from .geocoder import geocoder
+from .json_stream import JsonArrayStreamParser
+from .event_dedup import get_event_deduplicator
+from .cache import LRUCache
+from .event_bus import event_bus
+from .system_health import system_health
+
+# Words that do not change what a search is about
+QUERY_STOPWORDS = {"a", "an", "the", "of", "in", "on", "at", "for", "and", "or", "to", "near",
+                   "news", "latest", "recent", "current", "today", "update", "updates"}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Reduce a search query to a cache key: case-folded, stopwords removed, plurals
+    trimmed and words sorted, so "Red Sea attacks" and "attack in the red sea" match
+    """
+    words = set()
+    for word in re.findall(r"\w+", query.lower()):
+        if word in QUERY_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return " ".join(sorted(words))
+
 
 class WebSearchAgent:
     def __init__(self):
         """Initialize the web search agent with OpenAI client"""
-        self.client = AsyncOpenAI(api_key=Config.get_openai_api_key())
+        self.client = get_openai_client()
         self.model = "gpt-4o"
         self.http_client = httpx.AsyncClient()
-        
-        # Known location to coordinates mapping (can be expanded)
-        self.location_coords = {
-            "south china sea": (9.5, 113.5),
-            "shanghai": (31.2, 121.5),
-            "horn of africa": (2.0, 38.0),
-            "inner mongolia": (40.8, 111.9),
-            "arctic ocean": (75.0, 100.0),
-            "bangladesh": (23.7, 90.4),
-            "red sea": (20.0, 38.0),
-            "northern india": (28.7, 77.1),
-            "suez canal": (30.0, 32.3),
-            "philippines": (14.6, 121.0),
-            "ukraine": (48.3, 31.2),
-            "syria": (34.8, 38.9),
-            "iran": (32.4, 53.7),
-            "gaza": (31.3, 34.3),
-            "lebanon": (33.9, 35.5),
-            "yemen": (15.6, 48.0),
-            "afghanistan": (33.9, 67.7),
-            "taiwan": (23.8, 120.9),
-            "north korea": (40.3, 127.5),
-            "venezuela": (6.4, -66.6),
-            "myanmar": (19.8, 96.1),
-            "mali": (17.6, -3.9),
-            "somalia": (5.2, 46.2),
-            "ethiopia": (9.1, 40.5),
-            "south sudan": (6.9, 31.3)
-        }
+        self.geocoder = geocoder
+        # Extracted and geocoded events per normalized query; a hit skips every model call
+        self.search_cache = LRUCache(
+            max_bytes=Config.SEARCH_CACHE_MAX_BYTES,
+            ttl=Config.SEARCH_CACHE_TTL_SECONDS
+        )
+        # Serializes the dedup check and insert so concurrent agents cannot both add a story
+        self._integrate_lock = asyncio.Lock()
     
     async def search_web_for_security_events(self, query: str, max_events: int = 5) -> Dict[str, Any]:
         """
@@ -49,15 +56,24 @@ class WebSearchAgent:
         and return structured events data
         """
         try:
-            # First, use web search to get current information
-            search_results = await self._perform_web_search(query)
+            cache_key = (normalize_query(query), max_events)
+            events_with_geo = self._get_cached_events(cache_key)
             
-            # Extract events from search results using AI
-            events = await self._extract_events_from_search(search_results, query, max_events)
-            
-            # Add geo coordinates to events
-            events_with_geo = await self._add_geo_coordinates(events)
+            if events_with_geo is None:
+                # First, use web search to get current information
+                search_results = await self._perform_web_search(query)
+                
+                # Extract events from search results using AI
+                events, parsed = await self._extract_events_from_search(search_results, query, max_events)
+                
+                # Add geo coordinates to events
+                events_with_geo = await self._add_geo_coordinates(events)
+                
+                # A placeholder for an unparsed response must not stand in for the query later
+                if parsed and events_with_geo:
+                    self.search_cache.set(cache_key, copy.deepcopy(events_with_geo))
             
+            system_health.set("web_search", "available")
             return {
                 "success": True,
                 "query": query,
@@ -67,6 +83,7 @@ class WebSearchAgent:
             }
             
         except Exception as e:
+            system_health.set("web_search", "unavailable")
             return {
                 "success": False,
                 "error": str(e),
@@ -88,6 +105,22 @@ class WebSearchAgent:
                 "timestamp": datetime.now().isoformat()
             }
             
+            cache_key = (normalize_query(query), max_events)
+            cached_events = self._get_cached_events(cache_key)
+            if cached_events is not None:
+                for event in cached_events:
+                    yield {
+                        "type": "event",
+                        "event": event,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                yield {
+                    "type": "complete",
+                    "message": "Search completed successfully",
+                    "timestamp": datetime.now().isoformat()
+                }
+                return
+            
             # Perform web search
             search_results = await self._perform_web_search(query)
             
@@ -97,16 +130,54 @@ class WebSearchAgent:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Extract events one by one
-            async for event in self._extract_events_from_search_stream(search_results, query, max_events):
-                # Add geo coordinates to the event
-                event_with_geo = await self._add_geo_coordinates([event])
-                if event_with_geo:
-                    yield {
-                        "type": "event",
-                        "event": event_with_geo[0],
-                        "timestamp": datetime.now().isoformat()
-                    }
+            streamed_events = []
+            
+            # Extract events as the model generates them; each event is geocoded in its own
+            # task so geocoding event N overlaps with generating event N+1
+            pending: asyncio.Queue = asyncio.Queue()
+            
+            parsed = True
+            
+            async def extract():
+                nonlocal parsed
+                extracted = 0
+                try:
+                    async for event in self._extract_events_from_search_stream(search_results, query, max_events):
+                        extracted += 1
+                        pending.put_nowait(asyncio.create_task(self._add_geo_coordinates([event])))
+                except Exception:
+                    if extracted:
+                        return
+                    # Create a simulated event if extraction fails, and keep it out of the cache
+                    parsed = False
+                    fallback_event = self._fallback_stream_event(query)
+                    pending.put_nowait(asyncio.create_task(self._add_geo_coordinates([fallback_event])))
+                finally:
+                    pending.put_nowait(None)
+            
+            extractor = asyncio.create_task(extract())
+            try:
+                while (geocoding := await pending.get()) is not None:
+                    event_with_geo = await geocoding
+                    if event_with_geo:
+                        streamed_events.append(copy.deepcopy(event_with_geo[0]))
+                        yield {
+                            "type": "event",
+                            "event": event_with_geo[0],
+                            "timestamp": datetime.now().isoformat()
+                        }
+                await extractor
+                if parsed and streamed_events:
+                    self.search_cache.set(cache_key, streamed_events)
+            finally:
+                # The client may have disconnected mid-stream
+                extractor.cancel()
+                while not pending.empty():
+                    geocoding = pending.get_nowait()
+                    if geocoding is not None:
+                        geocoding.cancel()
+            
+            system_health.set("web_search", "available")
             
             # Final status
             yield {
@@ -116,12 +187,20 @@ class WebSearchAgent:
             }
             
         except Exception as e:
+            system_health.set("web_search", "unavailable")
             yield {
                 "type": "error",
                 "message": f"Search failed: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
     
+    def _get_cached_events(self, cache_key) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get a private copy of the events cached for a query, or None on a miss
+        """
+        events = self.search_cache.get(cache_key)
+        return copy.deepcopy(events) if events is not None else None
+    
     async def _perform_web_search(self, query: str) -> str:
         """
         Perform web search using OpenAI's web browsing capability
@@ -142,7 +221,7 @@ class WebSearchAgent:
             """
             
             # Use the web search tool via OpenAI
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a security intelligence analyst. Search the web for current security events and provide detailed, factual information."},
@@ -186,7 +265,7 @@ class WebSearchAgent:
         In production, this would be replaced with actual web search API calls
         """
         # Generate realistic search results based on common security events
-        simulated_results = await self.client.chat.completions.create(
+        simulated_results = await create_chat_completion(
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a security intelligence analyst. Generate realistic, current security event information that would be found in recent news searches. Make sure events have specific locations, dates, and security implications."},
@@ -196,11 +275,11 @@ class WebSearchAgent:
         
         return simulated_results.choices[0].message.content
     
-    async def _extract_events_from_search(self, search_results: str, original_query: str, max_events: int) -> List[Dict[str, Any]]:
+    def _build_extraction_prompt(self, search_results: str, original_query: str, max_events: int) -> str:
         """
-        Extract structured security events from web search results using AI
+        Build the prompt that turns search results into a JSON array of events
         """
-        extraction_prompt = f"""
+        return f"""
         Analyze the following search results and extract structured security events.
         Original search query: {original_query}
         
@@ -220,9 +299,17 @@ class WebSearchAgent:
         Return ONLY a JSON array of events, no other text.
         Ensure each event is realistic and based on the search results.
         """
+    
+    async def _extract_events_from_search(self, search_results: str, original_query: str, max_events: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Extract structured security events from web search results using AI,
+        returning the events and whether the model's response was actually parsed
+        """
+        extraction_prompt = self._build_extraction_prompt(search_results, original_query, max_events)
+        
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a security analyst extracting structured data. Return only valid JSON."},
@@ -253,7 +340,7 @@ class WebSearchAgent:
                     event["id"] = f"web_search_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i}"
                     processed_events.append(event)
             
-            return processed_events
+            return processed_events, True
             
         except json.JSONDecodeError as e:
             # Fallback: create a simple event from the query
@@ -267,206 +354,131 @@ class WebSearchAgent:
                 "timestamp": datetime.now().isoformat(),
                 "source": "Web Search",
                 "tags": ["web-search", "general"]
-            }]
+            }], False
         except Exception as e:
-            return []
+            return [], False
     
     async def _extract_events_from_search_stream(self, search_results: str, original_query: str, max_events: int) -> AsyncGenerator[Dict[str, Any], None]:
         """
-        Extract structured security events from web search results one by one
+        Extract structured security events from web search results, yielding each
+        event as soon as the model finishes generating it; errors propagate to the caller
         """
-        extraction_prompt = f"""
-        Analyze the following search results and extract structured security events.
-        Original search query: {original_query}
-        
-        Search Results:
-        {search_results}
-        
-        Extract up to {max_events} security events and format each as a JSON object with these fields:
-        - title: Brief descriptive title
-        - description: Detailed description of the event
-        - category: Choose the most appropriate category (e.g., "maritime", "climate", "supply-chain", "cyber", "conflict", "terrorism", "political", "economic", "social", "environmental", etc.)
-        - severity: One of ["low", "medium", "high", "critical"]
-        - location: Specific location name (city, region, country)
-        - timestamp: ISO format timestamp (use recent dates if not specified)
-        - source: News source or "Web Search"
-        - tags: Array of relevant tags
+        extraction_prompt = self._build_extraction_prompt(search_results, original_query, max_events)
         
-        Return ONLY a JSON array of events, no other text.
-        Ensure each event is realistic and based on the search results.
-        """
+        yielded = 0
+        stream = await create_chat_completion(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a security analyst extracting structured data. Return only valid JSON."},
+                {"role": "user", "content": extraction_prompt}
+            ],
+            temperature=0.3,
+            stream=True
+        )
         
-        try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a security analyst extracting structured data. Return only valid JSON."},
-                    {"role": "user", "content": extraction_prompt}
-                ],
-                temperature=0.3
-            )
-            
-            # Parse the JSON response
-            content = response.choices[0].message.content.strip()
-            
-            # Clean up the response to ensure it's valid JSON
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            events = json.loads(content)
-            
-            # Ensure we have a list
-            if not isinstance(events, list):
-                events = [events] if isinstance(events, dict) else []
-            
-            # Yield events one by one with a small delay for streaming effect
-            for event in events[:max_events]:
-                # Add some realistic delay to simulate processing time
-                await asyncio.sleep(0.5)
-                yield event
-                
-        except json.JSONDecodeError as e:
-            # If JSON parsing fails, try to extract events with regex
-            import re
-            
-            # Try to find JSON objects in the response
-            json_pattern = r'\{[^{}]*\}'
-            matches = re.findall(json_pattern, content)
-            
-            for match in matches[:max_events]:
-                try:
-                    event = json.loads(match)
-                    await asyncio.sleep(0.5)
+        parser = JsonArrayStreamParser()
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for event in parser.feed(chunk.choices[0].delta.content):
+                if isinstance(event, dict) and "title" in event:
+                    yielded += 1
                     yield event
-                except json.JSONDecodeError:
-                    continue
+                    if yielded >= max_events:
+                        await stream.close()
+                        return
         
-        except Exception as e:
-            # Create a simulated event if extraction fails
-            fallback_event = {
-                "title": f"Security Event: {original_query}",
-                "description": f"Simulated security event related to {original_query}",
-                "category": "general",
-                "severity": "medium",
-                "location": "Global",
-                "timestamp": datetime.now().isoformat(),
-                "source": "Web Search",
-                "tags": [original_query.lower()]
-            }
-            yield fallback_event
+        if not yielded:
+            raise ValueError("No events could be parsed from the extraction response")
+    
+    def _fallback_stream_event(self, original_query: str) -> Dict[str, Any]:
+        """
+        Build the simulated event streamed when extraction fails
+        """
+        return {
+            "title": f"Security Event: {original_query}",
+            "description": f"Simulated security event related to {original_query}",
+            "category": "general",
+            "severity": "medium",
+            "location": "Global",
+            "timestamp": datetime.now().isoformat(),
+            "source": "Web Search",
+            "tags": [original_query.lower()]
+        }
     
     async def _add_geo_coordinates(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Add latitude and longitude coordinates to events based on location
+        Add latitude and longitude coordinates to events based on location,
+        geocoding every distinct location in the batch together
         """
-        events_with_geo = []
+        coordinates = await self.geocoder.geocode_many(
+            event.get("location", "") for event in events
+        )
         
         for event in events:
-            location = event.get("location", "").lower()
-            
-            # Try to find coordinates from our mapping
-            lat, lon = await self._get_coordinates_for_location(location)
-            
+            lat, lon = coordinates[event.get("location", "")]
             event["lat"] = lat
             event["lon"] = lon
-            events_with_geo.append(event)
         
-        return events_with_geo
+        return events
     
     async def _get_coordinates_for_location(self, location: str) -> Tuple[float, float]:
         """
-        Get coordinates for a location using various methods
+        Get coordinates for a location from the geocode cache, the offline gazetteer or the LLM
         """
-        location_lower = location.lower().strip()
-        
-        # First, check our known locations
-        for known_location, coords in self.location_coords.items():
-            if known_location in location_lower or location_lower in known_location:
-                return coords
-        
-        # Try AI-based coordinate estimation
-        try:
-            coord_prompt = f"""
-            Provide the approximate latitude and longitude coordinates for: {location}
-            
-            Return only two numbers separated by a comma: latitude,longitude
-            For example: 40.7,-74.0
-            
-            If the location is very general or unknown, provide coordinates for the most likely region.
-            """
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a geography expert. Provide only latitude,longitude coordinates."},
-                    {"role": "user", "content": coord_prompt}
-                ],
-                temperature=0.1
-            )
-            
-            coord_text = response.choices[0].message.content.strip()
-            
-            # Parse coordinates
-            coords = coord_text.split(',')
-            if len(coords) == 2:
-                lat = float(coords[0].strip())
-                lon = float(coords[1].strip())
-                return lat, lon
-            
-        except Exception:
-            pass
-        
-        # Default to center of world map if all else fails
-        return 0.0, 0.0
+        return await self.geocoder.geocode(location)
     
-    async def integrate_events_with_existing(self, new_events: List[Dict[str, Any]], existing_events_file: str = "data/mock_events.json") -> Dict[str, Any]:
+    async def integrate_events_with_existing(self, new_events: List[Dict[str, Any]], existing_events_file: str = None) -> Dict[str, Any]:
         """
-        Integrate new web search events with existing events data
+        Integrate new web search events with existing events data.
+        Events go to the configured event store unless a JSON events file is given.
+        Repeats of a stored event are dropped and repeats within the batch merged.
         """
         try:
-            # Load existing events
-            try:
-                with open(existing_events_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            except FileNotFoundError:
-                existing_data = {"events": []}
-            
-            # Get current max ID
-            max_id = 0
-            for event in existing_data.get("events", []):
-                if isinstance(event.get("id"), int):
-                    max_id = max(max_id, event["id"])
+            writer = get_event_writer(existing_events_file)
+            # Fingerprinting every stored event on first use must not block the event loop
+            deduplicator = await asyncio.to_thread(get_event_deduplicator, existing_events_file)
             
-            # Add new events with proper IDs
-            added_events = []
+            # Drop incoming IDs so every new event gets the next free one
             for new_event in new_events:
-                max_id += 1
-                new_event["id"] = max_id
-                existing_data["events"].append(new_event)
-                added_events.append(new_event)
+                new_event.pop("id", None)
             
-            # Save updated events
-            with open(existing_events_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2, ensure_ascii=False)
+            async with self._integrate_lock:
+                with writer.store.synced():
+                    unique_events, merged_count, dropped_count = deduplicator.filter_new(new_events)
+                
+                # Queue new events with the single event writer, which assigns their IDs
+                added_events = await writer.add_events(unique_events) if unique_events else []
+            
+            if added_events and existing_events_file is None:
+                with writer.store.synced():
+                    seq = writer.store.changes.seq
+                event_bus.publish("events", {"added": added_events, "deleted": [], "seq": seq})
             
             return {
                 "success": True,
                 "added_count": len(added_events),
-                "total_events": len(existing_data["events"]),
+                "merged_count": merged_count,
+                "dropped_count": dropped_count,
+                "total_events": writer.store.count(),
                 "added_events": added_events
             }
             
         except Exception as e:
+            system_health.set("web_search", "unavailable")
             return {
                 "success": False,
                 "error": str(e),
-                "added_count": 0
+                "added_count": 0,
+                "merged_count": 0,
+                "dropped_count": 0
             }
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.http_client.aclose() 
\ No newline at end of file
+        await self.http_client.aclose() 
+
+# Global instance shared by request handlers and search agents
+web_search_agent = WebSearchAgent()
@@ -1,20 +1,17 @@
 import os
-from openai import AsyncOpenAI
 from typing import Dict, Any
-from .config import Config
+from .openai_client import get_openai_client, create_chat_completion, create_transcription
 
 class WhisperService:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=Config.get_openai_api_key()
-        )
+        self.client = get_openai_client()
     
     async def transcribe_audio(self, audio_path: str, language: str = None) -> Dict[str, Any]:
         """Transcribe audio using Whisper API"""
         try:
             with open(audio_path, "rb") as audio_file:
                 # Basic transcription
-                transcript = await self.client.audio.transcriptions.create(
+                transcript = await create_transcription(
                     model="whisper-1",
                     file=audio_file,
                     language=language,
@@ -58,7 +55,7 @@ Transcript:
 
 Provide a structured intelligence analysis focusing on security and diplomatic implications."""
 
-            response = await self.client.chat.completions.create(
+            response = await create_chat_completion(
                 model="gpt-4o",
                 messages=[
                     {
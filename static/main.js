@@ -7,18 +7,31 @@ let currentFilters = {
     region: '',
     search: ''
 };
-let eventData = [];
+// Events on the event list's loaded pages, by ID
+let listedEvents = new Map();
 let geoData = [];
 let eventsChart = null;
 let regionsChart = null;
 
+// Zoom levels above the server's clustering threshold show individual events
+const EVENT_MARKER_ZOOM = 8;
+const MAP_EVENT_LIMIT = 1000;
+const EVENT_PAGE_SIZE = 50;
+let eventListCursor = null;
+let eventListRequest = 0;
+let mapMarkersRequest = 0;
+let pendingPopupEventId = null;
+let eventSummaryRequest = 0;
+// Change sequence number the views are current as of, for catching up on changes
+let eventSeq = null;
+
 // Initialize the application
 document.addEventListener('DOMContentLoaded', function() {
     initializeMap();
     loadInitialData();
     setupEventListeners();
     updateSelectAllButtons(); // Initialize select all button states
-    startAutoRefresh();
+    startEventStream();
     initializeCharts();
     configureMarkdown();
 });
@@ -46,6 +59,9 @@ function initializeMap() {
 
     // Add custom styling
     map.getContainer().style.background = '#1a2332';
+
+    // Markers are fetched per viewport
+    map.on('moveend', updateMapMarkers);
 }
 
 // Load initial data from API
@@ -53,24 +69,25 @@ async function loadInitialData() {
     showLoading();
     
     try {
-        // Load events and geo data in parallel
-        const [eventsResponse, geoResponse] = await Promise.all([
-            fetch('/api/events'),
+        // Load event counts and geo data in parallel; the events themselves are
+        // fetched per map viewport and per event list page
+        const [summaryResponse, geoResponse] = await Promise.all([
+            fetch('/api/events/summary'),
             fetch('/api/geo-data')
         ]);
 
-        if (eventsResponse.ok) {
-            const eventsData = await eventsResponse.json();
-            eventData = eventsData.events || [];
+        if (summaryResponse.ok) {
+            const summary = await summaryResponse.json();
+            eventSeq = Number(summaryResponse.headers.get('X-Event-Seq'));
             
             // Generate dynamic event type filters
-            generateEventTypeFilters();
+            generateEventTypeFilters(summary.categories);
             
             updateEventList();
             updateMapMarkers();
-            updateHeaderStats();
-            updateMetrics();
-            updateCharts();
+            updateHeaderStats(summary);
+            updateMetrics(summary.filtered);
+            updateCharts(summary.filtered);
         }
 
         if (geoResponse.ok) {
@@ -244,7 +261,7 @@ function setupEventListeners() {
     if (refreshIntelligenceBtn) {
         refreshIntelligenceBtn.addEventListener('click', function() {
             // Since we removed the intelligence summary, this could refresh metrics instead
-            updateMetrics();
+            updateEventSummary();
         });
     }
 
@@ -319,8 +336,7 @@ function switchView(viewName) {
 function applyFilters() {
     updateEventList();
     updateMapMarkers();
-    updateMetrics();
-    updateCharts();
+    updateEventSummary();
 }
 
 // Update select all button states
@@ -361,65 +377,25 @@ function updateSelectAllButtons() {
     }
 }
 
-// Get filtered events
-function getFilteredEvents() {
-    return eventData.filter(event => {
-        // Type filter
-        if (!currentFilters.types.includes(event.category)) {
-            return false;
-        }
-        
-        // Severity filter
-        if (!currentFilters.severities.includes(event.severity)) {
-            return false;
-        }
-        
-        // Region filter
-        if (currentFilters.region && !event.location.toLowerCase().includes(currentFilters.region.toLowerCase())) {
-            return false;
-        }
-        
-        // Search filter
-        if (currentFilters.search) {
-            const searchableText = `${event.title} ${event.description} ${event.location}`.toLowerCase();
-            if (!searchableText.includes(currentFilters.search)) {
-                return false;
-            }
-        }
-        
-        return true;
+// Query string for /api/events with the current filters applied server-side
+function eventQueryParams(extra = {}) {
+    const params = new URLSearchParams({
+        category: currentFilters.types.join(','),
+        severity: currentFilters.severities.join(','),
+        ...extra
     });
+    if (currentFilters.region) params.set('region', currentFilters.region);
+    if (currentFilters.search) params.set('search', currentFilters.search);
+    return params;
 }
 
-// Update event list in the events view
-function updateEventList() {
-    const eventList = document.getElementById('events-list');
-    if (!eventList) return;
-    
-    let filteredEvents = getFilteredEvents();
-    
-    // Apply sorting
-    const sortBy = document.getElementById('events-sort')?.value || 'newest';
-    switch (sortBy) {
-        case 'oldest':
-            filteredEvents.sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
-            break;
-        case 'severity':
-            const severityOrder = { critical: 4, high: 3, medium: 2, low: 1 };
-            filteredEvents.sort((a, b) => severityOrder[b.severity] - severityOrder[a.severity]);
-            break;
-        case 'newest':
-        default:
-            filteredEvents.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-            break;
-    }
-
-    if (filteredEvents.length === 0) {
-        eventList.innerHTML = '<div class="no-events" style="text-align: center; padding: 2rem; color: #94a3b8;">No events found for current filters.</div>';
-        return;
-    }
+// Nothing can match when every type or every severity is unchecked
+function filtersExcludeEverything() {
+    return currentFilters.types.length === 0 || currentFilters.severities.length === 0;
+}
 
-    eventList.innerHTML = filteredEvents.map(event => `
+function renderEventItem(event) {
+    return `
         <div class="event-item">
             <div class="event-content" onclick="focusOnEvent(${event.id})">
                 <div class="event-title">${event.title}</div>
@@ -439,59 +415,175 @@ function updateEventList() {
                 </button>
             </div>
         </div>
-    `).join('');
+    `;
 }
 
-// Update map markers
-function updateMapMarkers() {
-    // Clear existing markers
-    eventMarkers.forEach(marker => map.removeLayer(marker));
-    eventMarkers = [];
+// Update event list in the events view, one page at a time
+async function updateEventList(append = false) {
+    const eventList = document.getElementById('events-list');
+    if (!eventList) return;
+
+    const request = ++eventListRequest;
+    if (!append) {
+        eventListCursor = null;
+        listedEvents = new Map();
+    }
+    if (filtersExcludeEverything()) {
+        eventList.innerHTML = '<div class="no-events" style="text-align: center; padding: 2rem; color: #94a3b8;">No events found for current filters.</div>';
+        return;
+    }
 
-    const filteredEvents = getFilteredEvents();
+    const sortBy = document.getElementById('events-sort')?.value || 'newest';
+    const params = eventQueryParams({ sort: sortBy, limit: EVENT_PAGE_SIZE });
+    if (append && eventListCursor) params.set('cursor', eventListCursor);
 
-    // Add new markers
-    filteredEvents.forEach(event => {
-        if (event.lat && event.lon) {
-            const severity = event.severity || 'medium';
-            const eventType = event.category || 'maritime';
-            const color = getEventTypeColor(eventType);
-            
-            const marker = L.circleMarker([event.lat, event.lon], {
-                radius: getSeverityRadius(severity),
-                fillColor: color,
-                color: '#ffffff',
-                weight: 2,
-                opacity: 0.8,
-                fillOpacity: 0.6
-            }).addTo(map);
-
-            // Add popup
-            marker.bindPopup(`
-                <div class="map-popup">
-                    <h4>${event.title}</h4>
-                    <p><strong>Location:</strong> ${event.location}</p>
-                    <p><strong>Severity:</strong> <span class="severity-${severity}">${severity.toUpperCase()}</span></p>
-                    <p><strong>Category:</strong> ${event.category}</p>
-                    <p>${event.description}</p>
-                    <p><small>${new Date(event.timestamp).toLocaleString()}</small></p>
+    try {
+        const response = await fetch(`/api/events?${params}`);
+        if (!response.ok || request !== eventListRequest) return;
+        const page = await response.json();
+        if (request !== eventListRequest) return;
+        eventListCursor = page.next_cursor;
+        page.events.forEach(event => listedEvents.set(event.id, event));
+
+        if (!append && page.events.length === 0) {
+            eventList.innerHTML = '<div class="no-events" style="text-align: center; padding: 2rem; color: #94a3b8;">No events found for current filters.</div>';
+            return;
+        }
+
+        const items = page.events.map(renderEventItem).join('');
+        if (append) {
+            eventList.querySelector('.load-more-events')?.remove();
+            eventList.insertAdjacentHTML('beforeend', items);
+        } else {
+            eventList.innerHTML = items;
+        }
+        if (eventListCursor) {
+            const shown = eventList.querySelectorAll('.event-item').length;
+            eventList.insertAdjacentHTML('beforeend', `
+                <div class="load-more-events" style="text-align: center; padding: 1rem;">
+                    <button class="btn" onclick="updateEventList(true)">Load more (${shown} of ${page.total} shown)</button>
                 </div>
             `);
+        }
+    } catch (error) {
+        console.error('Error loading events page:', error);
+    }
+}
+
+function addEventMarker(event) {
+    const severity = event.severity || 'medium';
+    const eventType = event.category || 'maritime';
+    const color = getEventTypeColor(eventType);
+
+    const marker = L.circleMarker([event.lat, event.lon], {
+        radius: getSeverityRadius(severity),
+        fillColor: color,
+        color: '#ffffff',
+        weight: 2,
+        opacity: 0.8,
+        fillOpacity: 0.6
+    }).addTo(map);
+
+    // Add popup
+    marker.bindPopup(`
+        <div class="map-popup">
+            <h4>${event.title}</h4>
+            <p><strong>Location:</strong> ${event.location}</p>
+            <p><strong>Severity:</strong> <span class="severity-${severity}">${severity.toUpperCase()}</span></p>
+            <p><strong>Category:</strong> ${event.category}</p>
+            <p>${event.description}</p>
+            <p><small>${new Date(event.timestamp).toLocaleString()}</small></p>
+        </div>
+    `);
+
+    marker.eventId = event.id;
+    eventMarkers.push(marker);
+}
 
-            eventMarkers.push(marker);
+function addClusterMarker(cluster) {
+    // Colour the cluster by its most severe event
+    const worst = ['critical', 'high', 'medium', 'low'].find(s => cluster.severity[s]) || 'medium';
+    const size = Math.min(48, 24 + Math.round(Math.log10(cluster.count) * 8));
+    const marker = L.marker([cluster.lat, cluster.lon], {
+        icon: L.divIcon({
+            className: 'event-cluster',
+            html: `<div style="width: ${size}px; height: ${size}px; line-height: ${size}px; border-radius: 50%;
+                        text-align: center; font-size: 12px; font-weight: 600; color: #ffffff;
+                        background: ${getSeverityColor(worst)}; opacity: 0.85; border: 2px solid #ffffff;">${cluster.count}</div>`,
+            iconSize: [size, size]
+        })
+    }).addTo(map);
+
+    const [south, west, north, east] = cluster.bounds;
+    marker.on('click', () => map.fitBounds([[south, west], [north, east]]));
+    eventMarkers.push(marker);
+}
+
+// Update map markers for the current viewport: clusters when zoomed out, events when zoomed in
+async function updateMapMarkers() {
+    if (!map) return;
+    const request = ++mapMarkersRequest;
+
+    let markers = { mode: 'events', events: [] };
+    if (!filtersExcludeEverything()) {
+        const params = eventQueryParams({
+            bbox: map.getBounds().toBBoxString(),
+            zoom: map.getZoom(),
+            limit: MAP_EVENT_LIMIT
+        });
+        try {
+            const response = await fetch(`/api/events?${params}`);
+            if (!response.ok) return;
+            markers = await response.json();
+        } catch (error) {
+            console.error('Error loading map markers:', error);
+            return;
         }
-    });
+    }
+    // A newer viewport was requested while this one was loading
+    if (request !== mapMarkersRequest) return;
+
+    // Clear existing markers
+    eventMarkers.forEach(marker => map.removeLayer(marker));
+    eventMarkers = [];
+
+    if (markers.mode === 'clusters') {
+        markers.clusters.forEach(addClusterMarker);
+    } else {
+        markers.events.forEach(addEventMarker);
+        if (pendingPopupEventId !== null) {
+            eventMarkers.find(m => m.eventId === pendingPopupEventId)?.openPopup();
+            pendingPopupEventId = null;
+        }
+    }
 }
 
-// Update metrics
-function updateMetrics() {
-    const filteredEvents = getFilteredEvents();
-    const highSeverityEvents = filteredEvents.filter(e => e.severity === 'high' || e.severity === 'critical');
-    const activeRegions = new Set(filteredEvents.map(e => e.location)).size;
+// Fetch event counts for the current filters and redraw the header, metrics and charts
+async function updateEventSummary() {
+    const request = ++eventSummaryRequest;
+    try {
+        const response = await fetch(`/api/events/summary?${eventQueryParams()}`);
+        if (!response.ok || request !== eventSummaryRequest) return;
+        const summary = await response.json();
+        if (request !== eventSummaryRequest) return;
+        if (filtersExcludeEverything()) {
+            summary.filtered = { total: 0, by_severity: {}, by_region: {} };
+        }
+        updateHeaderStats(summary);
+        updateMetrics(summary.filtered);
+        updateCharts(summary.filtered);
+    } catch (error) {
+        console.error('Error loading event summary:', error);
+    }
+}
+
+// Update metrics from the filtered events' counts
+function updateMetrics(counts) {
+    const bySeverity = counts.by_severity;
     
-    document.getElementById('total-events').textContent = filteredEvents.length;
-    document.getElementById('high-severity').textContent = highSeverityEvents.length;
-    document.getElementById('active-regions').textContent = activeRegions;
+    document.getElementById('total-events').textContent = counts.total;
+    document.getElementById('high-severity').textContent = (bySeverity.high || 0) + (bySeverity.critical || 0);
+    document.getElementById('active-regions').textContent = Object.keys(counts.by_region).length;
 }
 
 // Initialize charts
@@ -558,37 +650,25 @@ function initializeCharts() {
     }
 }
 
-// Update charts with current data
-function updateCharts() {
-    const filteredEvents = getFilteredEvents();
-    
+// Update charts from the filtered events' counts
+function updateCharts(counts) {
     // Update severity chart
     if (eventsChart) {
-        const severityCounts = {
-            critical: filteredEvents.filter(e => e.severity === 'critical').length,
-            high: filteredEvents.filter(e => e.severity === 'high').length,
-            medium: filteredEvents.filter(e => e.severity === 'medium').length,
-            low: filteredEvents.filter(e => e.severity === 'low').length
-        };
+        const severityCounts = counts.by_severity;
         
         eventsChart.data.datasets[0].data = [
-            severityCounts.critical,
-            severityCounts.high,
-            severityCounts.medium,
-            severityCounts.low
+            severityCounts.critical || 0,
+            severityCounts.high || 0,
+            severityCounts.medium || 0,
+            severityCounts.low || 0
         ];
         eventsChart.update();
     }
     
     // Update regions chart
     if (regionsChart) {
-        const regionCounts = {};
-        filteredEvents.forEach(event => {
-            const region = event.location.split(',')[0]; // Get first part of location
-            regionCounts[region] = (regionCounts[region] || 0) + 1;
-        });
-        
-        const sortedRegions = Object.entries(regionCounts)
+        // Regions are the first part of each location
+        const sortedRegions = Object.entries(counts.by_region)
             .sort(([,a], [,b]) => b - a)
             .slice(0, 6); // Top 6 regions
         
@@ -635,9 +715,7 @@ function generateColorFromString(str) {
     return `hsl(${hue}, ${saturation}%, ${lightness}%)`;
 }
 
-function generateEventTypeFilters() {
-    // Get all unique event types from current data
-    const eventTypes = [...new Set(eventData.map(event => event.category))].sort();
+function generateEventTypeFilters(eventTypes) {
     
     // Initialize filters to include all types
     currentFilters = {
@@ -722,20 +800,12 @@ function focusOnEvent(eventId) {
     document.querySelectorAll('.tab-btn').forEach(btn => btn.classList.remove('active'));
     document.getElementById('map-tab').classList.add('active');
     
-    const event = eventData.find(e => e.id === eventId);
+    const event = listedEvents.get(eventId);
     if (event && event.lat && event.lon) {
         setTimeout(() => {
-            map.setView([event.lat, event.lon], 6);
-            
-            // Find and open the popup for this event
-            const marker = eventMarkers.find(m => {
-                const latLng = m.getLatLng();
-                return Math.abs(latLng.lat - event.lat) < 0.01 && Math.abs(latLng.lng - event.lon) < 0.01;
-            });
-            
-            if (marker) {
-                marker.openPopup();
-            }
+            // Open the popup once the markers for the new viewport have loaded
+            pendingPopupEventId = eventId;
+            map.setView([event.lat, event.lon], EVENT_MARKER_ZOOM);
         }, 200);
     }
 }
@@ -748,7 +818,7 @@ async function deleteEvent(eventId, clickEvent) {
     }
     
     // Find the event to get its title for confirmation
-    const event = eventData?.find(e => e.id === eventId);
+    const event = listedEvents.get(eventId);
     const eventTitle = event ? event.title : `Event ${eventId}`;
     
     // Show confirmation dialog
@@ -1122,10 +1192,10 @@ function updateIntelligenceSummary(intelligence) {
     }
 }
 
-// Update header statistics
-function updateHeaderStats() {
-    document.getElementById('event-count').textContent = eventData.length;
-    document.getElementById('regions-monitored').textContent = new Set(eventData.map(e => e.location)).size;
+// Update header statistics from the counts of every event
+function updateHeaderStats(summary) {
+    document.getElementById('event-count').textContent = summary.total;
+    document.getElementById('regions-monitored').textContent = summary.regions;
 }
 
 // Show analysis result
@@ -1157,56 +1227,85 @@ function showNotification(message, type = 'info') {
     addChatMessage(`System: ${message}`, 'ai');
 }
 
-// Auto-refresh data every 30 seconds
-function startAutoRefresh() {
-    setInterval(async () => {
-        try {
-            const response = await fetch('/api/events');
-            if (response.ok) {
-                const eventsData = await response.json();
-                const newEventCount = eventsData.events?.length || 0;
-                
-                if (newEventCount !== eventData.length) {
-                    eventData = eventsData.events || [];
-                    updateEventList();
-                    updateMapMarkers();
-                    updateHeaderStats();
-                    updateMetrics();
-                    updateCharts();
-                    
-                    showNotification(`Updated: ${newEventCount} events detected`, 'info');
-                }
-            }
-        } catch (error) {
-            console.error('Auto-refresh error:', error);
-        }
-    }, 30000); // 30 seconds
+// Catch up on changes made while the push channel was not connected
+async function syncEventChanges() {
+    // Nothing to catch up on until the initial load has finished
+    if (eventSeq === null) return;
+    const response = await fetch(`/api/events/changes?since=${eventSeq}`);
+    if (!response.ok) return;
+    const changes = await response.json();
+    if (changes.reset) {
+        // Too far behind to catch up incrementally
+        await loadInitialData();
+        return;
+    }
+    eventSeq = Math.max(eventSeq, changes.seq);
+    if (changes.added.length || changes.deleted.length) {
+        refreshEventViews();
+    }
 }
 
-// Health check function
-async function checkSystemHealth() {
-    try {
-        const response = await fetch('/api/health');
-        if (response.ok) {
-            const health = await response.json();
-            const statusElement = document.getElementById('system-status');
-            const dot = statusElement.querySelector('.status-dot');
-            
-            if (health.status === 'healthy') {
-                dot.classList.add('active');
-                statusElement.querySelector('span:last-child').textContent = 'System Online';
+let eventViewsRefreshTimer = null;
+
+// Reload every view of the events, coalescing bursts of pushed changes
+function refreshEventViews() {
+    clearTimeout(eventViewsRefreshTimer);
+    eventViewsRefreshTimer = setTimeout(() => {
+        updateEventList();
+        updateMapMarkers();
+        updateEventSummary();
+    }, 500);
+}
+
+// Receive event, agent and health updates over one Server-Sent Events channel
+function startEventStream() {
+    const source = new EventSource('/api/stream');
+
+    source.addEventListener('open', () => {
+        syncEventChanges().catch(error => console.error('Error syncing events:', error));
+    });
+
+    source.addEventListener('events', message => {
+        const changes = JSON.parse(message.data);
+        refreshEventViews();
+        if (eventSeq !== null && changes.seq > eventSeq) {
+            // Each added or deleted event takes one sequence number; a gap means
+            // changes we have not been sent yet, which the changes feed fills in
+            if (changes.seq === eventSeq + changes.added.length + changes.deleted.length) {
+                eventSeq = changes.seq;
             } else {
-                dot.classList.remove('active');
-                statusElement.querySelector('span:last-child').textContent = 'System Issues';
+                syncEventChanges().catch(error => console.error('Error syncing events:', error));
             }
         }
-    } catch (error) {
-        console.error('Health check failed:', error);
-    }
+        if (changes.added.length) {
+            showNotification(`${changes.added.length} new events added`, 'info');
+        }
+    });
+
+    source.addEventListener('agents', message => {
+        applyAgentStatus(JSON.parse(message.data));
+    });
+
+    source.addEventListener('health', message => {
+        showSystemHealth(JSON.parse(message.data));
+    });
+
+    // The browser reconnects on its own; the open handler then resyncs
+    source.addEventListener('error', () => {
+        setSystemStatus(false, 'Reconnecting...');
+    });
+}
+
+function setSystemStatus(online, text) {
+    const statusElement = document.getElementById('system-status');
+    if (!statusElement) return;
+    statusElement.querySelector('.status-dot').classList.toggle('active', online);
+    statusElement.querySelector('span:last-child').textContent = text;
 }
 
-// Check system health every minute
-setInterval(checkSystemHealth, 60000);
+function showSystemHealth(health) {
+    setSystemStatus(health.status === 'healthy', health.status === 'healthy' ? 'System Online' : 'System Issues');
+}
 
 // Map chat sidebar functionality
 function toggleMapChatSidebar() {
@@ -1675,6 +1774,12 @@ async function addAllWebSearchStreamEvents(element) {
             
             // Close modal after short delay
             setTimeout(() => closeWebSearchStreamModal(element), 2000);
+        } else if (result.integration_result && result.integration_result.success) {
+            // Every event repeated one already on the map
+            element.innerHTML = `<i class="fas fa-check"></i> Already on Map`;
+            element.style.backgroundColor = '#6b7280';
+            showNotification('These events are already on the map', 'info');
+            setTimeout(() => closeWebSearchStreamModal(element), 2000);
         } else {
             throw new Error('Failed to integrate events');
         }
@@ -1762,9 +1867,6 @@ async function deploySearchAgents(searchTerms) {
             // Update agent display
             updateActiveAgentsDisplay();
             
-            // Start monitoring for events
-            startAgentMonitoring();
-            
             showNotification(`Deployed ${searchTerms.length} search agents`, 'success');
             
         } else {
@@ -1815,9 +1917,6 @@ async function stopAllSearchAgents() {
             // Update agent display
             updateActiveAgentsDisplay();
             
-            // Stop monitoring
-            stopAgentMonitoring();
-            
             showNotification('All search agents stopped', 'info');
             
         } else {
@@ -1888,8 +1987,6 @@ async function stopSingleAgent(searchTerm) {
                 
                 statusDiv.textContent = 'All search agents stopped';
                 statusDiv.style.color = '#94a3b8';
-                
-                stopAgentMonitoring();
             }
             
             showNotification(`Stopped agent: ${searchTerm}`, 'info');
@@ -1900,44 +1997,16 @@ async function stopSingleAgent(searchTerm) {
     }
 }
 
-let agentMonitoringInterval;
-
-function startAgentMonitoring() {
-    // Poll for new events every 30 seconds
-    agentMonitoringInterval = setInterval(async () => {
-        try {
-            const response = await fetch('/api/agent-status');
-            const result = await response.json();
-            
-            if (result.success && result.agents) {
-                // Update agent status
-                result.agents.forEach(agentStatus => {
-                    if (activeAgents.has(agentStatus.term)) {
-                        const agent = activeAgents.get(agentStatus.term);
-                        agent.eventsFound = agentStatus.events_found;
-                        agent.status = agentStatus.status;
-                    }
-                });
-                
-                updateActiveAgentsDisplay();
-                
-                // Refresh map if new events were found
-                if (result.new_events_count > 0) {
-                    await loadInitialData();
-                    showNotification(`${result.new_events_count} new events found by search agents`, 'success');
-                }
-            }
-        } catch (error) {
-            console.error('Error monitoring agents:', error);
+// Apply pushed agent status to the agents this dashboard deployed
+function applyAgentStatus(status) {
+    status.agents.forEach(agentStatus => {
+        if (activeAgents.has(agentStatus.term)) {
+            const agent = activeAgents.get(agentStatus.term);
+            agent.eventsFound = agentStatus.events_found;
+            agent.status = agentStatus.status;
         }
-    }, 30000); // 30 seconds
-}
-
-function stopAgentMonitoring() {
-    if (agentMonitoringInterval) {
-        clearInterval(agentMonitoringInterval);
-        agentMonitoringInterval = null;
-    }
+    });
+    updateActiveAgentsDisplay();
 }
 
 function showWebSearchResults(events) {
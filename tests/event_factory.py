@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Random events shared by the index and analytics tests
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+SEVERITIES = ["critical", "high", "medium", "low"]
+CATEGORIES = ["maritime", "climate", "supply-chain", "cyber"]
+PLACES = ["Red Sea", "Taiwan Strait", "Kharkiv", "Suez Canal", "Baltic Sea"]
+
+
+def random_events(count, seed=3, categories=CATEGORIES, start="2025-01-10", days=260, ids=False):
+    """
+    `count` events with a random severity, category, place, position and timestamp
+    (UTC, within `days` days of `start`), numbered from 0 when `ids` is set
+    """
+    rng = random.Random(seed)
+    first = datetime.fromisoformat(start).replace(tzinfo=timezone.utc)
+    events = []
+    for i in range(count):
+        timestamp = first + timedelta(seconds=rng.randrange(days * 86400))
+        event = {
+            "title": f"Event {i}",
+            "severity": rng.choice(SEVERITIES),
+            "category": rng.choice(categories),
+            "location": f"{rng.choice(PLACES)}, Somewhere",
+            "lat": rng.uniform(-80, 80),
+            "lon": rng.uniform(-180, 180),
+            "timestamp": timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        if ids:
+            event["id"] = i
+        events.append(event)
+    return events
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the LRU/TTL cache and the web search query normalization that keys it
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from services.cache import LRUCache
+from services.web_search_agent import normalize_query
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_and_rejects_oversized_values():
+    cache = LRUCache(max_bytes=20)
+    cache.set("a", "x" * 9)
+    cache.set("b", "y" * 9)
+    assert len(cache) == 1 and cache.get("b") == "y" * 9
+
+    cache.set("big", "z" * 50)
+    assert cache.get("big") is None
+    assert cache.stats()["bytes"] <= 20
+
+
+def test_expired_entries_are_misses():
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_equivalent_queries_share_a_key():
+    assert normalize_query("Red Sea attacks") == normalize_query("attack in the red sea")
+    assert normalize_query("Latest news: Kyiv drones") == normalize_query("drone kyiv")
+    assert normalize_query("red sea shipping") != normalize_query("red sea attacks")
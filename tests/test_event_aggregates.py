@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the incrementally maintained aggregates behind the statistics and analysis tools
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_factory import random_events
+from services.event_aggregates import EventAggregates
+from services.event_columns import EventColumns
+from services.event_store import EventStore, event_region
+
+
+
+def scan_counts(events, field):
+    counts = {}
+    for event in events:
+        key = event_region(event) if field == "region" else event.get(field, "unknown")
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def test_aggregates_match_scans_through_adds_and_deletes(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    aggregates = store.register_index(EventAggregates())
+    stored = store.add_events(random_events(400))
+    for event in stored[::4]:
+        store.delete_event(event["id"])
+    remaining = store.get_events()
+
+    with store.synced():
+        view = aggregates.view()
+        assert view.total == len(remaining)
+        for field in ("severity", "category", "region"):
+            # Same groups in the same first-appearance order as the store's count_by
+            assert list(view.counts(field).items()) == list(store.count_by(field).items())
+
+        critical = [e for e in remaining if e["severity"] == "critical"]
+        assert view.where("severity", ["critical"]).first_events(3) == critical[:3]
+        assert view.where("severity", ["critical"]).last_event() == critical[-1]
+
+        climate = [e for e in remaining if e["category"] == "climate"]
+        timestamps = sorted(e["timestamp"] for e in climate)
+        assert view.where("category", ["climate"]).time_range() == (timestamps[0], timestamps[-1])
+
+        high_priority = [e for e in remaining if e["severity"] in ("critical", "high")]
+        assert view.where("severity", ["critical", "high"]).first_events(5) == high_priority[:5]
+
+
+def test_time_range_recovers_after_the_extremes_are_deleted():
+    aggregates = EventAggregates()
+    events = [{"id": i, "severity": "low", "category": "climate", "location": "Red Sea",
+               "timestamp": f"2025-01-{10 + i}T00:00:00"} for i in range(5)]
+    for event in events:
+        aggregates.add(event)
+    assert aggregates.view().time_range() == ("2025-01-10T00:00:00", "2025-01-14T00:00:00")
+
+    version = aggregates.version
+    aggregates.remove(events[0])
+    aggregates.remove(events[4])
+    assert aggregates.version > version
+    assert aggregates.view().time_range() == ("2025-01-11T00:00:00", "2025-01-13T00:00:00")
+
+
+def test_aggregates_of_a_filtered_list():
+    events = random_events(50, ids=True)
+    subset = [e for e in events if "Red Sea" in e["location"]]
+    view = EventAggregates.of(subset)
+    assert view.total == len(subset)
+    assert view.counts("category") == scan_counts(subset, "category")
+
+
+def test_aggregates_agree_with_column_scans(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    aggregates = store.register_index(EventAggregates())
+    columns = store.register_index(EventColumns())
+    stored = store.add_events(random_events(300, seed=5))
+    for event in stored[::3]:
+        store.delete_event(event["id"])
+
+    with store.synced():
+        for where in ((), ("severity", ["critical"]), ("category", ["climate", "cyber"])):
+            cells, scan = aggregates.view(), columns.view()
+            if where:
+                cells, scan = cells.where(*where), scan.where(*where)
+            assert list(cells.crosstab("region", "severity").items()) == list(scan.crosstab("region", "severity").items())
+            assert cells.events() == scan.events()
+            assert list(cells.bucket_counts().items()) == list(scan.bucket_counts().items())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the pub/sub bus behind the /api/stream push channel
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_bus import KEEPALIVE_FRAME, EventBus
+
+
+async def take(frames, count):
+    return [await frames.__anext__() for _ in range(count)]
+
+
+def test_messages_fan_out_to_every_subscriber_in_order():
+    async def run():
+        bus = EventBus()
+        first, second = bus.subscribe(), bus.subscribe()
+        bus.publish("events", {"added": [{"id": 1}], "deleted": []})
+        bus.publish("agents", {"agents": []})
+        received = [await take(s.frames(), 2) for s in (first, second)]
+        return bus, received
+
+    bus, received = asyncio.run(run())
+    assert received[0] == received[1]
+    assert received[0][0] == 'event: events\ndata: {"added": [{"id": 1}], "deleted": []}\n\n'
+    assert received[0][1].startswith("event: agents\n")
+    assert bus.stats()["published"] == 2
+
+
+def test_slow_consumers_are_dropped_without_blocking_others():
+    async def run():
+        bus = EventBus(max_queue=3)
+        slow, fast = bus.subscribe(), bus.subscribe()
+        fast_frames = fast.frames()
+        received = []
+        for i in range(5):
+            bus.publish("events", {"added": [], "deleted": [i]})
+            received.extend(await take(fast_frames, 1))
+        slow_frames = [frame async for frame in slow.frames()]
+        return bus.stats(), received, slow_frames
+
+    stats, received, slow_frames = asyncio.run(run())
+    assert len(received) == 5
+    assert [f.split("\n")[0] for f in slow_frames] == ["event: dropped"]
+    assert stats == {"subscribers": 1, "published": 5, "dropped": 1}
+
+
+def test_publish_from_another_thread_and_keepalive():
+    async def run():
+        bus = EventBus()
+        subscription = bus.subscribe()
+        frames = subscription.frames(keepalive=0.01)
+        keepalive = await frames.__anext__()
+        thread = threading.Thread(target=bus.publish, args=("health", {"status": "healthy"}))
+        thread.start()
+        thread.join()
+        message = await frames.__anext__()
+        while message == KEEPALIVE_FRAME:
+            message = await frames.__anext__()
+        await frames.aclose()
+        return bus, keepalive, message
+
+    bus, keepalive, message = asyncio.run(run())
+    assert keepalive == KEEPALIVE_FRAME
+    assert message.startswith("event: health\n")
+    # Closing the stream unsubscribes it
+    assert bus.stats()["subscribers"] == 0
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the change feed behind /api/events/changes
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_changes import ChangeLog
+from services.event_store import EventStore
+from services.sqlite_event_store import SQLiteEventStore
+
+
+def test_changes_since_a_sequence_are_net_of_later_changes(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    store.add_events([{"title": "Kept"}, {"title": "Deleted later"}])
+    with store.synced():
+        start = store.changes.seq
+
+    added = store.add_events([{"title": "New"}, {"title": "Short-lived"}])
+    store.delete_event(added[1]["id"])
+    store.delete_event(1)
+    with store.synced():
+        changes = store.changes.since(start)
+        assert changes["seq"] == store.changes.seq > start
+    assert not changes["reset"]
+    assert [e["title"] for e in changes["added"]] == ["New"]
+    assert sorted(changes["deleted"]) == sorted([added[1]["id"], 1])
+
+    with store.synced():
+        assert store.changes.since(changes["seq"]) == {"seq": changes["seq"], "reset": False, "added": [], "deleted": []}
+
+
+def test_writes_from_another_process_show_up_as_changes(tmp_path):
+    path = str(tmp_path / "events.json")
+    reader, writer = EventStore(path), EventStore(path)
+    with reader.synced():
+        start = reader.changes.seq
+
+    writer.add_events([{"title": "From the writer"}])
+    with reader.synced():
+        assert [e["title"] for e in reader.changes.since(start)["added"]] == ["From the writer"]
+
+
+def test_old_or_future_sequences_and_reloads_ask_for_a_reset(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    store.add_events([{"title": "One"}])
+    with store.synced():
+        seq = store.changes.seq
+        assert store.changes.since(0)["reset"]
+        assert store.changes.since(seq + 1)["reset"]
+
+    store.save({"events": [{"id": 1, "title": "Replaced"}]})
+    with store.synced():
+        assert store.changes.since(seq)["reset"]
+        assert store.changes.seq > seq
+
+
+def test_history_is_trimmed_to_the_most_recent_changes():
+    log = ChangeLog(max_changes=10)
+    start = log.seq
+    for i in range(25):
+        log.add({"id": i})
+    assert log.since(start)["reset"]
+    assert [e["id"] for e in log.since(log.seq - 10)["added"]] == list(range(15, 25))
+
+
+def test_sqlite_store_tracks_changes(tmp_path):
+    store = SQLiteEventStore(str(tmp_path / "events.db"))
+    with store.synced():
+        start = store.changes.seq
+    stored = store.add_events([{"title": "A"}, {"title": "B"}])
+    store.delete_event(stored[0]["id"])
+    with store.synced():
+        changes = store.changes.since(start)
+    assert [e["title"] for e in changes["added"]] == ["B"]
+    assert changes["deleted"] == [stored[0]["id"]]
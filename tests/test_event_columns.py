@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar analytics behind the MCP statistics and analysis tools
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_factory import random_events
+from services import event_columns
+from services.event_columns import EventColumns
+from services.event_store import EventStore, parse_time
+
+
+
+def test_columns_match_scans_through_adds_and_deletes(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    columns = store.register_index(EventColumns(capacity=16))
+    stored = store.add_events(random_events(400))
+    for event in stored[::4]:
+        store.delete_event(event["id"])
+    remaining = store.get_events()
+
+    with store.synced():
+        view = columns.view()
+        assert view.total == len(remaining)
+        for field in ("severity", "category", "region"):
+            assert list(view.counts(field).items()) == list(store.count_by(field).items())
+
+        critical = [e for e in remaining if e["severity"] == "critical"]
+        assert view.where("severity", ["critical"]).events() == critical
+        assert view.where("severity", ["critical"]).first_events(3) == critical[:3]
+        assert view.where("severity", ["critical"]).last_event() == critical[-1]
+
+        climate = [e for e in remaining if e["category"] == "climate"]
+        timestamps = sorted(e["timestamp"] for e in climate)
+        assert view.where("category", ["climate"]).time_range() == (timestamps[0], timestamps[-1])
+
+        high_red_sea = [e for e in remaining if e["severity"] in ("critical", "high") and e["location"].startswith("Red Sea")]
+        assert view.where("severity", ["critical", "high"]).where("region", ["Red Sea"]).events() == high_red_sea
+        assert view.where("severity", ["unheard of"]).total == 0
+
+
+def test_time_filters_and_daily_buckets():
+    columns = EventColumns()
+    events = random_events(300, ids=True)
+    events.append({"id": 300, "severity": "low", "title": "No time"})
+    for event in events:
+        columns.add(event)
+
+    view = columns.view()
+    start, end = parse_time("2025-03-01T00:00:00"), parse_time("2025-05-01T00:00:00")
+    in_range = [e for e in events if "timestamp" in e and "2025-03" <= e["timestamp"] < "2025-05"]
+    assert view.between(start, end).events() == in_range
+    assert view.time_range()[0] == ""  # the event without a timestamp sorts first
+
+    daily = view.bucket_counts()
+    expected = {}
+    for event in events[:-1]:
+        day = event["timestamp"][:10] + "T00:00:00+00:00"
+        expected[day] = expected.get(day, 0) + 1
+    assert daily == dict(sorted(expected.items()))
+
+
+def test_compaction_keeps_rows_in_order(monkeypatch):
+    monkeypatch.setattr(event_columns, "MIN_COMPACT_ROWS", 8)
+    columns = EventColumns(capacity=4)
+    events = random_events(100, ids=True)
+    for event in events:
+        columns.add(event)
+    for event in events[:70]:
+        columns.remove(event)
+
+    assert len(columns._events) < 100  # compacted
+    view = columns.view()
+    assert view.events() == events[70:]
+    assert [e["id"] for e in columns.view_of({75, 80, 3}).events()] == [75, 80]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate detection of ingested events
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_dedup import EventDeduplicator
+from services.event_store import EventStore
+from services.sqlite_event_store import SQLiteEventStore
+
+STORED = {
+    "id": 1,
+    "title": "Houthi attack on cargo ship in Red Sea",
+    "description": "Houthi forces launched drones at a cargo vessel transiting the southern Red Sea.",
+    "location": "Red Sea",
+    "timestamp": "2024-01-15T14:30:00Z",
+}
+
+
+def event(**fields):
+    return {**STORED, **fields}
+
+
+def write_events(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+
+
+def test_repeats_of_stored_events_are_dropped_and_batch_repeats_merged(tmp_path):
+    data_file = tmp_path / "events.json"
+    write_events(data_file, [STORED])
+    store = EventStore(str(data_file))
+    dedup = store.register_index(EventDeduplicator())
+
+    incoming = [
+        event(id=None, title="Houthi Attacks on Cargo Ships in the Red Sea"),
+        event(id=None, description="Drones were launched by Houthi forces at a cargo vessel in the southern Red Sea."),
+        {"title": "Cyber attack on Baltic power grid", "description": "Outage after intrusion.",
+         "location": "Estonia", "timestamp": "2024-01-15T10:00:00Z"},
+        {"title": "Cyber attack on Baltic power grid", "description": "Grid operator reports intrusion.",
+         "location": "Estonia", "timestamp": "2024-01-15T11:00:00Z"},
+    ]
+    unique, merged, dropped = dedup.filter_new(incoming)
+
+    assert [e["location"] for e in unique] == ["Estonia"]
+    assert (merged, dropped) == (1, 2)
+
+
+def test_same_words_elsewhere_or_much_later_are_new():
+    dedup = EventDeduplicator()
+    dedup.add(STORED)
+
+    assert dedup.find_duplicate(event(location="Gulf of Aden")) is None
+    assert dedup.find_duplicate(event(timestamp="2024-03-01T00:00:00Z")) is None
+    assert dedup.find_duplicate(event(location="Red Sea, off Yemen")) == 1
+
+
+def test_index_follows_store_writes_and_reloads(tmp_path):
+    data_file = tmp_path / "events.json"
+    store = EventStore(str(data_file))
+    dedup = store.register_index(EventDeduplicator())
+
+    stored = store.add_events([event(id=None)])[0]
+    with store.synced():
+        assert dedup.find_duplicate(event()) == stored["id"]
+
+    store.delete_event(stored["id"])
+    with store.synced():
+        assert dedup.find_duplicate(event()) is None
+
+    # Another process writes the log; the index catches up on the next read
+    EventStore(str(data_file)).add_events([event(id=None)])
+    with store.synced():
+        assert dedup.find_duplicate(event()) is not None
+
+
+def test_sqlite_store_keeps_indexes_in_step(tmp_path):
+    db_file = str(tmp_path / "events.db")
+    store = SQLiteEventStore(db_file)
+    dedup = store.register_index(EventDeduplicator())
+
+    stored = store.add_events([event(id=None)])[0]
+    with store.synced():
+        assert dedup.find_duplicate(event()) == stored["id"]
+
+    SQLiteEventStore(db_file).delete_event(stored["id"])
+    with store.synced():
+        assert dedup.find_duplicate(event()) is None
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared in-memory event store
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_store import EventStore
+
+
+def write_events(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+
+
+def test_reuses_parsed_events_until_file_changes(tmp_path):
+    data_file = tmp_path / "events.json"
+    write_events(data_file, [{"id": 1, "title": "First"}])
+    store = EventStore(str(data_file))
+
+    assert [e["id"] for e in store.get_events()] == [1]
+    version = store.version
+    store.get_events()
+    assert store.version == version
+
+    write_events(data_file, [{"id": 1, "title": "First"}, {"id": 2, "title": "Second"}])
+    os.utime(data_file, ns=(0, os.stat(data_file).st_mtime_ns + 1_000_000))
+    assert [e["id"] for e in store.get_events()] == [1, 2]
+    assert store.version > version
+
+
+def test_save_updates_memory_and_disk(tmp_path):
+    data_file = tmp_path / "events.json"
+    store = EventStore(str(data_file))
+    assert store.load() == {"events": []}
+
+    data = store.load()
+    data["events"].append({"id": 7, "title": "Added"})
+    store.save(data)
+
+    assert [e["id"] for e in store.get_events()] == [7]
+    with open(data_file, encoding="utf-8") as f:
+        assert json.load(f)["events"][0]["id"] == 7
+
+
+def test_returned_lists_do_not_alias_store(tmp_path):
+    data_file = tmp_path / "events.json"
+    write_events(data_file, [{"id": 1}])
+    store = EventStore(str(data_file))
+
+    store.get_events().clear()
+    store.load()["events"].append({"id": 2})
+    assert [e["id"] for e in store.get_events()] == [1]
+
+
+def test_writes_append_to_log_and_replay_in_new_store(tmp_path):
+    data_file = tmp_path / "events.json"
+    write_events(data_file, [{"id": 1, "title": "First"}])
+    store = EventStore(str(data_file))
+
+    added = store.add_events([{"title": "Second"}, {"id": "web_search_0", "title": "Third"}])
+    assert [e["id"] for e in added] == [2, 3]
+    assert store.delete_event(1)
+    assert not store.delete_event(99)
+
+    # The snapshot is untouched until compaction
+    with open(data_file, encoding="utf-8") as f:
+        assert len(json.load(f)["events"]) == 1
+    assert len(store.log_file.read_text().splitlines()) == 3
+
+    reader = EventStore(str(data_file))
+    assert [e["id"] for e in reader.get_events()] == [2, 3]
+
+    store.add_events([{"title": "Fourth"}])
+    assert [e["id"] for e in reader.get_events()] == [2, 3, 4]
+
+
+def test_compaction_folds_log_into_snapshot(tmp_path):
+    data_file = tmp_path / "events.json"
+    store = EventStore(str(data_file), compact_threshold=1000)
+    store.add_events([{"title": f"Event {i}"} for i in range(5)])
+    store.delete_event(3)
+
+    store.compact()
+
+    with open(data_file, encoding="utf-8") as f:
+        assert [e["id"] for e in json.load(f)["events"]] == [1, 2, 4, 5]
+    assert store.log_file.read_text() == ""
+    assert [e["id"] for e in EventStore(str(data_file)).get_events()] == [1, 2, 4, 5]
+    assert store.add_events([{"title": "Next"}])[0]["id"] == 6
+
+
+def test_duplicate_snapshot_ids_are_renumbered_not_lost(tmp_path):
+    data_file = tmp_path / "events.json"
+    write_events(data_file, [
+        {"id": 1, "title": "First"},
+        {"id": 1, "title": "Clash"},
+        {"id": 2, "title": "Second"},
+        {"id": 2, "title": "Second"},
+    ])
+    store = EventStore(str(data_file), compact_threshold=1000)
+
+    # The differing clash gets a fresh ID; the exact repeat is one event
+    assert [(e["id"], e["title"]) for e in store.get_events()] == [(1, "First"), (3, "Clash"), (2, "Second")]
+    store.compact()
+    assert [e["id"] for e in EventStore(str(data_file)).get_events()] == [1, 3, 2]
+    assert store.add_events([{"title": "Next"}])[0]["id"] == 4
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the time index behind time_period filters and the trend tool
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_factory import CATEGORIES, SEVERITIES, random_events
+from services.event_store import EventStore, parse_time
+from services.event_timeline import DAY_SECONDS, MAX_TREND_BUCKETS, EventTimeline, parse_period
+
+
+
+def test_windows_and_trends_match_a_scan_of_the_store(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    timeline = store.register_index(EventTimeline())
+    added = store.add_events(random_events(400, seed=5, categories=CATEGORIES[:3], start="2025-03-01", days=28) + [{"title": "Undated"}])
+    for event in added[::7]:
+        store.delete_event(event["id"])
+    # Replace an event in place, moving it to the end of the month
+    moved = dict(added[1], timestamp="2025-03-30T12:00:00Z", category="cyber")
+    store.apply_batch([("delete", moved["id"]), ("add", [moved])])
+
+    events = [e for e in store.get_events() if parse_time(e.get("timestamp")) is not None]
+    start, end = parse_time("2025-03-10T06:00:00Z"), parse_time("2025-03-17T00:00:00Z")
+    with store.synced():
+        in_window = timeline.keys_between(start, end)
+        daily = timeline.trends("day")
+        weekly = timeline.trends("week", start=parse_time("2025-03-01T00:00:00Z"))
+    assert sorted(in_window) == sorted(e["id"] for e in events if start <= parse_time(e["timestamp"]) < end)
+    times = {e["id"]: parse_time(e["timestamp"]) for e in events}
+    assert [times[key] for key in in_window] == sorted(times[key] for key in in_window)
+
+    # One bucket per day from the first event to the last, empty days included
+    assert [b["start"] for b in daily][:2] == ["2025-03-01", "2025-03-02"]
+    assert daily[-1]["start"] == "2025-03-30" and len(daily) == 30
+    assert sum(b["total"] for b in daily) == len(events)
+    march_5 = [e for e in events if e["timestamp"].startswith("2025-03-05")]
+    assert daily[4]["by_severity"] == {s: n for s, n in sorted(
+        ((s, sum(e["severity"] == s for e in march_5)) for s in SEVERITIES), key=lambda x: -x[1]) if n}
+
+    # Weeks start on Monday; 1 March 2025 was a Saturday
+    assert [b["start"] for b in weekly] == ["2025-02-24", "2025-03-03", "2025-03-10", "2025-03-17", "2025-03-24"]
+    assert weekly[-1]["by_category"]["cyber"] == 1
+    assert sum(b["total"] for b in weekly) == len(events)
+
+
+def test_trends_are_bounded():
+    timeline = EventTimeline()
+    timeline.add({"id": 1, "timestamp": "0001-01-01T00:00:00Z", "category": "cyber", "severity": "low"})
+    timeline.add({"id": 2, "timestamp": "2025-03-04T00:00:00Z", "category": "cyber", "severity": "low"})
+    timeline.add({"id": 3, "timestamp": "2025-03-06T00:00:00Z", "category": "cyber", "severity": "low"})
+
+    # A far-off outlier only costs the latest MAX_TREND_BUCKETS buckets
+    daily = timeline.trends("day")
+    assert len(daily) == MAX_TREND_BUCKETS and daily[-1]["start"] == "2025-03-06"
+    # A window clamps to the days that have events in it
+    window = timeline.trends("day", start=parse_time("2025-01-01T00:00:00Z"))
+    assert [(b["start"], b["total"]) for b in window] == [("2025-03-04", 1), ("2025-03-05", 0), ("2025-03-06", 1)]
+    assert timeline.trends("week", start=parse_time("2026-01-01T00:00:00Z")) == []
+
+
+def test_reset_forgets_everything():
+    timeline = EventTimeline()
+    timeline.add({"id": 1, "timestamp": "2025-01-01T00:00:00Z"})
+    timeline.reset()
+    assert len(timeline) == 0 and timeline.keys_between() == [] and timeline.trends() == []
+
+
+def test_parse_period():
+    assert parse_period("24h") == DAY_SECONDS
+    assert parse_period("last 7 days") == parse_period("7d") == parse_period("recent") == 7 * DAY_SECONDS
+    assert parse_period("Past week") == parse_period("2w") // 2
+    with pytest.raises(ValueError):
+        parse_period("since Tuesday")
+    with pytest.raises(ValueError):
+        parse_period("1000y")
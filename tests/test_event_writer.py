@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the single event writer queue
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_index import EventIndex
+from services.event_store import EventStore
+from services.event_writer import EventWriter
+
+
+def test_concurrent_writers_get_unique_ids(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"), compact_threshold=10_000)
+    writer = EventWriter(store)
+    assigned = []
+
+    def agent(n):
+        futures = [writer.submit("add", [{"title": f"Agent {n} event {i}"}]) for i in range(20)]
+        for future in futures:
+            assigned.extend(e["id"] for e in future.result(timeout=5))
+
+    threads = [threading.Thread(target=agent, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(assigned) == list(range(1, 161))
+    assert store.count() == 160
+    # A fresh reader replays every write from disk
+    assert EventStore(str(tmp_path / "events.json")).count() == 160
+
+
+def test_async_add_and_delete(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    writer = EventWriter(store)
+
+    async def run():
+        added = await writer.add_events([{"title": "One"}, {"title": "Two"}])
+        deleted = await asyncio.gather(writer.delete_event(added[0]["id"]), writer.delete_event(99))
+        return added, deleted
+
+    added, deleted = asyncio.run(run())
+    assert [e["id"] for e in added] == [1, 2]
+    assert deleted == [True, False]
+    assert [e["id"] for e in store.get_events()] == [2]
+
+
+class PoisonIndex(EventIndex):
+    """Fails to index events titled "poison" """
+
+    def add(self, event):
+        if event.get("title") == "poison":
+            raise RuntimeError("cannot index poison")
+
+
+def test_a_bad_mutation_fails_only_its_caller(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    store.register_index(PoisonIndex())
+    writer = EventWriter(store, batch_window=0.5)
+
+    futures = [
+        writer.submit("add", [{"title": "One"}]),
+        writer.submit("rename", 1),
+        writer.submit("add", {"title": "not a list"}),
+        writer.submit("add", [{"title": "poison"}]),
+        writer.submit("add", [{"title": "Two"}]),
+    ]
+    errors = [future.exception(timeout=5) for future in futures]
+
+    assert errors[0] is None and errors[4] is None
+    assert isinstance(errors[1], ValueError) and isinstance(errors[2], TypeError)
+    assert isinstance(errors[3], RuntimeError)
+    assert [e["title"] for e in store.get_events()] == ["One", "Two"]
+    assert EventStore(str(tmp_path / "events.json")).count() == 2
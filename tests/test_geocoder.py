@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the geocoder's gazetteer matching and persistent cache
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geocoder import Geocoder
+
+GAZETTEER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer.json")
+
+
+def test_gazetteer_prefers_longest_then_first_match(tmp_path):
+    geocoder = Geocoder(GAZETTEER, str(tmp_path / "cache.jsonl"))
+
+    assert geocoder.lookup("Port of Shanghai, China") == (31.2, 121.5)
+    assert geocoder.lookup("SOUTH CHINA SEA") == (9.5, 113.5)
+    assert geocoder.lookup("Los Angeles, California, USA") == (34.1, -118.2)
+    assert geocoder.lookup("Narnia") is None
+
+
+def test_llm_answers_are_cached_on_disk(tmp_path):
+    cache_file = tmp_path / "cache.jsonl"
+    geocoder = Geocoder(GAZETTEER, str(cache_file))
+    asked = []
+
+    async def fake_llm(location):
+        asked.append(location)
+        return (1.5, 2.5)
+
+    geocoder._ask_llm = fake_llm
+    assert asyncio.run(geocoder.geocode("Narnia")) == (1.5, 2.5)
+    assert asyncio.run(geocoder.geocode("  narnia ")) == (1.5, 2.5)
+    assert asked == ["Narnia"]
+
+    reloaded = Geocoder(GAZETTEER, str(cache_file))
+    assert reloaded.lookup("Narnia") == (1.5, 2.5)
+
+
+def test_batch_sends_unique_misses_in_one_request(tmp_path):
+    geocoder = Geocoder(GAZETTEER, str(tmp_path / "cache.jsonl"))
+    batches = []
+
+    async def fake_batch(locations):
+        batches.append(sorted(locations.values()))
+        return {key: (float(len(key)), 0.0) for key in locations}
+
+    geocoder._ask_llm_batch = fake_batch
+    coords = asyncio.run(geocoder.geocode_many(["Narnia", "Red Sea", "Gondor", "narnia", "Narnia", ""]))
+
+    assert batches == [["Gondor", "Narnia"]]
+    assert coords["Narnia"] == coords["narnia"] == (6.0, 0.0)
+    assert coords["Red Sea"] == (20.0, 38.0)
+    assert coords[""] == (0.0, 0.0)
+    assert geocoder.lookup("Gondor") == (6.0, 0.0)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON array parser used to stream extracted events
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.json_stream import JsonArrayStreamParser
+
+EVENTS = [
+    {"title": "Strike on {port}", "description": "Quote \"here\" and \\ backslash ]", "tags": ["a", "b"]},
+    {"title": "Second", "nested": {"x": [1, 2, {"y": "}"}]}},
+    {"title": "Third"},
+]
+
+
+def test_elements_are_emitted_as_soon_as_they_close():
+    text = "```json\n" + json.dumps(EVENTS, indent=2) + "\n```"
+    first_end = text.index('"b"\n    ]\n  }') + len('"b"\n    ]\n  }')
+    parser = JsonArrayStreamParser()
+
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [EVENTS[0]]
+    assert parser.feed(text[first_end:]) == EVENTS[1:]
+
+
+def test_any_chunking_yields_same_elements():
+    text = json.dumps(EVENTS)
+    for size in (1, 2, 3, 7, 50):
+        parser = JsonArrayStreamParser()
+        parsed = []
+        for start in range(0, len(text), size):
+            parsed.extend(parser.feed(text[start:start + size]))
+        assert parsed == EVENTS
+
+
+def test_bare_object_is_one_element():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('{"title": "Only"') == []
+    assert parser.feed("}") == [{"title": "Only"}]
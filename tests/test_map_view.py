@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for map viewport clustering and keyset pagination of /api/events
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_factory import SEVERITIES, random_events
+from services.event_aggregates import EventAggregates
+from services.event_store import EventStore
+from services.map_view import ClusterPyramid, MapView, SortedEvents, cluster_events, page_events, parse_bbox
+from services.spatial_index import SpatialIndex
+
+
+
+def test_parse_bbox_wraps_longitudes():
+    assert parse_bbox("10,-5,20,5") == (-5, 10, 5, 20)
+    assert parse_bbox("170,40,190,50") == (40, 170, 50, -170)
+    assert parse_bbox("-400,-100,400,100") == (-90, -180, 90, 180)
+    for bad in ["1,2,3", "a,b,c,d", "20,0,10,5"]:
+        with pytest.raises(ValueError):
+            parse_bbox(bad)
+
+
+def test_pyramid_matches_clustering_from_scratch_after_removals():
+    events = random_events(3000, ids=True)
+    pyramid = ClusterPyramid()
+    for event in events:
+        pyramid.add(event)
+    for event in events[::3]:
+        pyramid.remove(event)
+    remaining = [e for i, e in enumerate(events) if i % 3]
+
+    for zoom in range(pyramid.max_zoom + 1):
+        for box in [(-90, -180, 90, 180), (10, 100, 40, 140), (40, 170, 70, -170)]:
+            clusters = pyramid.clusters(zoom, box)
+            expected = cluster_events(remaining, zoom, box)
+            assert sorted((c["bounds"], c["count"], c["severity"]) for c in clusters) == \
+                sorted((c["bounds"], c["count"], c["severity"]) for c in expected)
+            for cluster, scratch in zip(sorted(clusters, key=lambda c: c["bounds"]), sorted(expected, key=lambda c: c["bounds"])):
+                assert cluster["lat"] == pytest.approx(scratch["lat"]) and cluster["lon"] == pytest.approx(scratch["lon"])
+
+    total = sum(c["count"] for c in pyramid.clusters(0, (-90, -180, 90, 180)))
+    assert total == len(remaining)
+    high = sum(c["count"] for c in pyramid.clusters(3, (-90, -180, 90, 180), severities={"high"}, categories={"climate"}))
+    assert high == sum(1 for e in remaining if e["severity"] == "high" and e["category"] == "climate")
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest", "severity"])
+def test_pages_cover_every_event_once_in_order(sort):
+    events = random_events(237, ids=True)
+    rank = {s: i for i, s in enumerate(SEVERITIES)}
+    expected = {
+        "newest": sorted(events, key=lambda e: -e["id"]),
+        "oldest": sorted(events, key=lambda e: e["id"]),
+        "severity": sorted(events, key=lambda e: (rank[e["severity"]], -e["id"])),
+    }[sort]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = page_events(events, sort, 50, cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert [e["id"] for e in seen] == [e["id"] for e in expected]
+
+    with pytest.raises(ValueError):
+        page_events(events, "oldest" if sort != "oldest" else "newest", 10, page_events(events, sort, 10)[1])
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest", "severity"])
+def test_sorted_index_pages_like_a_scan(sort):
+    events = random_events(500, ids=True)
+    index = SortedEvents()
+    for event in reversed(events):
+        index.add(event)
+    for event in events[::4]:
+        index.remove(event)
+    # Re-adding an event with a new severity moves it
+    moved = dict(events[1], severity="critical")
+    index.add(moved)
+    remaining = [moved if e is events[1] else e for i, e in enumerate(events) if i % 4]
+    assert len(index) == len(remaining)
+
+    cursor, indexed_cursor = None, None
+    while True:
+        page, cursor = page_events(remaining, sort, 40, cursor)
+        indexed, indexed_cursor = index.page(sort, 40, indexed_cursor)
+        assert indexed == page and indexed_cursor == cursor
+        if cursor is None:
+            break
+
+
+def test_pages_stay_stable_when_events_are_added(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    view = MapView(store, store.register_index(SpatialIndex()), store.register_index(EventAggregates()))
+    store.add_events([{"title": f"Event {i}", "lat": 10.0, "lon": float(i), "severity": "low"} for i in range(5)])
+
+    first = view.query(limit=2)
+    store.add_events([{"title": "Late arrival", "lat": 10.0, "lon": 0.0, "severity": "low"}])
+    second = view.query(limit=2, cursor=first["next_cursor"])
+    assert [e["title"] for e in first["events"] + second["events"]] == ["Event 4", "Event 3", "Event 2", "Event 1"]
+
+
+def test_query_clusters_zoomed_out_and_filters(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    view = MapView(store, store.register_index(SpatialIndex()), store.register_index(EventAggregates()))
+    store.add_events([
+        {"title": "Red Sea strike", "location": "Red Sea", "lat": 15.5, "lon": 41.5, "severity": "high", "category": "maritime"},
+        {"title": "Port closure", "location": "Aden, Yemen", "lat": 12.8, "lon": 45.0, "severity": "low", "category": "supply-chain"},
+        {"title": "Typhoon", "location": "Taiwan", "lat": 24.0, "lon": 120.5, "severity": "medium", "category": "climate"},
+    ])
+
+    zoomed_out = view.query(zoom=2, bbox="0,0,60,30")
+    assert zoomed_out["mode"] == "clusters" and zoomed_out["total"] == 2
+    assert view.query(zoom=2, category="maritime,climate")["total"] == 2
+    assert view.query(zoom=2, search="typhoon")["total"] == 1
+
+    zoomed_in = view.query(zoom=9, bbox="40,14,43,17")
+    assert zoomed_in["mode"] == "events" and [e["title"] for e in zoomed_in["events"]] == ["Red Sea strike"]
+    assert [e["title"] for e in view.query(limit=10, region="yemen")["events"]] == ["Port closure"]
+
+
+def test_summary_counts_match_the_filtered_events(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    view = MapView(store, store.register_index(SpatialIndex()), store.register_index(EventAggregates()))
+    store.add_events([
+        {"title": "Red Sea strike", "location": "Red Sea", "lat": 15.5, "lon": 41.5, "severity": "high", "category": "maritime"},
+        {"title": "Port closure", "location": "Aden, Yemen", "lat": 12.8, "lon": 45.0, "severity": "low", "category": "supply-chain"},
+        {"title": "Typhoon", "location": "Taiwan", "lat": 24.0, "lon": 120.5, "severity": "high", "category": "climate"},
+    ])
+
+    summary = view.summary()
+    assert (summary["total"], summary["regions"]) == (3, 3)
+    assert summary["categories"] == ["climate", "maritime", "supply-chain"]
+    assert summary["filtered"]["by_severity"] == {"high": 2, "low": 1}
+
+    high = view.summary(severity="high", category="maritime,climate")["filtered"]
+    assert high == {"total": 2, "by_severity": {"high": 2}, "by_region": {"Red Sea": 1, "Taiwan": 1}}
+    searched = view.summary(search="typhoon", severity="high")
+    assert searched["total"] == 3 and searched["filtered"]["by_region"] == {"Taiwan": 1}
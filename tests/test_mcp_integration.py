@@ -12,37 +12,6 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from services.openai_agent import OpenAIService
 
-# Sample security events data for testing
-SAMPLE_EVENTS = [
-    {
-        "id": "1",
-        "title": "Suspicious Maritime Activity",
-        "description": "Unidentified vessel detected near shipping lane",
-        "severity": "high",
-        "category": "maritime",
-        "location": "South China Sea, Asia",
-        "timestamp": "2024-01-15T10:30:00Z"
-    },
-    {
-        "id": "2", 
-        "title": "Supply Chain Disruption",
-        "description": "Major port strike affecting cargo operations",
-        "severity": "critical",
-        "category": "supply-chain",
-        "location": "Los Angeles, California, USA",
-        "timestamp": "2024-01-15T08:45:00Z"
-    },
-    {
-        "id": "3",
-        "title": "Climate Risk Alert",
-        "description": "Severe storm system approaching agricultural regions",
-        "severity": "medium",
-        "category": "climate",
-        "location": "Queensland, Australia", 
-        "timestamp": "2024-01-15T12:00:00Z"
-    }
-]
-
 async def test_mcp_integration():
     """Test the MCP integration with OpenAI agent"""
     print("🧪 Testing MCP Integration with OpenAI Agent\n")
@@ -69,21 +38,18 @@ async def test_mcp_integration():
         
         # Test analyze_security_events
         analysis_result = await service.analyze_security_events(
-            SAMPLE_EVENTS, 
             query_type="summary"
         )
         print(f"✅ Analysis result: {analysis_result[:100]}...")
         
         # Test get_event_statistics
         stats_result = await service.get_event_statistics(
-            SAMPLE_EVENTS,
             stat_type="count_by_severity"
         )
         print(f"✅ Statistics result: {stats_result}")
         
         # Test get_critical_alerts
         alerts_result = await service.get_critical_alerts(
-            SAMPLE_EVENTS,
             limit=2
         )
         print(f"✅ Critical alerts: {len(alerts_result)} alerts found")
@@ -96,7 +62,7 @@ async def test_mcp_integration():
         response_parts = []
         async for chunk in service.chat_completion_stream(
             message="Give me a summary of the current security events and show me statistics by severity",
-            events_data=SAMPLE_EVENTS
+            use_tools=True
         ):
             response_parts.append(chunk)
         
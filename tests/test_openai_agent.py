@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests for how the chat assistant streams replies and runs and memoizes the model's tool calls
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import openai_agent
+from services.config import Config
+from services.openai_agent import OpenAIService
+from services.tool_transport import ToolError, ToolTransport
+
+
+def tool_call(call_id, name, arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+
+
+def chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def tool_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class SlowToolService(OpenAIService):
+    """Tools that sleep for `seconds` and echo their name"""
+
+    async def get_security_analysis_tools(self):
+        return [{"type": "function", "function": {"name": "slow"}}]
+
+    async def _call_tool(self, function_name, function_args):
+        await asyncio.sleep(function_args.get("seconds", 0))
+        return function_name
+
+
+def test_tool_calls_run_concurrently_in_order_with_a_timeout_each(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", Config.OPENAI_API_KEY or "test-key")
+    monkeypatch.setattr(Config, "MCP_TOOL_TIMEOUT_SECONDS", 0.3)
+    calls = [
+        tool_call("a", "slow", '{"seconds": 0.2}'),
+        tool_call("b", "stuck", '{"seconds": 5}'),
+        tool_call("c", "fast", '{"seconds": 0.05}'),
+        tool_call("d", "garbled", '{not json'),
+    ]
+
+    async def run():
+        async with SlowToolService() as service:
+            start = time.perf_counter()
+            messages = await service._run_tool_calls(calls)
+            return messages, time.perf_counter() - start
+
+    messages, elapsed = asyncio.run(run())
+
+    # Bounded by the timeout, not the sum of the tools' times
+    assert elapsed < 0.6
+    assert [m["tool_call_id"] for m in messages] == ["a", "b", "c", "d"]
+    assert all(m["role"] == "tool" for m in messages)
+    assert messages[0]["content"] == "slow" and messages[2]["content"] == "fast"
+    assert "did not respond within 0.3 seconds" in messages[1]["content"]
+    assert messages[3]["content"].startswith("Error running garbled")
+
+
+def test_one_streamed_request_per_tool_round(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", Config.OPENAI_API_KEY or "test-key")
+    rounds = [
+        # Two tool calls, their arguments split across chunks
+        [chunk("Checking. "),
+         chunk(tool_calls=[tool_delta(0, "call_a", "slow", '{"sec'), tool_delta(1, "call_b", "fast", "")]),
+         chunk(tool_calls=[tool_delta(0, arguments='onds": 0}'), tool_delta(1, arguments="{}")])],
+        [chunk(tool_calls=[tool_delta(0, "call_c", "again", "{}")])],
+        [chunk("Two "), chunk("events."), SimpleNamespace(choices=[])],
+    ]
+    requests = []
+
+    async def fake_create_chat_completion(**kwargs):
+        requests.append(dict(kwargs, messages=list(kwargs["messages"])))
+
+        async def stream():
+            for item in rounds[len(requests) - 1]:
+                yield item
+        return stream()
+
+    monkeypatch.setattr(openai_agent, "create_chat_completion", fake_create_chat_completion)
+
+    async def run():
+        async with SlowToolService() as service:
+            return [text async for text in service.chat_completion_stream("What happened?", use_tools=True)]
+
+    assert asyncio.run(run()) == ["Checking. ", "Two ", "events."]
+    assert len(requests) == 3 and all(r["stream"] and r["tools"] for r in requests)
+
+    assistant, *results = requests[1]["messages"][-3:]
+    assert assistant == {"role": "assistant", "content": "Checking. ", "tool_calls": [
+        tool_call("call_a", "slow", '{"seconds": 0}'), tool_call("call_b", "fast", "{}")]}
+    assert [(m["tool_call_id"], m["content"]) for m in results] == [("call_a", "slow"), ("call_b", "fast")]
+    assert requests[2]["messages"][-1]["tool_call_id"] == "call_c"
+
+
+def test_rounds_are_capped(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", Config.OPENAI_API_KEY or "test-key")
+    requests = []
+
+    async def fake_create_chat_completion(**kwargs):
+        requests.append(kwargs)
+
+        async def stream():
+            if "tools" in kwargs:
+                yield chunk(tool_calls=[tool_delta(0, f"call_{len(requests)}", "slow", "{}")])
+            else:
+                yield chunk("Done.")
+        return stream()
+
+    monkeypatch.setattr(openai_agent, "create_chat_completion", fake_create_chat_completion)
+
+    async def run():
+        async with SlowToolService() as service:
+            return [text async for text in service.chat_completion_stream("Loop", use_tools=True)]
+
+    assert asyncio.run(run()) == ["Done."]
+    assert len(requests) == openai_agent.MAX_TOOL_ROUNDS + 1
+    assert "tools" not in requests[-1]
+
+
+def test_tools_follow_use_tools(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", Config.OPENAI_API_KEY or "test-key")
+    requests = []
+
+    async def fake_create_chat_completion(**kwargs):
+        requests.append(kwargs)
+
+        async def stream():
+            yield chunk("Hi.")
+        return stream()
+
+    monkeypatch.setattr(openai_agent, "create_chat_completion", fake_create_chat_completion)
+
+    async def run(**kwargs):
+        async with SlowToolService() as service:
+            return [text async for text in service.chat_completion_stream("Hello", **kwargs)]
+
+    assert asyncio.run(run(use_tools=True)) == asyncio.run(run(use_tools=False)) == ["Hi."]
+    assert "tools" in requests[0] and "tools" not in requests[1]
+
+
+class CountingTransport(ToolTransport):
+    """Answers every call with a fresh result, failing for endpoint "broken" """
+
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+
+    def data_version(self):
+        return self.version
+
+    async def call(self, endpoint, payload=None):
+        self.calls += 1
+        if endpoint == "broken":
+            raise ToolError(500, "boom")
+        return {"call": self.calls}
+
+
+def test_tool_results_are_reused_until_the_data_changes(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", Config.OPENAI_API_KEY or "test-key")
+
+    async def run():
+        async with OpenAIService() as service:
+            transport = service.tool_transport = CountingTransport()
+            first = await service._call_mcp("get-event-statistics", {"stat_type": "count_by_severity", "x": 1})
+            # Same arguments in another order
+            assert await service._call_mcp("get-event-statistics", {"x": 1, "stat_type": "count_by_severity"}) is first
+            assert await service._call_mcp("get-event-statistics", {"stat_type": "count_by_region"}) != first
+            for _ in range(2):
+                with pytest.raises(ToolError):
+                    await service._call_mcp("broken", {})
+
+            transport.version += 1
+            assert await service._call_mcp("get-event-statistics", {"stat_type": "count_by_severity", "x": 1}) != first
+            return transport.calls, service.tool_results.stats()
+
+    calls, stats = asyncio.run(run())
+    assert calls == 5
+    assert (stats["hits"], stats["misses"]) == (1, 5)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the OpenAI rate limiter and the rate-limited client calls
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import openai_client
+from services.rate_limiter import Priority, RateLimiter, background_priority
+
+
+def test_interactive_calls_jump_background_queue():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=1_000_000, max_in_flight=1)
+    order = []
+
+    async def call(name, priority=None):
+        async with limiter.limit(100, priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def background(name):
+        with background_priority():
+            await call(name)
+
+    async def run():
+        first = asyncio.create_task(call("first"))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(background(f"agent{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        chat = asyncio.create_task(call("chat", Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+        stats = limiter.stats()
+        await asyncio.gather(first, chat, *queued)
+        return stats
+
+    stats = asyncio.run(run())
+    assert order == ["first", "chat", "agent0", "agent1", "agent2"]
+    assert stats["in_flight"] == 1
+    assert stats["lanes"]["background"]["queued"] == 3
+    assert stats["lanes"]["interactive"]["queued"] == 1
+
+
+def test_token_budget_delays_requests():
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=6000, max_in_flight=10)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with limiter.limit(6000):
+            pass
+        # The bucket refills at 100 tokens per second
+        async with limiter.limit(10):
+            pass
+        return loop.time() - start
+
+    assert 0.05 <= asyncio.run(run()) < 1
+
+
+def test_streams_hold_their_slot_until_read_or_closed(monkeypatch):
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=1_000_000, max_in_flight=1)
+    monkeypatch.setattr(openai_client, "openai_limiter", limiter)
+
+    async def create(**kwargs):
+        async def chunks():
+            for i in range(3):
+                yield SimpleNamespace(i=i, usage=SimpleNamespace(total_tokens=50) if i == 2 else None)
+        return chunks()
+
+    completions = SimpleNamespace(create=create)
+    monkeypatch.setattr(openai_client, "get_openai_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    async def run():
+        stream = await openai_client.create_chat_completion(messages=[], max_tokens=10, stream=True)
+        seen = []
+        async for chunk in stream:
+            seen.append((chunk.i, limiter.in_flight))
+        after_read = limiter.in_flight
+
+        stream = await openai_client.create_chat_completion(messages=[], max_tokens=10, stream=True)
+        # The cap of one makes the next request wait for the open stream
+        waiting = asyncio.create_task(openai_client.create_chat_completion(messages=[], max_tokens=10))
+        await asyncio.sleep(0.01)
+        blocked = not waiting.done()
+        await stream.close()
+        await stream.close()
+        await waiting
+        return seen, after_read, blocked, limiter.in_flight
+
+    seen, after_read, blocked, in_flight = asyncio.run(run())
+    assert seen == [(0, 1), (1, 1), (2, 1)] and after_read == 0
+    assert blocked and in_flight == 0
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the grid spatial index behind the bbox, radius and geo feature queries
+"""
+
+import os
+import random
+import sys
+
+import shapely
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_store import EventStore
+from services.spatial_index import SpatialIndex, haversine_km
+
+
+def random_events(count, seed=5):
+    rng = random.Random(seed)
+    return [{"id": i, "lat": rng.uniform(-90, 90), "lon": rng.uniform(-180, 180)} for i in range(count)]
+
+
+def build(events, cell_degrees=1.0):
+    index = SpatialIndex(cell_degrees)
+    for event in events:
+        index.add(event)
+    return index
+
+
+def test_bbox_matches_a_scan_including_antimeridian_boxes():
+    events = random_events(5000)
+    index = build(events, cell_degrees=2.5)
+
+    for box in [(10, 100, 30, 130), (-5.5, -20.25, 5.5, 20.75), (-90, -180, 90, 180), (50, 170, 80, -170), (40, 10, 30, 20)]:
+        min_lat, min_lon, max_lat, max_lon = box
+        if min_lon <= max_lon:
+            inside = lambda e: min_lon <= e["lon"] <= max_lon
+        else:
+            inside = lambda e: e["lon"] >= min_lon or e["lon"] <= max_lon
+        expected = [e["id"] for e in events if min_lat <= e["lat"] <= max_lat and inside(e)]
+        assert [e["id"] for e in index.within_bbox(*box)] == expected, box
+
+
+def test_radius_matches_a_scan_nearest_first():
+    events = random_events(5000)
+    index = build(events)
+
+    for lat, lon, radius in [(15.0, 42.0, 800), (60.0, 179.5, 1500), (-88.0, 0.0, 600), (0.0, 0.0, 1)]:
+        expected = sorted((haversine_km(lat, lon, e["lat"], e["lon"]), e["id"]) for e in events
+                          if haversine_km(lat, lon, e["lat"], e["lon"]) <= radius)
+        assert [e["id"] for e in index.within_radius(lat, lon, radius)] == [i for _, i in expected]
+
+
+def test_features_contain_or_buffer_events():
+    index = build([
+        {"id": 1, "lat": 9.5, "lon": 113.5},
+        {"id": 2, "lat": 13.0, "lon": 113.5},
+        {"id": 3, "lat": 1.5, "lon": 103.8},
+        {"id": 4, "lat": 40.0, "lon": 0.0},
+        {"id": 5, "title": "no coordinates"},
+    ])
+    zone = shapely.box(110, 6, 118, 12)
+    route = shapely.LineString([(121.5, 31.2), (103.8, 1.3), (80.2, 13.1)])
+
+    assert [e["id"] for e in index.within_geometries([zone])] == [1]
+    assert [e["id"] for e in index.within_geometries([zone], buffer_km=150)] == [1, 2]
+    assert [e["id"] for e in index.within_geometries([route])] == [3]
+    assert [e["id"] for e in index.within_geometries([zone, route])] == [1, 3]
+
+
+def test_index_follows_store_writes(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    index = store.register_index(SpatialIndex())
+
+    stored = store.add_events([{"title": "Red Sea", "lat": 15.5, "lon": 41.5}, {"title": "Taiwan", "lat": 24.0, "lon": 120.5}])
+    with store.synced():
+        assert [e["title"] for e in index.within_bbox(10, 30, 30, 130)] == ["Red Sea", "Taiwan"]
+
+    store.delete_event(stored[0]["id"])
+    with store.synced():
+        assert [e["title"] for e in index.within_radius(15.5, 41.5, 500)] == []
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite event store backend
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_store import EventStore
+from services.sqlite_event_store import SQLiteEventStore, import_json_events
+
+EVENTS = [
+    {"id": 1, "title": "AIS gap", "category": "maritime", "severity": "high", "location": "South China Sea"},
+    {"id": 2, "title": "Port strike", "category": "supply-chain", "severity": "medium", "location": "Shanghai, China"},
+    {"id": 4, "title": "Drought", "category": "climate", "severity": "critical", "location": "Horn of Africa"},
+]
+
+
+def test_import_matches_json_store(tmp_path):
+    json_file = tmp_path / "events.json"
+    with open(json_file, "w", encoding="utf-8") as f:
+        json.dump({"events": EVENTS}, f)
+    db_file = tmp_path / "events.db"
+
+    assert import_json_events(str(json_file), str(db_file)) == 3
+
+    json_store = EventStore(str(json_file))
+    sqlite_store = SQLiteEventStore(str(db_file))
+    assert sqlite_store.get_events() == json_store.get_events()
+    for field in ("severity", "category", "region"):
+        assert sqlite_store.count_by(field) == json_store.count_by(field)
+    for filters in ({"location": "china"}, {"location": "Shang"}, {"severity": "critical"},
+                    {"category": "maritime", "location": "sea"}):
+        assert sqlite_store.query_events(**filters) == json_store.query_events(**filters)
+
+
+def test_add_and_delete(tmp_path):
+    store = SQLiteEventStore(str(tmp_path / "events.db"))
+    store.save({"events": EVENTS})
+    version = store.version
+
+    added = store.add_events([{"title": "New", "location": "Red Sea"}, {"id": 1, "title": "Clash"}])
+    assert [e["id"] for e in added] == [5, 6]
+    assert store.version > version
+    assert store.count() == 5
+
+    assert store.delete_event(2)
+    assert not store.delete_event(2)
+    assert [e["id"] for e in store.get_events()] == [1, 4, 5, 6]
+    assert store.query_events(location="red sea")[0]["title"] == "New"
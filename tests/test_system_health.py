@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for the service health that is pushed to dashboards on changes
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_bus import EventBus
+from services.system_health import SystemHealth
+
+
+def test_health_is_published_only_when_a_service_changes_state():
+    async def run():
+        bus = EventBus()
+        health = SystemHealth(bus)
+        subscription = bus.subscribe()
+        health.set("web_search", "available")
+        health.set("web_search", "unavailable")
+        health.set("web_search", "unavailable")
+        degraded = health.status()
+        health.set("web_search", "available")
+        frames = subscription.frames()
+        return degraded, health.status(), [await frames.__anext__() for _ in range(2)], bus.stats()
+
+    degraded, recovered, frames, stats = asyncio.run(run())
+    assert degraded["status"] == "degraded"
+    assert degraded["services"]["web_search"] == "unavailable"
+    assert recovered["status"] == "healthy"
+    assert stats["published"] == 2
+    assert all(frame.startswith("event: health\n") for frame in frames)
+    assert '"status": "degraded"' in frames[0] and '"status": "healthy"' in frames[1]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the inverted text index behind the search agents' per-term counts
+"""
+
+import os
+import random
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.event_store import EventStore
+from services.text_index import TextIndex, event_text
+
+WORDS = ["red", "sea", "overseas", "seaport", "houthi", "attack", "attacks", "cyber", "grid", "taiwan", "strait"]
+
+
+def random_event(rng, event_id):
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+    return {"id": event_id, "title": sentence(3).title(), "description": sentence(8) + ".", "location": sentence(2)}
+
+
+def test_match_agrees_with_a_substring_scan():
+    rng = random.Random(7)
+    events = [random_event(rng, i) for i in range(300)]
+    index = TextIndex()
+    for event in events:
+        index.add(event)
+
+    for phrase in ["sea", "Red Sea", "a red", "eas", "sea attack", "ck cyber gr", "houthi attacks.", "zzz", " "]:
+        expected = {e["id"] for e in events if phrase.lower() in event_text(e)}
+        assert index.match(phrase) == expected, phrase
+
+
+def test_watched_counts_follow_adds_and_removes():
+    index = TextIndex()
+    index.add({"id": 1, "title": "Attack in the Red Sea", "location": "Red Sea"})
+    index.add({"id": 2, "title": "Cyber attack", "location": "Estonia"})
+
+    assert index.watch("red sea") == 1
+    assert index.watch("ATTACK") == 2
+
+    index.add({"id": 3, "title": "Drones over the Red Sea"})
+    index.remove({"id": 1})
+    assert index.count("Red Sea") == 1
+    assert index.count("attack") == 1
+
+    index.unwatch("attack")
+    assert index.count("attack") == 1  # answered from the postings instead
+
+
+def test_search_matches_word_prefixes_across_fields():
+    index = TextIndex()
+    index.add({"id": 1, "title": "Ferry seized", "location": "Strait of Hormuz, Iran", "tags": ["shipping"]})
+    index.add({"id": 2, "title": "Drills near Taiwan", "location": "Taiwan Strait", "description": "PLA shipping lanes"})
+    index.add({"id": 3, "title": "Strike", "location": "Straits of Malacca"})
+
+    assert index.search("strait") == {1, 2, 3}
+    assert index.search("strait") - index.search("strait", prefix=False) == {3}
+    assert index.search("tai str") == {2}
+    assert index.search("ship iran") == {1}
+    assert index.search("ship", fields=("description",)) == {2}
+    assert index.search("hormuz taiwan") == set()
+
+
+def test_location_lookups_start_on_word_boundaries(tmp_path):
+    rng = random.Random(3)
+    events = [random_event(rng, i) for i in range(300)]
+    events.append({"id": 300, "title": "Edge", "location": "sea red"})
+    events.append({"id": 301, "title": "Edge", "location": "attack - sea"})
+    store = EventStore(str(tmp_path / "events.json"))
+    store.save({"events": events})
+
+    for location in ["sea", "Red Sea", "seap", "eas", "a red", "red sea attack"]:
+        pattern = re.compile(r"\b" + re.escape(location.lower()))
+        expected = [e["id"] for e in events if pattern.search(e["location"].lower())]
+        assert [e["id"] for e in store.query_events(location=location)] == expected, location
+
+
+def test_counts_track_store_writes(tmp_path):
+    store = EventStore(str(tmp_path / "events.json"))
+    index = store.text_index
+    index.watch("taiwan")
+
+    stored = store.add_events([{"title": "Drills near Taiwan"}, {"title": "Taiwan Strait transit"}])
+    with store.synced():
+        assert index.count("taiwan") == 2
+
+    store.delete_event(stored[0]["id"])
+    with store.synced():
+        assert index.count("taiwan") == 1
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the chat assistant's tool schemas and their cache
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_server import list_mcp_tools, mcp_app
+from services.tool_schemas import MIN_BACKOFF_SECONDS, ToolSchemaCache, openapi_to_tools
+from services.tool_transport import InProcessToolTransport, ToolError, ToolTransport
+
+FALLBACK = [{"type": "function", "function": {"name": "fallback"}}]
+
+
+def keys(schema):
+    if isinstance(schema, dict):
+        return set(schema) | {key for value in schema.values() for key in keys(value)}
+    if isinstance(schema, list):
+        return {key for value in schema for key in keys(value)}
+    return set()
+
+
+def test_schemas_come_from_the_openapi_document():
+    tools = {tool["function"]["name"]: tool["function"] for tool in openapi_to_tools(mcp_app.openapi())}
+    listed = asyncio.run(list_mcp_tools())["tools"]
+    assert set(tools) == {tool["name"] for tool in listed}
+
+    analyze = tools["analyze_security_events"]["parameters"]
+    assert analyze["required"] == ["query_type"]
+    assert "trend_analysis" in analyze["properties"]["query_type"]["enum"]
+    assert analyze["properties"]["severity_filter"]["enum"] == ["low", "medium", "high", "critical"]
+    assert tools["search_events_in_bbox"]["parameters"]["required"] == ["min_lat", "min_lon", "max_lat", "max_lon"]
+    assert tools["get_critical_alerts"]["parameters"] == {"type": "object", "properties": {}, "required": []}
+    assert not {"$ref", "title"} & keys(tools)
+
+
+def test_only_the_title_keyword_is_dropped():
+    document = {
+        "paths": {"/create-note": {"post": {
+            "operationId": "create_note", "tags": ["tools"],
+            "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Note"}}}},
+        }}},
+        "components": {"schemas": {"Note": {
+            "title": "Note",
+            "type": "object",
+            "properties": {
+                "title": {"title": "Title", "type": "string"},
+                "meta": {"title": "Meta", "type": "object", "default": {"title": "untitled"}},
+            },
+            "required": ["title"],
+        }}},
+    }
+    parameters = openapi_to_tools(document)[0]["function"]["parameters"]
+    assert parameters["properties"] == {
+        "title": {"type": "string"},
+        "meta": {"type": "object", "default": {"title": "untitled"}},
+    }
+    assert parameters["required"] == ["title"]
+
+
+class RemoteTransport(ToolTransport):
+    """Serves the real OpenAPI document once `ready` is set, or fails while `down`"""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.down = False
+        self.fetches = 0
+
+    async def call(self, endpoint, payload=None):
+        self.fetches += 1
+        if self.down:
+            raise ToolError(503, "unavailable")
+        await self.ready.wait()
+        return mcp_app.openapi()
+
+
+def test_remote_schemas_load_in_the_background():
+    async def run():
+        transport = RemoteTransport()
+        cache = ToolSchemaCache(transport, FALLBACK, ttl=60)
+
+        # Nothing cached yet: the fallback, without waiting for the fetch
+        assert await cache.get() is FALLBACK
+        await asyncio.sleep(0)
+        assert await cache.get() is FALLBACK and transport.fetches == 1
+        transport.ready.set()
+        await cache._refresh_task
+        tools = await cache.get()
+        assert len(tools) > 1 and transport.fetches == 1
+
+        # Past the TTL the old schemas are served while new ones are fetched
+        cache._next_fetch = 0
+        transport.down = True
+        assert await cache.get() is tools
+        await cache._refresh_task
+        assert transport.fetches == 2 and await cache.get() is tools
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["consecutive_failures"] == 1 and not stats["using_fallback"]
+
+
+def test_unreachable_server_backs_off():
+    async def run():
+        transport = RemoteTransport()
+        transport.down = True
+        cache = ToolSchemaCache(transport, FALLBACK)
+        for _ in range(5):
+            assert await cache.get() is FALLBACK
+            await asyncio.sleep(0)
+        # One failed fetch; the rest wait out the backoff instead of retrying
+        assert transport.fetches == 1
+        assert 0 < cache.stats()["next_fetch_in_seconds"] <= MIN_BACKOFF_SECONDS
+
+        assert not await cache.refresh()
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["consecutive_failures"] == 2 and stats["next_fetch_in_seconds"] > MIN_BACKOFF_SECONDS
+
+
+def test_in_process_schemas_are_ready_on_first_use():
+    async def run():
+        cache = ToolSchemaCache(InProcessToolTransport(), FALLBACK)
+        return await cache.get()
+
+    tools = asyncio.run(run())
+    assert tools is not FALLBACK and tools == openapi_to_tools(mcp_app.openapi())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process and HTTP transports the chat assistant calls MCP tools through
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_server import LOCAL_ENDPOINTS, mcp_app
+from services.tool_transport import HttpToolTransport, InProcessToolTransport, ToolError
+
+CALLS = [
+    ("get-event-statistics", {"stat_type": "count_by_category"}),
+    ("analyze-security-events", {"query_type": "summary", "severity_filter": "high"}),
+    ("get-event-trends", {"interval": "week"}),
+    ("get-critical-alerts", None),
+    ("search-events-by-location", {"location": "Sea"}),
+    ("search-events-in-bbox", {"min_lat": -10, "min_lon": 30, "max_lat": 40, "max_lon": 80}),
+    ("tools", None),
+]
+
+
+def http_transport():
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=mcp_app))
+    return HttpToolTransport("http://mcp/", client)
+
+
+def test_transports_agree():
+    async def run():
+        http, local = http_transport(), InProcessToolTransport()
+        try:
+            return [(await http.call(*call), await local.call(*call)) for call in CALLS]
+        finally:
+            await http.aclose()
+
+    for (endpoint, _), (over_http, in_process) in zip(CALLS, asyncio.run(run())):
+        assert over_http == in_process, endpoint
+    assert {endpoint for endpoint, _ in CALLS} - {"tools"} <= set(LOCAL_ENDPOINTS)
+
+
+@pytest.mark.parametrize("endpoint, payload, status", [
+    ("get-event-trends", {"interval": "month"}, 400),
+    ("analyze-security-events", {"time_period": "7d"}, 422),
+    ("no-such-tool", {}, 404),
+])
+def test_transports_report_the_same_errors(endpoint, payload, status):
+    async def run(transport):
+        try:
+            with pytest.raises(ToolError) as error:
+                await transport.call(endpoint, payload)
+            return error.value.status_code
+        finally:
+            await transport.aclose()
+
+    assert asyncio.run(run(http_transport())) == asyncio.run(run(InProcessToolTransport())) == status